@@ -0,0 +1,169 @@
+import json
+import os
+import re
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from embedding_cache import DEFAULT_CACHE_DIR
+from neighbor_graph import edges_to_graph
+
+try:
+    import hnswlib
+except ImportError:  # 설치되지 않았으면 main_cluster는 정확한 블록 계산으로 대체
+    hnswlib = None
+
+
+def ann_available() -> bool:
+    return hnswlib is not None
+
+
+class ANNIndex:
+    """
+    임베딩 캐시 키(텍스트 sha256) → 벡터를 담는 HNSW(cosine) 근사 최근접 이웃 인덱스
+
+    - 임베딩 캐시와 같은 디렉터리에 모델별 인덱스 파일(.hnsw)과 키 매핑(.hnsw.json)으로 저장
+    - add로 새 벡터만 증분 추가, evict로 현재 기사에 없는 키를 삭제 표시(빈 자리는 다음 추가에 재사용)
+    - 클러스터링/증분 배정용 이웃 그래프(radius_graph)와 유사 기사 검색(search)에 사용
+    - version(차원 축소 기준 등)이 저장된 값과 다르면 벡터 공간이 바뀐 것이므로 빈 인덱스로 다시 만듦
+    """
+
+    def __init__(self, model: str, dim: int, index_dir: Optional[str] = None,
+                 M: int = 16, ef_construction: int = 200, ef: int = 128, version: Optional[str] = None):
+        if hnswlib is None:
+            raise ImportError("ANN 인덱스를 쓰려면 hnswlib를 설치하세요 (pip install hnswlib)")
+        self.model = model
+        self.dim = dim
+        self.index_dir = Path(index_dir) if index_dir else DEFAULT_CACHE_DIR
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        safe_model = re.sub(r'[^\w.-]', '_', model)
+        self.index_path = self.index_dir / f'{safe_model}.hnsw'
+        self.meta_path = self.index_dir / f'{safe_model}.hnsw.json'
+        self.M = M
+        self.ef_construction = ef_construction
+        self.ef = ef
+        self.version = version
+        self.key_to_label: Dict[str, int] = {}
+        self.next_label = 0
+        self.load()
+
+    def _new_index(self, capacity: int):
+        self.index = hnswlib.Index(space='cosine', dim=self.dim)
+        self.index.init_index(max_elements=max(capacity, 1024), M=self.M,
+                              ef_construction=self.ef_construction, allow_replace_deleted=True)
+        self.index.set_ef(self.ef)
+
+    def load(self):
+        """저장된 인덱스 로드 (없거나 차원/version이 다르거나 깨졌으면 빈 인덱스)"""
+        self.key_to_label, self.next_label = {}, 0
+        if self.index_path.exists() and self.meta_path.exists():
+            try:
+                with open(self.meta_path, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                if meta.get('dim') == self.dim and meta.get('version') == self.version:
+                    self.index = hnswlib.Index(space='cosine', dim=self.dim)
+                    self.index.load_index(str(self.index_path), allow_replace_deleted=True)
+                    self.index.set_ef(self.ef)
+                    self.key_to_label = meta['keys']
+                    self.next_label = meta['next_label']
+                    return
+            except Exception as e:
+                print(f"⚠️ ANN 인덱스 로드 실패, 새로 만듭니다: {e}")
+                self.key_to_label, self.next_label = {}, 0
+        self._new_index(1024)
+
+    def save(self):
+        """인덱스와 키 매핑을 임시 파일에 쓴 뒤 교체"""
+        tmp_index = self.index_path.with_name(self.index_path.name + '.tmp')
+        self.index.save_index(str(tmp_index))
+        tmp_meta = self.meta_path.with_name(self.meta_path.name + '.tmp')
+        with open(tmp_meta, 'w', encoding='utf-8') as f:
+            json.dump({'model': self.model, 'dim': self.dim, 'version': self.version, 'next_label': self.next_label,
+                       'keys': self.key_to_label}, f)
+        os.replace(tmp_index, self.index_path)
+        os.replace(tmp_meta, self.meta_path)
+
+    def __len__(self):
+        return len(self.key_to_label)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.key_to_label
+
+    def add(self, keys: Sequence[str], vectors: np.ndarray) -> int:
+        """인덱스에 없는 키의 벡터만 추가, 추가된 수 반환"""
+        new_rows, new_keys, seen = [], [], set()
+        for row, key in enumerate(keys):
+            if key not in self.key_to_label and key not in seen:
+                seen.add(key)
+                new_rows.append(row)
+                new_keys.append(key)
+        if not new_keys:
+            return 0
+        needed = self.index.get_current_count() + len(new_keys)
+        if needed > self.index.get_max_elements():
+            self.index.resize_index(max(needed, self.index.get_max_elements() * 2))
+        labels = np.arange(self.next_label, self.next_label + len(new_keys))
+        self.index.add_items(np.asarray(vectors[new_rows], dtype=np.float32), labels, replace_deleted=True)
+        self.key_to_label.update(zip(new_keys, labels.tolist()))
+        self.next_label += len(new_keys)
+        return len(new_keys)
+
+    def evict(self, active_keys) -> int:
+        """현재 기사에 없는 키를 삭제 표시, 삭제된 수 반환"""
+        active = set(active_keys)
+        stale = [key for key in self.key_to_label if key not in active]
+        for key in stale:
+            self.index.mark_deleted(self.key_to_label.pop(key))
+        return len(stale)
+
+    def search(self, vectors: np.ndarray, k: int = 10) -> Tuple[List[List[str]], np.ndarray]:
+        """질의 벡터별 가까운 k개 키와 cosine 거리 (유사 기사 검색용)"""
+        if len(self.key_to_label) == 0:
+            return [[] for _ in range(len(vectors))], np.zeros((len(vectors), 0), dtype=np.float32)
+        k = min(k, len(self.key_to_label))
+        labels, distances = self.index.knn_query(np.asarray(vectors, dtype=np.float32), k=k)
+        label_to_key = {label: key for key, label in self.key_to_label.items()}
+        return [[label_to_key[label] for label in row] for row in labels.tolist()], distances
+
+    def radius_graph(self, keys: Sequence[str], vectors: np.ndarray, radius: float, k: int = 64) -> sparse.csr_matrix:
+        """
+        keys 행끼리 cosine 거리가 radius 이하인 근사 이웃 그래프 (radius_neighbor_graph와 같은 형식)
+        인덱스에는 다른 카테고리/기사도 들어 있으므로 filter로 keys의 벡터만 탐색하고,
+        k번째 이웃까지 모두 radius 안에 있는 행은 k를 두 배로 늘려 다시 조회해 반경 안 이웃을 빠뜨리지 않음
+        """
+        n = len(keys)
+        rows_of_label: Dict[int, List[int]] = defaultdict(list)
+        for row, key in enumerate(keys):
+            rows_of_label[self.key_to_label[key]].append(row)
+        empty = np.array([], dtype=np.int64)
+        if n == 0:
+            return edges_to_graph(n, empty, empty, np.array([], dtype=np.float32))
+        allowed = rows_of_label.__contains__
+        vectors = np.asarray(vectors, dtype=np.float32)
+        found: Dict[int, Tuple[List[int], List[float]]] = {}
+        pending = np.arange(n)
+        k = min(k, len(rows_of_label))
+        while len(pending):
+            labels, distances = self.index.knn_query(vectors[pending], k=k, filter=allowed)
+            for row, row_labels, row_distances in zip(pending.tolist(), labels.tolist(), distances.tolist()):
+                found[row] = (row_labels, row_distances)
+            if k == len(rows_of_label):
+                break
+            # 가장 먼 이웃도 반경 안이면 더 있을 수 있으므로 다시 조회
+            pending = pending[distances[:, -1] <= radius]
+            k = min(k * 2, len(rows_of_label))
+        src, dst, dist = [], [], []
+        for row, (row_labels, row_distances) in found.items():
+            for label, distance in zip(row_labels, row_distances):
+                if distance > radius:
+                    break
+                for other in rows_of_label[label]:
+                    if other != row:
+                        src.append(row)
+                        dst.append(other)
+                        dist.append(distance)
+        return edges_to_graph(n, np.asarray(src, dtype=np.int64), np.asarray(dst, dtype=np.int64),
+                              np.asarray(dist, dtype=np.float32))
@@ -3,7 +3,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from typing import List, Dict, Any, Optional
 import os
 from dotenv import load_dotenv
-from supabase.client import create_client
+from storage import create_storage
 from pydantic import BaseModel
 from datetime import datetime
 import uuid
@@ -26,25 +26,36 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Supabase 클라이언트 초기화
-SUPABASE_URL = os.getenv('SUPABASE_URL')
-SUPABASE_KEY = os.getenv('SUPABASE_ANON_KEY')
-
-# 환경 변수에서 불필요한 문자 제거 (줄바꿈, 공백, 특수문자 등)
-if SUPABASE_URL:
-    SUPABASE_URL = SUPABASE_URL.strip().replace('\n', '').replace('\r', '').replace('\\n', '')
-if SUPABASE_KEY:
-    SUPABASE_KEY = SUPABASE_KEY.strip().replace('\n', '').replace('\r', '').replace('\\n', '')
-
-if not SUPABASE_URL or not SUPABASE_KEY:
-    print("⚠️  환경 변수 누락: SUPABASE_URL 또는 SUPABASE_ANON_KEY가 설정되지 않았습니다.")
+# 저장소 초기화 (STORAGE_BACKEND=supabase(기본) | sqlite)
+try:
+    storage = create_storage()
+except ValueError as e:
+    print(f"⚠️  저장소 설정 오류: {str(e)}")
     print("🔧 Railway에서 환경 변수를 설정해주세요:")
     print("   - SUPABASE_URL: Supabase 프로젝트 URL")
     print("   - SUPABASE_ANON_KEY: Supabase anon key")
+    print("   - (로컬 실행) STORAGE_BACKEND=sqlite, SQLITE_PATH: 로컬 DB 경로")
     # 개발 모드에서는 None 허용
-    supabase = None
-else:
-    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+    storage = None
+
+# 마지막으로 조회에 성공한 발행 세대 (publish_state 조회 실패 시 사용)
+_last_generation: Optional[str] = None
+
+
+def get_current_generation() -> Optional[str]:
+    """
+    현재 발행 세대 id 반환 (발행 기록이 없으면 None → 전체 이슈 조회)
+    조회에 실패하면 여러 세대가 섞이지 않도록 마지막으로 확인한 세대를 쓰고, 그것도 없으면 503
+    """
+    global _last_generation
+    try:
+        _last_generation = storage.get_current_generation()
+        return _last_generation
+    except Exception as e:
+        print(f"⚠️ 현재 세대 조회 실패: {str(e)}")
+        if _last_generation is None:
+            raise HTTPException(status_code=503, detail="현재 발행 세대를 조회할 수 없습니다. 잠시 후 다시 시도해주세요.")
+        return _last_generation
 
 # 응답 모델들
 class BiasGauge(BaseModel):
@@ -94,19 +105,16 @@ async def root():
 @app.get("/api/issues", response_model=List[IssueCard])
 async def get_issues(category: Optional[str] = None, limit: int = 20):
     """이슈 목록 조회 (편향성 게이지 포함)"""
-    if not supabase:
+    if not storage:
         raise HTTPException(status_code=503, detail="데이터베이스 연결이 설정되지 않았습니다. 환경 변수를 확인해주세요.")
     
+    # 세대 조회 실패는 503 그대로 전달 (아래 500 처리에 묻히지 않도록 try 밖에서 조회)
+    generation_id = get_current_generation()
     try:
-        query = supabase.table('issues').select('*')
-        
-        if category:
-            query = query.eq('category', category)
-            
-        response = query.order('created_at', desc=True).limit(limit).execute()
+        rows = storage.select_issues(generation_id=generation_id, category=category, limit=limit)
         
         issues = []
-        for issue in response.data:
+        for issue in rows:
             issues.append(IssueCard(
                 id=str(issue['id']),
                 title=issue['title'],
@@ -129,17 +137,15 @@ async def get_issues(category: Optional[str] = None, limit: int = 20):
 @app.get("/api/issues/{issue_id}")
 async def get_issue_detail(issue_id: str):
     """이슈 상세 정보 조회"""
-    if not supabase:
+    if not storage:
         raise HTTPException(status_code=503, detail="데이터베이스 연결이 설정되지 않았습니다. 환경 변수를 확인해주세요.")
     
     try:
-        response = supabase.table('issues').select('*').eq('id', issue_id).execute()
+        issue = storage.get_issue(issue_id)
         
-        if not response.data:
+        if not issue:
             raise HTTPException(status_code=404, detail="이슈를 찾을 수 없습니다")
         
-        issue = response.data[0]
-        
         # 편향성 게이지 생성
         total = issue['bias_left'] + issue['bias_center'] + issue['bias_right']
         left_pct = (issue['bias_left'] / total * 100) if total > 0 else 0
@@ -174,7 +180,7 @@ async def get_issue_detail(issue_id: str):
 @app.get("/api/articles/{issue_id}", response_model=List[ArticleInfo])
 async def get_issue_articles(issue_id: str):
     """이슈별 기사 목록 조회 (bias 포함)"""
-    if not supabase:
+    if not storage:
         raise HTTPException(status_code=503, detail="데이터베이스 연결이 설정되지 않았습니다. 환경 변수를 확인해주세요.")
     
     try:
@@ -183,15 +189,13 @@ async def get_issue_articles(issue_id: str):
             issue_uuid = str(uuid.UUID(issue_id))
         except Exception:
             issue_uuid = issue_id  # fallback: 원본 사용
-        mapping_response = supabase.table('issue_articles').select('article_id').eq('issue_id', issue_uuid).execute()
-        if not mapping_response.data:
+        article_ids = storage.select_issue_article_ids(issue_uuid)
+        if not article_ids:
             return []
-        article_ids = [item['article_id'] for item in mapping_response.data]
         # bias 정보는 issues 테이블에서 가져옴
-        issue_response = supabase.table('issues').select('*').eq('id', issue_uuid).execute()
-        if not issue_response.data:
+        issue = storage.get_issue(issue_uuid)
+        if not issue:
             return []
-        issue = issue_response.data[0]
         bias_left = issue.get('bias_left', 0)
         bias_center = issue.get('bias_center', 0)
         bias_right = issue.get('bias_right', 0)
@@ -199,12 +203,11 @@ async def get_issue_articles(issue_id: str):
         bias_labels = (['left'] * bias_left) + (['center'] * bias_center) + (['right'] * bias_right)
         if len(article_ids) != len(bias_labels):
             bias_labels = ['unknown'] * len(article_ids)
-        articles_response = supabase.table('articles').select('id, title, url, category, published_at, media_outlet_id').in_('id', article_ids).execute()
-        media_response = supabase.table('media_outlets').select('id, name').execute()
-        media_map = {outlet['id']: outlet['name'] for outlet in media_response.data}
+        article_rows = storage.select_articles(['id', 'title', 'url', 'category', 'published_at', 'media_outlet_id'], ids=article_ids)
+        media_map = {outlet['id']: outlet['name'] for outlet in storage.select_media_outlets(['id', 'name'])}
         articles = []
         id_to_bias = {str(aid): bias_labels[idx] for idx, aid in enumerate(article_ids)}
-        for article in articles_response.data:
+        for article in article_rows:
             aid = str(article['id'])
             media_outlet_id = article.get('media_outlet_id')
             if media_outlet_id is None:
@@ -228,33 +231,30 @@ async def get_issue_articles(issue_id: str):
 @app.get("/api/stats", response_model=StatsInfo)
 async def get_stats():
     """전체 통계 정보 조회"""
-    if not supabase:
+    if not storage:
         raise HTTPException(status_code=503, detail="데이터베이스 연결이 설정되지 않았습니다. 환경 변수를 확인해주세요.")
     
+    generation_id = get_current_generation()
     try:
         # 이슈 수
-        issues_response = supabase.table('issues').select('category').execute()
-        total_issues = len(issues_response.data)
+        issue_rows = storage.select_issues(['category'], generation_id=generation_id)
+        total_issues = len(issue_rows)
         
         # 카테고리별 이슈 수
         categories = {}
-        for issue in issues_response.data:
+        for issue in issue_rows:
             cat = issue['category']
             categories[cat] = categories.get(cat, 0) + 1
         
-        # 기사 수
-        articles_response = supabase.table('articles').select('media_outlet_id').execute()
-        total_articles = len(articles_response.data)
-        
-        # 언론사별 기사 수
-        media_response = supabase.table('media_outlets').select('id, name').execute()
-        media_map = {outlet['id']: outlet['name'] for outlet in media_response.data}
+        # 언론사별 기사 수 (기사 행을 가져오지 않고 저장소에서 집계)
+        outlet_counts = storage.count_articles_by_media_outlet()
+        total_articles = sum(outlet_counts.values())
+        media_map = {str(outlet['id']): outlet['name'] for outlet in storage.select_media_outlets(['id', 'name'])}
         
         media_outlets = {}
-        for article in articles_response.data:
-            outlet_id = article['media_outlet_id']
-            outlet_name = media_map.get(outlet_id, 'Unknown')
-            media_outlets[outlet_name] = media_outlets.get(outlet_name, 0) + 1
+        for outlet_id, count in outlet_counts.items():
+            outlet_name = media_map.get(str(outlet_id), 'Unknown')
+            media_outlets[outlet_name] = media_outlets.get(outlet_name, 0) + count
         
         return StatsInfo(
             total_issues=total_issues,
@@ -0,0 +1,97 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from storage import Storage
+
+# PostgREST 기본 최대 행 수(1000)를 넘지 않는 페이지 크기
+DEFAULT_PAGE_SIZE = 1000
+
+
+def window_bounds(window_hours: Optional[float], now: Optional[datetime] = None):
+    """최근 window_hours시간 구간의 시작 시각 (UTC ISO 형식, timestamptz 컬럼과 비교), None이면 전체"""
+    if not window_hours:
+        return None
+    return ((now or datetime.now(timezone.utc)) - timedelta(hours=window_hours)).isoformat()
+
+
+def _parse_time(value: str) -> datetime:
+    """ISO 시각 → UTC 기준 시간대 없는 datetime (시간대 없는 값은 DB와 같이 UTC로 간주)"""
+    parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None) if parsed.tzinfo else parsed
+
+
+def split_range(since: str, until: str, parts: int) -> List[str]:
+    """[since, until) 시간 구간을 parts개로 나누는 경계 시각 목록 (양 끝 포함)"""
+    start, end = _parse_time(since), _parse_time(until)
+    if parts <= 1 or end <= start:
+        return [since, until]
+    step = (end - start) / parts
+    return [since] + [(start + step * i).isoformat() for i in range(1, parts)] + [until]
+
+
+def fetch_range(storage: Storage, columns: Sequence[str], since: Optional[str], until: Optional[str],
+                page_size: int = DEFAULT_PAGE_SIZE) -> List[Dict[str, Any]]:
+    """
+    구간 하나를 마지막 (published_at, id) 커서로 끝까지 페이지 조회
+    서버의 최대 행 수(PostgREST max-rows)가 page_size보다 작으면 모든 페이지가 짧게 오므로 빈 페이지에서만 멈춤
+    """
+    rows: List[Dict[str, Any]] = []
+    after = None
+    while True:
+        page = storage.select_articles_page(columns, since=since, until=until, after=after, limit=page_size)
+        if not page:
+            return rows
+        rows.extend(page)
+        after = (page[-1]['published_at'], page[-1]['id'])
+
+
+def fetch_article_rows(storage: Storage, columns: Sequence[str], since: Optional[str] = None,
+                       until: Optional[str] = None, page_size: int = DEFAULT_PAGE_SIZE,
+                       max_workers: int = 4) -> List[Dict[str, Any]]:
+    """
+    since <= published_at < until 기사를 (published_at, id) 순서로 모두 조회
+    구간을 max_workers개 시간 조각으로 나눠 조각마다 keyset pagination을 동시에 수행
+    (since가 없으면 가장 이른 published_at부터, until이 없으면 마지막 조각은 상한 없음)
+    published_at이 없는 기사는 시간 구간에 속하지 않으므로 조회하지 않고 개수만 알림
+    """
+    missing = storage.count_articles(published_at_missing=True)
+    if missing:
+        print(f"⚠️ published_at이 없는 기사 {missing}개는 조회에서 제외됩니다")
+    if since is None:
+        first = storage.select_articles_page(['published_at', 'id'], until=until, limit=1)
+        if not first:
+            return []
+        since = str(first[0]['published_at'])
+    upper = until or datetime.now(timezone.utc).isoformat()
+    try:
+        bounds = split_range(since, upper, max_workers)
+    except ValueError:
+        # 저장된 시각 형식을 해석할 수 없으면 나누지 않고 한 번에 페이지 조회
+        bounds = [since, upper]
+    # 마지막 조각은 until이 없으면 상한 없이 (현재 시각 이후로 기록된 기사 포함)
+    ranges = list(zip(bounds[:-1], bounds[1:-1] + [until]))
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(ranges)))) as executor:
+        pages = list(executor.map(lambda r: fetch_range(storage, columns, r[0], r[1], page_size), ranges))
+    return [row for rows in pages for row in rows]
+
+
+def article_frame(rows: List[Dict[str, Any]], columns: Sequence[str]) -> pd.DataFrame:
+    """
+    조회한 행을 타입이 정해진 DataFrame으로 변환
+    id/url/title/media_outlet_id: 문자열, category: category, published_at: datetime(UTC), content_length: Int32
+    """
+    columns = list(columns) + [col for col in ('published_at', 'id') if col not in columns]
+    df = pd.DataFrame.from_records(rows, columns=columns)
+    for col in ('id', 'url', 'title', 'media_outlet_id'):
+        if col in df:
+            df[col] = df[col].map(lambda value: value if value is None else str(value))
+    if 'category' in df:
+        df['category'] = df['category'].astype('category')
+    if 'published_at' in df:
+        df['published_at'] = pd.to_datetime(df['published_at'], utc=True, errors='coerce', format='ISO8601')
+    if 'content_length' in df:
+        df['content_length'] = pd.to_numeric(df['content_length'], errors='coerce').astype('Int32')
+    return df
@@ -0,0 +1,184 @@
+import asyncio
+import re
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from openai import AsyncOpenAI
+
+from embedding_store import EMBEDDING_DIM, decode_base64_embeddings
+from token_budget import count_tokens
+
+# 요청당 토큰/입력 수 상한 (API 제한: 요청당 300k 토큰, 2048개 입력)
+MAX_BATCH_TOKENS = 100_000
+MAX_BATCH_ITEMS = 1024
+
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|s|m|h)')
+_DURATION_UNITS = {'ms': 0.001, 's': 1.0, 'm': 60.0, 'h': 3600.0}
+
+
+def parse_reset_duration(value: Optional[str]) -> float:
+    """'1s', '6m0s', '20ms' 형식의 x-ratelimit-reset-* 값을 초 단위로 변환"""
+    if not value:
+        return 0.0
+    return sum(float(num) * _DURATION_UNITS[unit] for num, unit in _DURATION_PART.findall(value))
+
+
+class RateLimitGovernor:
+    """
+    응답 헤더(x-ratelimit-*)로 남은 요청/토큰 수를 추적해서
+    한도가 부족하면 리셋 시각까지 기다렸다가 요청을 보내게 하는 조절기
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self.remaining_requests: Optional[int] = None
+        self.remaining_tokens: Optional[int] = None
+        self.requests_reset_at = 0.0
+        self.tokens_reset_at = 0.0
+
+    async def acquire(self, tokens: int):
+        while True:
+            async with self._lock:
+                now = time.monotonic()
+                # 리셋 시각이 지나면 다음 응답 헤더가 올 때까지 제한 없음
+                if now >= self.requests_reset_at:
+                    self.remaining_requests = None
+                if now >= self.tokens_reset_at:
+                    self.remaining_tokens = None
+                requests_ok = self.remaining_requests is None or self.remaining_requests > 0
+                tokens_ok = self.remaining_tokens is None or self.remaining_tokens >= tokens
+                if requests_ok and tokens_ok:
+                    if self.remaining_requests is not None:
+                        self.remaining_requests -= 1
+                    if self.remaining_tokens is not None:
+                        self.remaining_tokens -= tokens
+                    return
+                wait = max(
+                    0.0 if requests_ok else self.requests_reset_at - now,
+                    0.0 if tokens_ok else self.tokens_reset_at - now,
+                )
+            await asyncio.sleep(max(wait, 0.05))
+
+    def update(self, headers):
+        now = time.monotonic()
+        remaining_requests = headers.get('x-ratelimit-remaining-requests')
+        remaining_tokens = headers.get('x-ratelimit-remaining-tokens')
+        if remaining_requests is not None:
+            self.remaining_requests = int(remaining_requests)
+            self.requests_reset_at = now + parse_reset_duration(headers.get('x-ratelimit-reset-requests'))
+        if remaining_tokens is not None:
+            self.remaining_tokens = int(remaining_tokens)
+            self.tokens_reset_at = now + parse_reset_duration(headers.get('x-ratelimit-reset-tokens'))
+
+
+def pack_batches(token_counts: Sequence[int], max_tokens: int = MAX_BATCH_TOKENS,
+                 max_items: int = MAX_BATCH_ITEMS) -> List[List[int]]:
+    """입력 순서대로 토큰 합이 max_tokens를 넘지 않게 인덱스 묶음 생성"""
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+    for i, count in enumerate(token_counts):
+        if current and (current_tokens + count > max_tokens or len(current) >= max_items):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(i)
+        current_tokens += count
+    if current:
+        batches.append(current)
+    return batches
+
+
+def is_input_error(error: BaseException) -> bool:
+    """batch 안의 특정 입력 때문에 난 오류인지 (400대 요청 오류, 토큰 한도 초과) → 나눠 보내야 해결됨"""
+    status = getattr(error, 'status_code', None)
+    return status in (400, 413, 422) or 'maximum context length' in str(error)
+
+
+class AsyncEmbedder:
+    """
+    임베딩 요청을 토큰 수 기준으로 묶어 여러 개를 동시에 보내는 asyncio 클라이언트
+    - 동시 요청 수는 max_concurrency, 속도는 RateLimitGovernor가 응답 헤더로 조절
+    - 실패한 batch는 먼저 batch 그대로 지수 백오프로 재시도 (429/timeout/네트워크 오류는 batch 전체 문제)
+    - 입력 때문에 난 오류(400, 토큰 한도)만 절반씩 나눠 다시 보내 문제 항목을 격리, 끝까지 실패한 항목은 ok=False
+    - dimensions를 주면 API가 그 차원으로 줄인(정규화된) 임베딩을 반환
+    """
+
+    def __init__(self, api_key: str, model: str = "text-embedding-3-small", dim: int = EMBEDDING_DIM,
+                 max_concurrency: int = 4, max_retries: int = 4, max_batch_tokens: int = MAX_BATCH_TOKENS,
+                 dimensions: Optional[int] = None):
+        self.api_key = api_key
+        self.model = model
+        self.dimensions = dimensions
+        self.dim = dimensions or dim
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.max_batch_tokens = max_batch_tokens
+
+    def count_tokens(self, texts: Sequence[str]) -> List[int]:
+        return count_tokens(texts)
+
+    async def _request(self, client: AsyncOpenAI, governor: RateLimitGovernor,
+                       texts: List[str], tokens: int) -> np.ndarray:
+        await governor.acquire(tokens)
+        # dimensions 인자는 openai 1.10부터 지원하므로 요청 본문으로 직접 전달 (고정 버전 1.7에서도 동작)
+        extra = {'extra_body': {'dimensions': self.dimensions}} if self.dimensions else {}
+        raw = await client.embeddings.with_raw_response.create(
+            input=texts, model=self.model, encoding_format="base64", **extra
+        )
+        governor.update(raw.headers)
+        data = sorted(raw.parse().data, key=lambda item: item.index)
+        return decode_base64_embeddings([item.embedding for item in data], self.dim)
+
+    async def _embed_batch(self, client, governor, semaphore, texts, token_counts, batch,
+                           out: np.ndarray, ok: np.ndarray):
+        error = None
+        for attempt in range(self.max_retries):
+            async with semaphore:
+                try:
+                    out[batch] = await self._request(client, governor, [texts[i] for i in batch],
+                                                     sum(token_counts[i] for i in batch))
+                    ok[batch] = True
+                    return
+                except Exception as e:
+                    error = e
+            if is_input_error(error):
+                break
+            # 마지막 시도 뒤에는 기다리지 않고 바로 실패 처리
+            if attempt < self.max_retries - 1:
+                await asyncio.sleep(2 ** attempt)
+        if not is_input_error(error) or len(batch) == 1:
+            print(f"❌ 임베딩 실패({len(batch)}개): {error}")
+            return
+        mid = len(batch) // 2
+        print(f"⚠️ 임베딩 입력 오류, {mid}/{len(batch) - mid}개로 나눠 재시도: {error}")
+        await asyncio.gather(
+            self._embed_batch(client, governor, semaphore, texts, token_counts, batch[:mid], out, ok),
+            self._embed_batch(client, governor, semaphore, texts, token_counts, batch[mid:], out, ok),
+        )
+
+    async def embed(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """texts 임베딩 → ((n, dim) float32 행렬, 성공 여부 마스크)"""
+        texts = list(texts)
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        ok = np.zeros(len(texts), dtype=bool)
+        if not texts:
+            return out, ok
+        token_counts = self.count_tokens(texts)
+        batches = pack_batches(token_counts, self.max_batch_tokens)
+        print(f"   🚀 임베딩 요청: {len(texts)}개 텍스트, {sum(token_counts)} 토큰, {len(batches)}개 batch")
+        governor = RateLimitGovernor()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        client = AsyncOpenAI(api_key=self.api_key)
+        try:
+            await asyncio.gather(*(
+                self._embed_batch(client, governor, semaphore, texts, token_counts, batch, out, ok)
+                for batch in batches
+            ))
+        finally:
+            await client.close()
+        return out, ok
+
+    def embed_sync(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        return asyncio.run(self.embed(texts))
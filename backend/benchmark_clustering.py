@@ -0,0 +1,161 @@
+import argparse
+import ast
+import glob
+import json
+import os
+import time
+import tracemalloc
+
+import numpy as np
+from sklearn.metrics import adjusted_rand_score, normalized_mutual_info_score
+
+from cluster_engines import ENGINES
+from embedding_reduction import create_reducer
+
+# main_cluster는 import 시 OPENAI_API_KEY 확인과 저장소 연결을 하므로 실제로 실행할 때만 import
+
+
+def load_saved_labels(path):
+    """저장된 *_final.json 결과 → {기사 id: 클러스터 번호} (클러스터에 속한 기사만)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        clusters = json.load(f).get('clusters', [])
+    labels = {}
+    for k, cluster in enumerate(clusters):
+        article_ids = cluster.get('article_ids') or []
+        # 예전 결과는 article_ids가 리스트의 문자열 표현으로 저장됨
+        if isinstance(article_ids, str):
+            article_ids = ast.literal_eval(article_ids)
+        for article_id in article_ids:
+            labels[str(article_id)] = k
+    return labels
+
+
+def agreement(labels, reference):
+    """두 라벨의 ARI/NMI (noise -1도 하나의 그룹으로 취급)"""
+    if len(labels) == 0:
+        return None, None
+    return (float(adjusted_rand_score(reference, labels)),
+            float(normalized_mutual_info_score(reference, labels)))
+
+
+def timed_cluster(embeddings, valid, eps, min_samples, engine):
+    """(라벨, 실행 시간(초), 최대 메모리(MB)) — agglomerative는 이웃 그래프 계산 시간까지 포함"""
+    from main_cluster import cluster_embeddings, category_neighbor_graph
+    tracemalloc.start()
+    started = time.perf_counter()
+    graph = category_neighbor_graph(embeddings, valid, eps) if engine == 'agglomerative' else None
+    labels = cluster_embeddings(embeddings, eps=eps, min_samples=min_samples, valid=valid, graph=graph, engine=engine)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return labels, elapsed, peak / 1024 / 1024
+
+
+def run_benchmark(engines, eps=0.3, min_samples=3, saved_path=None, reduction=None):
+    """
+    카테고리별로 engine마다 클러스터링 시간, 최대 메모리(tracemalloc), 클러스터/noise 수와
+    같은 데이터의 DBSCAN 결과·저장된 결과 파일과의 일치도(ARI/NMI)를 계산
+    reduction('pca:256' 등)을 주면 품질 확인 모드: 같은 engine을 축소 임베딩으로도 실행해 시간/메모리와
+    전체 차원 결과와의 일치도(ARI/NMI)를 함께 기록
+    """
+    from main_cluster import fetch_articles, embed_articles, cluster_embeddings
+    df = fetch_articles()
+    df, store, cat_slices = embed_articles(df)
+    reduced_store = None
+    reducer = create_reducer(reduction)
+    if reducer is not None:
+        # df는 이미 category로 정렬돼 있으므로 (stable 정렬) 행 순서가 같음
+        _, reduced_store, _ = embed_articles(df, reducer=reducer)
+    saved = load_saved_labels(saved_path) if saved_path else {}
+    if saved_path:
+        print(f"📂 비교할 저장 결과: {saved_path} (클러스터 기사 {len(saved)}개)")
+    rows_out = []
+    for category, rows in cat_slices.items():
+        embeddings, valid = store.view(rows)
+        article_ids = df['id'].astype(str).to_numpy()[rows]
+        baseline = cluster_embeddings(embeddings, eps=eps, min_samples=min_samples, valid=valid)
+        # 저장 결과와 겹치는 기사만 비교 (저장 결과에 없는 기사는 noise였거나 이후 수집된 기사)
+        overlap = np.array([article_id in saved for article_id in article_ids], dtype=bool)
+        saved_labels = np.array([saved[article_id] for article_id in article_ids[overlap]], dtype=np.int64)
+        for engine in engines:
+            labels, elapsed, peak_mb = timed_cluster(embeddings, valid, eps, min_samples, engine)
+            ari, nmi = agreement(labels, baseline)
+            saved_ari, saved_nmi = agreement(labels[overlap], saved_labels)
+            row = {
+                'category': category,
+                'engine': engine,
+                'n_total': len(labels),
+                'n_clusters': len(set(labels.tolist()) - {-1}),
+                'n_noise': int((labels == -1).sum()),
+                'seconds': elapsed,
+                'peak_mb': peak_mb,
+                'ari_dbscan': ari,
+                'nmi_dbscan': nmi,
+                'n_saved_overlap': int(overlap.sum()),
+                'ari_saved': saved_ari,
+                'nmi_saved': saved_nmi,
+            }
+            if reduced_store is not None:
+                reduced_embeddings, reduced_valid = reduced_store.view(rows)
+                reduced_labels, reduced_elapsed, reduced_peak_mb = timed_cluster(
+                    reduced_embeddings, reduced_valid, eps, min_samples, engine)
+                full_ari, full_nmi = agreement(reduced_labels, labels)
+                row.update({
+                    'reduction': reduction,
+                    'reduced_dim': reduced_store.dim,
+                    'reduced_n_clusters': len(set(reduced_labels.tolist()) - {-1}),
+                    'reduced_seconds': reduced_elapsed,
+                    'reduced_peak_mb': reduced_peak_mb,
+                    'ari_full': full_ari,
+                    'nmi_full': full_nmi,
+                })
+            rows_out.append(row)
+    return rows_out
+
+
+def format_table(rows):
+    fmt = lambda value: '-' if value is None else f"{value:.3f}"
+    lines = ["| category | engine | clusters | noise | total | sec | peak MB | ARI/NMI vs DBSCAN | saved overlap | ARI/NMI vs saved |",
+             "|----------|--------|----------|-------|-------|-----|---------|-------------------|---------------|------------------|"]
+    for r in rows:
+        lines.append(f"| {r['category']} | {r['engine']} | {r['n_clusters']} | {r['n_noise']} | {r['n_total']} | "
+                     f"{r['seconds']:.2f} | {r['peak_mb']:.1f} | {fmt(r['ari_dbscan'])}/{fmt(r['nmi_dbscan'])} | "
+                     f"{r['n_saved_overlap']} | {fmt(r['ari_saved'])}/{fmt(r['nmi_saved'])} |")
+    return "\n".join(lines)
+
+
+def format_reduction_table(rows):
+    """품질 확인 모드: 전체 차원 대비 축소 임베딩의 시간/메모리/일치도"""
+    fmt = lambda value: '-' if value is None else f"{value:.3f}"
+    lines = ["| category | engine | dim | clusters (full → reduced) | sec (full → reduced) | peak MB (full → reduced) | ARI/NMI vs full |",
+             "|----------|--------|-----|---------------------------|----------------------|--------------------------|-----------------|"]
+    for r in rows:
+        lines.append(f"| {r['category']} | {r['engine']} | {r['reduced_dim']} | {r['n_clusters']} → {r['reduced_n_clusters']} | "
+                     f"{r['seconds']:.2f} → {r['reduced_seconds']:.2f} | {r['peak_mb']:.1f} → {r['reduced_peak_mb']:.1f} | "
+                     f"{fmt(r['ari_full'])}/{fmt(r['nmi_full'])} |")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='클러스터링 방식별 시간/메모리/일치도 비교')
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=list(ENGINES))
+    parser.add_argument('--eps', type=float, default=0.3)
+    parser.add_argument('--min-samples', type=int, default=3)
+    parser.add_argument('--saved', default=None, help='비교할 *_final.json (기본: backend/results의 최신 파일)')
+    parser.add_argument('--reduce', default=None, metavar='METHOD:DIM',
+                        help='품질 확인 모드: 축소 임베딩(api:256, pca:256, random:256) 결과를 전체 차원 결과와 비교')
+    parser.add_argument('--output', default=None, help='결과를 저장할 JSON 경로')
+    args = parser.parse_args()
+    saved_path = args.saved
+    if saved_path is None:
+        saved_files = sorted(glob.glob(os.path.join("backend/results", '*_final.json')), key=os.path.getmtime, reverse=True)
+        saved_path = saved_files[0] if saved_files else None
+    results = run_benchmark(args.engines, eps=args.eps, min_samples=args.min_samples, saved_path=saved_path,
+                            reduction=args.reduce)
+    print("\n" + format_table(results))
+    if args.reduce:
+        print("\n" + format_reduction_table(results))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n✅ 벤치마크 결과가 {args.output}에 저장되었습니다!")
@@ -0,0 +1,99 @@
+from typing import Optional
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+from sklearn.cluster import DBSCAN, AgglomerativeClustering, HDBSCAN
+from sklearn.decomposition import PCA
+
+from embedding_store import normalize_rows
+from neighbor_graph import radius_neighbor_graph
+
+# cluster_embeddings(engine=...)로 고를 수 있는 클러스터링 방식
+ENGINES = ('dbscan', 'hdbscan', 'agglomerative')
+
+
+def reduce_dimensions(vectors: np.ndarray, n_components: int = 32, random_state: int = 42) -> np.ndarray:
+    """
+    PCA로 차원 축소 후 다시 정규화 (정규화 벡터의 유클리드 거리는 cosine 거리와 단조 관계)
+    밀도 기반 HDBSCAN이 고차원에서 거리 차이를 구분하지 못하는 문제를 줄이기 위해 사용
+    """
+    vectors = normalize_rows(vectors)
+    n_components = min(n_components, len(vectors), vectors.shape[1])
+    if n_components < 2:
+        return vectors
+    return normalize_rows(PCA(n_components=n_components, random_state=random_state).fit_transform(vectors))
+
+
+def small_clusters_to_noise(labels: np.ndarray, min_size: int) -> np.ndarray:
+    """min_size보다 작은 클러스터는 noise(-1)로 바꾸고 나머지 번호를 0부터 다시 매김"""
+    labels = np.asarray(labels).copy()
+    values, counts = np.unique(labels[labels != -1], return_counts=True)
+    small = values[counts < min_size]
+    labels[np.isin(labels, small)] = -1
+    kept = np.unique(labels[labels != -1])
+    remap = {old: new for new, old in enumerate(kept.tolist())}
+    return np.array([remap.get(label, -1) for label in labels.tolist()], dtype=np.int64)
+
+
+def run_dbscan(vectors: np.ndarray, eps: float, min_samples: int,
+               graph: Optional[sparse.csr_matrix] = None) -> np.ndarray:
+    if graph is not None:
+        return DBSCAN(eps=eps, min_samples=min_samples, metric='precomputed').fit_predict(graph)
+    return DBSCAN(eps=eps, min_samples=min_samples, metric='cosine').fit_predict(vectors)
+
+
+def run_hdbscan(vectors: np.ndarray, eps: float, min_samples: int,
+                graph: Optional[sparse.csr_matrix] = None, n_components: int = 32) -> np.ndarray:
+    """
+    차원 축소한 벡터로 HDBSCAN (클러스터마다 밀도가 달라도 되므로 eps 탐색이 필요 없음)
+    희소 이웃 그래프는 연결 요소가 여러 개면 HDBSCAN에 쓸 수 없어서 사용하지 않음
+    """
+    if len(vectors) < max(min_samples, 2):
+        return np.full(len(vectors), -1, dtype=np.int64)
+    reduced = reduce_dimensions(vectors, n_components)
+    return HDBSCAN(min_cluster_size=max(min_samples, 2), min_samples=min_samples, copy=True).fit_predict(reduced)
+
+
+def run_agglomerative(vectors: np.ndarray, eps: float, min_samples: int,
+                      graph: Optional[sparse.csr_matrix] = None) -> np.ndarray:
+    """
+    cosine average linkage 병합을 거리 eps에서 멈추는 계층 클러스터링
+    이웃 그래프(radius >= eps)를 connectivity로 써서 이웃끼리만 병합하고, 그래프의 연결 요소마다 따로 실행
+    (요소 사이를 억지로 잇는 sklearn의 보정이 전체 거리 계산이라 매우 느림), min_samples 미만 클러스터는 noise
+    """
+    n = len(vectors)
+    labels = np.full(n, -1, dtype=np.int64)
+    if n < 2:
+        return labels
+    if graph is None:
+        graph = radius_neighbor_graph(vectors, eps)
+    vectors = normalize_rows(vectors)
+    n_components, component = connected_components(graph, directed=False)
+    sizes = np.bincount(component, minlength=n_components)
+    next_label = 0
+    for c in np.flatnonzero(sizes >= max(min_samples, 2)):
+        rows = np.flatnonzero(component == c)
+        connectivity = graph[rows][:, rows].copy()
+        # 거리 0(중복 기사) 간선도 연결로 취급
+        connectivity.data[:] = 1
+        sub_labels = AgglomerativeClustering(n_clusters=None, distance_threshold=eps, linkage='average',
+                                             metric='cosine', connectivity=connectivity).fit_predict(vectors[rows])
+        labels[rows] = sub_labels + next_label
+        next_label += int(sub_labels.max()) + 1
+    return small_clusters_to_noise(labels, min_samples)
+
+
+_RUNNERS = {
+    'dbscan': run_dbscan,
+    'hdbscan': run_hdbscan,
+    'agglomerative': run_agglomerative,
+}
+
+
+def run_engine(engine: str, vectors: np.ndarray, eps: float, min_samples: int,
+               graph: Optional[sparse.csr_matrix] = None) -> np.ndarray:
+    """engine으로 클러스터링한 라벨 (noise는 -1)"""
+    if engine not in _RUNNERS:
+        raise ValueError(f"지원하지 않는 클러스터링 방식: {engine} (가능: {', '.join(ENGINES)})")
+    return np.asarray(_RUNNERS[engine](vectors, eps, min_samples, graph=graph), dtype=np.int64)
@@ -0,0 +1,100 @@
+import math
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import silhouette_score
+
+BIAS_GROUPS = ['left', 'center', 'right']
+
+
+def bias_spread(labels: np.ndarray, biases: Sequence[Optional[str]]) -> Optional[float]:
+    """
+    클러스터별 편향(left/center/right) 분포의 정규화 엔트로피 평균
+    0이면 모든 클러스터가 한쪽 언론만, 1이면 세 성향이 고르게 섞임 (클러스터가 없으면 None)
+    """
+    frame = pd.DataFrame({'label': labels, 'bias': list(biases)})
+    frame = frame[(frame['label'] != -1) & frame['bias'].isin(BIAS_GROUPS)]
+    if frame.empty:
+        return None
+    counts = pd.crosstab(frame['label'], frame['bias']).to_numpy(dtype=np.float64)
+    p = counts / counts.sum(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        entropy = -np.where(p > 0, p * np.log(p), 0.0).sum(axis=1)
+    return float(entropy.mean() / math.log(len(BIAS_GROUPS)))
+
+
+def sampled_silhouette(embeddings: np.ndarray, labels: np.ndarray, sample_size: int = 500,
+                       random_state: int = 42) -> Optional[float]:
+    """
+    noise를 뺀 기사 중 최대 sample_size개로 계산한 cosine silhouette (클러스터가 2개 미만이면 None)
+    샘플은 직접 뽑고, 큰 클러스터 하나만 뽑히면 다른 클러스터 기사 하나로 바꿔 라벨이 2개 이상이 되게 함
+    """
+    labels = np.asarray(labels)
+    clustered = np.flatnonzero(labels != -1)
+    if len(set(labels[clustered].tolist())) < 2 or len(clustered) < 3:
+        return None
+    rows = clustered
+    if len(rows) > sample_size:
+        rng = np.random.default_rng(random_state)
+        rows = rng.choice(clustered, sample_size, replace=False)
+        present = np.unique(labels[rows])
+        if len(present) < 2:
+            rows[0] = rng.choice(clustered[labels[clustered] != present[0]])
+    # silhouette는 2 ≤ 라벨 수 ≤ 샘플 수 - 1에서만 정의됨 (작은 클러스터가 아주 많으면 None)
+    n_labels = len(np.unique(labels[rows]))
+    if n_labels < 2 or n_labels >= len(rows):
+        return None
+    return float(silhouette_score(embeddings[rows], labels[rows], metric='cosine'))
+
+
+def evaluate_clustering(embeddings: np.ndarray, labels: np.ndarray, biases: Sequence[Optional[str]],
+                        sample_size: int = 500) -> Dict[str, Any]:
+    """LLM 호출 없이 계산하는 카테고리별 클러스터링 품질 지표"""
+    labels = np.asarray(labels)
+    n_total = len(labels)
+    n_noise = int((labels == -1).sum())
+    n_clusters = len(set(labels.tolist()) - {-1})
+    return {
+        'n_clusters': n_clusters,
+        'n_noise': n_noise,
+        'n_total': n_total,
+        'noise_ratio': n_noise / n_total if n_total else 0.0,
+        'silhouette': sampled_silhouette(embeddings, labels, sample_size),
+        'bias_spread': bias_spread(labels, biases),
+    }
+
+
+def summarize_metrics(meta: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    카테고리별 지표를 조합 전체 지표로 합산
+    - silhouette: 클러스터에 속한 기사 수 가중 평균, bias_spread: 클러스터 수 가중 평균
+    - score = silhouette × (1 - noise_ratio) (클러스터가 잘 분리되면서 많은 기사를 덮는 조합 우선)
+    """
+    n_total = sum(m['n_total'] for m in meta)
+    n_noise = sum(m['n_noise'] for m in meta)
+    n_clusters = sum(m['n_clusters'] for m in meta)
+    scored = [(m['silhouette'], m['n_total'] - m['n_noise']) for m in meta if m['silhouette'] is not None]
+    silhouette = sum(s * w for s, w in scored) / sum(w for _, w in scored) if scored and sum(w for _, w in scored) else None
+    spread = [(m['bias_spread'], m['n_clusters']) for m in meta if m['bias_spread'] is not None]
+    spread_value = sum(s * w for s, w in spread) / sum(w for _, w in spread) if spread and sum(w for _, w in spread) else None
+    noise_ratio = n_noise / n_total if n_total else 0.0
+    return {
+        'n_clusters': n_clusters,
+        'n_noise': n_noise,
+        'n_total': n_total,
+        'noise_ratio': noise_ratio,
+        'silhouette': silhouette,
+        'bias_spread': spread_value,
+        'score': silhouette * (1.0 - noise_ratio) if silhouette is not None else None,
+    }
+
+
+def select_best(results: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """score가 가장 높은 grid 결과 (score가 모두 없으면 클러스터 수가 가장 많은 결과)"""
+    if not results:
+        return None
+    scored = [r for r in results if r['overall']['score'] is not None]
+    if scored:
+        return max(scored, key=lambda r: r['overall']['score'])
+    return max(results, key=lambda r: r['overall']['n_clusters'])
@@ -0,0 +1,262 @@
+import hashlib
+import json
+import os
+import re
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from quantized_store import quantize_rows, search_quantized
+
+try:
+    import fcntl
+except ImportError:  # Windows: 쓰기 락 없이 동작
+    fcntl = None
+
+# 기본 캐시 위치 (backend/.embedding_cache/)
+DEFAULT_CACHE_DIR = Path(__file__).parent / '.embedding_cache'
+# 임베딩 입력 길이 제한 (제목 + 본문 앞부분)
+MAX_EMBED_CHARS = 3000
+
+
+def embedding_text(title: str, content: Optional[str]) -> str:
+    """기사 임베딩 입력 텍스트 (main_cluster의 df['text']와 같은 규칙)"""
+    return (f"{title}\n{content or ''}")[:MAX_EMBED_CHARS]
+
+
+def text_key(text: str) -> str:
+    """임베딩 입력 텍스트(최대 3000자)의 sha256 (업로드 시 articles.text_hash로도 저장)"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    (모델, 텍스트 sha256) → 임베딩 벡터를 디스크에 보관하는 캐시
+
+    모델별로 float32 행렬 파일(.f32, memmap으로 읽음)과 인덱스 파일(.index.json)을 둔다.
+    API에 dimensions(짧은 임베딩)를 지정한 경우 차원별로 파일을 따로 둔다.
+    - 행렬 파일은 뒤에 덧붙이기만 하고, 인덱스는 임시 파일 교체로 원자적으로 갱신하므로
+      읽는 쪽은 락 없이 자신이 읽은 인덱스의 행 수만큼만 안전하게 읽을 수 있다.
+    - 쓰기(save/evict)는 락 파일로 한 프로세스씩만 수행한다.
+    - evict는 활성 기사에 없는 항목을 빼고 새 행렬 파일로 압축한다.
+      교체된 행렬 파일은 바로 지우지 않고 다음 evict 때 지우므로, evict 직전에 인덱스를 읽은 프로세스도
+      그 행렬을 열 수 있다 (그 사이 두 번 교체되어 파일이 없으면 load가 최신 인덱스로 다시 읽음).
+    - 행렬마다 int8 양자화 사본(.i8)과 행별 scale(.s32)을 같은 방식으로 덧붙여 두고 memmap으로 읽는다.
+      search는 int8 사본으로 후보를 고르고 float32 행렬에서는 후보 행만 읽어 다시 정렬한다.
+    """
+
+    def __init__(self, model: str, cache_dir: Optional[str] = None, dimensions: Optional[int] = None):
+        self.model = model
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        safe_model = re.sub(r'[^\w.-]', '_', model) + (f'.d{dimensions}' if dimensions else '')
+        self.index_path = self.cache_dir / f'{safe_model}.index.json'
+        self.lock_path = self.cache_dir / f'{safe_model}.lock'
+        self.safe_model = safe_model
+        self.dim: Optional[int] = None
+        self.matrix_name: Optional[str] = None
+        self.keys: List[str] = []
+        self.key_to_row: Dict[str, int] = {}
+        self.matrix: Optional[np.ndarray] = None
+        self.codes: Optional[np.ndarray] = None
+        self.scales: Optional[np.ndarray] = None
+        self._pending: Dict[str, np.ndarray] = {}
+        self.load()
+
+    def _read_index(self) -> dict:
+        if not self.index_path.exists():
+            return {'dim': None, 'matrix': None, 'previous': None, 'keys': []}
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def load(self, retries: int = 3):
+        """인덱스와 행렬을 다시 읽음 (행렬과 양자화 사본은 read-only memmap)"""
+        for attempt in range(retries):
+            index = self._read_index()
+            matrix = None
+            if index['keys'] and index['matrix']:
+                try:
+                    matrix = np.memmap(self.cache_dir / index['matrix'], dtype=np.float32, mode='r',
+                                       shape=(len(index['keys']), index['dim']))
+                except FileNotFoundError:
+                    # 인덱스를 읽은 뒤 다른 프로세스의 evict가 행렬을 교체했으면 새 인덱스로 다시 읽음
+                    if attempt == retries - 1:
+                        raise
+                    continue
+            break
+        self.dim = index['dim']
+        self.matrix_name = index['matrix']
+        self.keys = index['keys']
+        self.key_to_row = {key: row for row, key in enumerate(self.keys)}
+        self.matrix = matrix
+        self.codes = self.scales = None
+        if matrix is not None:
+            n = len(self.keys)
+            codes_path, scales_path = self._quantized_paths(self.matrix_name)
+            # 이전 버전 캐시처럼 양자화 사본이 모자라면 search 때 채움
+            try:
+                if codes_path.stat().st_size >= n * self.dim and scales_path.stat().st_size >= n * 4:
+                    self.codes = np.memmap(codes_path, dtype=np.int8, mode='r', shape=(n, self.dim))
+                    self.scales = np.memmap(scales_path, dtype=np.float32, mode='r', shape=(n,))
+            except FileNotFoundError:
+                pass
+
+    def _quantized_paths(self, matrix_name: str):
+        stem = matrix_name[:-len('.f32')] if matrix_name.endswith('.f32') else matrix_name
+        return self.cache_dir / f'{stem}.i8', self.cache_dir / f'{stem}.s32'
+
+    def _sync_quantized(self, matrix_name: str, n_rows: int, dim: int, block_rows: int = 4096):
+        """양자화 사본을 행렬 파일의 앞 n_rows행까지 채움 (이미 있는 행 뒤부터 이어 씀, 쓰기 락 안에서 호출)"""
+        codes_path, scales_path = self._quantized_paths(matrix_name)
+        done = 0
+        if codes_path.exists() and scales_path.exists():
+            done = min(codes_path.stat().st_size // dim, scales_path.stat().st_size // 4, n_rows)
+        if done >= n_rows:
+            return
+        matrix = np.memmap(self.cache_dir / matrix_name, dtype=np.float32, mode='r', shape=(n_rows, dim))
+        with open(codes_path, 'r+b' if codes_path.exists() else 'wb') as codes_file, \
+                open(scales_path, 'r+b' if scales_path.exists() else 'wb') as scales_file:
+            codes_file.seek(done * dim)
+            scales_file.seek(done * 4)
+            for start in range(done, n_rows, block_rows):
+                codes, scales = quantize_rows(np.asarray(matrix[start:start + block_rows]))
+                codes_file.write(codes.tobytes())
+                scales_file.write(scales.tobytes())
+            for f in (codes_file, scales_file):
+                f.truncate()
+                f.flush()
+                os.fsync(f.fileno())
+        del matrix
+
+    def _remove_matrix_files(self, matrix_name: str):
+        for path in (self.cache_dir / matrix_name, *self._quantized_paths(matrix_name)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def __len__(self):
+        return len(self.keys) + len(self._pending)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.key_to_row or key in self._pending
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        row = self.key_to_row.get(key)
+        if row is not None:
+            return self.matrix[row]
+        return self._pending.get(key)
+
+    def lookup_rows(self, keys: Sequence[str]) -> np.ndarray:
+        """keys의 저장된 행 번호 배열 (없으면 -1), matrix[rows]로 한 번에 꺼낼 수 있음"""
+        return np.fromiter((self.key_to_row.get(key, -1) for key in keys), dtype=np.int64, count=len(keys))
+
+    def put(self, key: str, vector: Iterable[float]):
+        """새 벡터 추가 (save 전까지 메모리에 보관)"""
+        self._pending[key] = np.asarray(vector, dtype=np.float32)
+
+    @contextmanager
+    def _write_lock(self):
+        with open(self.lock_path, 'w') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write_index(self, dim: int, matrix_name: str, keys: List[str], previous: Optional[str] = None):
+        tmp_path = self.index_path.with_suffix(f'.{uuid.uuid4().hex}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'model': self.model, 'dim': dim, 'matrix': matrix_name, 'previous': previous,
+                       'keys': keys}, f)
+        os.replace(tmp_path, self.index_path)
+
+    def save(self):
+        """추가된 벡터를 행렬 파일 끝에 덧붙이고 인덱스 갱신"""
+        if not self._pending:
+            return
+        with self._write_lock():
+            # 다른 프로세스가 먼저 저장했을 수 있으므로 최신 인덱스 기준으로 병합
+            index = self._read_index()
+            keys = index['keys']
+            known = set(keys)
+            new_items = [(key, vec) for key, vec in self._pending.items() if key not in known]
+            if new_items:
+                dim = index['dim'] or len(new_items[0][1])
+                matrix_name = index['matrix'] or f'{self.safe_model}.{uuid.uuid4().hex}.f32'
+                block = np.stack([vec for _, vec in new_items]).astype(np.float32, copy=False)
+                with open(self.cache_dir / matrix_name, 'r+b' if index['matrix'] else 'wb') as f:
+                    # 인덱스에 기록된 행 뒤부터 이어 쓰기 (중단된 쓰기의 잔여 바이트는 덮어씀)
+                    f.seek(len(keys) * dim * 4)
+                    f.write(block.tobytes())
+                    f.truncate()
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._sync_quantized(matrix_name, len(keys) + len(new_items), dim)
+                self._write_index(dim, matrix_name, keys + [key for key, _ in new_items], index.get('previous'))
+        self._pending = {}
+        self.load()
+
+    def evict(self, active_keys: Iterable[str]) -> int:
+        """활성 기사 텍스트에 없는 항목 삭제 후 행렬 압축, 삭제된 항목 수 반환"""
+        self.save()
+        active = set(active_keys)
+        with self._write_lock():
+            self.load()
+            keep_rows = [row for row, key in enumerate(self.keys) if key in active]
+            removed = len(self.keys) - len(keep_rows)
+            if removed == 0:
+                return 0
+            old_matrix = self.matrix_name
+            retired = self._read_index().get('previous')
+            new_matrix = f'{self.safe_model}.{uuid.uuid4().hex}.f32'
+            if keep_rows:
+                data = np.asarray(self.matrix[keep_rows], dtype=np.float32)
+                with open(self.cache_dir / new_matrix, 'wb') as f:
+                    f.write(data.tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._sync_quantized(new_matrix, len(keep_rows), self.dim)
+            self._write_index(self.dim, new_matrix if keep_rows else None, [self.keys[row] for row in keep_rows],
+                              old_matrix)
+            # 방금 교체한 행렬은 다음 evict까지 남기고, 그 전에 교체된 행렬만 삭제
+            # (이미 열어 둔 읽기 프로세스는 삭제 후에도 기존 매핑으로 계속 읽을 수 있음, POSIX)
+            self.matrix = self.codes = self.scales = None
+            if retired and retired not in (old_matrix, new_matrix):
+                self._remove_matrix_files(retired)
+        self.load()
+        return removed
+
+    @property
+    def quantized_nbytes(self) -> int:
+        """상주시킬 양자화 사본 크기 (float32 행렬의 약 1/4)"""
+        return len(self.keys) * ((self.dim or 0) + 4)
+
+    def search(self, vectors: np.ndarray, k: int = 10, candidates: int = 0, among: Optional[Sequence[str]] = None):
+        """
+        저장된 벡터 중 질의별 가까운 k개 키와 cosine 거리 (ANNIndex.search와 같은 형식)
+        int8 사본으로 후보(기본 4k개)를 고르고 float32 행렬의 후보 행만 읽어 정확한 거리로 재정렬
+        among(키 목록)을 주면 그 키의 행 중에서만 찾음 (캐시에 없는 키는 무시)
+        """
+        self.save()
+        empty = ([[] for _ in range(len(vectors))], np.zeros((len(vectors), 0), dtype=np.float32))
+        if not self.keys:
+            return empty
+        rows = None
+        if among is not None:
+            rows = np.unique(self.lookup_rows(list(among)))
+            rows = rows[rows >= 0]
+            if not len(rows):
+                return empty
+        if self.codes is None:
+            with self._write_lock():
+                self.load()
+                self._sync_quantized(self.matrix_name, len(self.keys), self.dim)
+            self.load()
+        found, distances = search_quantized(self.codes, self.scales, self.matrix, vectors, k, candidates, rows)
+        return [[self.keys[row] for row in row_list] for row_list in found.tolist()], distances
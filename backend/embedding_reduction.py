@@ -0,0 +1,215 @@
+import io
+import os
+import re
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from sklearn.decomposition import IncrementalPCA
+
+from embedding_cache import DEFAULT_CACHE_DIR
+from embedding_store import EmbeddingStore, normalize_rows
+
+# api: 임베딩 API의 dimensions 파라미터로 짧은 벡터 요청, pca/random: 받은 벡터를 로컬에서 축소
+REDUCTION_METHODS = ('api', 'pca', 'random')
+
+# IncrementalPCA를 다시 만들 때 필요한 학습 상태
+_PCA_ATTRIBUTES = ('components_', 'mean_', 'var_', 'singular_values_', 'explained_variance_',
+                   'explained_variance_ratio_', 'noise_variance_', 'n_samples_seen_')
+# PCA 기준(basis)을 다시 학습하는 주기 (그 사이에는 기준을 고정해서 축소 벡터와 ANN 인덱스를 그대로 사용)
+PCA_REFIT_DAYS = 7
+# 다음 재학습까지 모아 두는 새 벡터 수 (n_components의 배수, 최근 벡터만 유지)
+PENDING_ROWS_FACTOR = 10
+
+
+def parse_reduction(spec: Optional[str]):
+    """'pca:256' 형식 → (방법, 차원), None/'none'이면 None"""
+    if not spec or spec == 'none':
+        return None
+    method, _, size = spec.partition(':')
+    if method not in REDUCTION_METHODS or not size.isdigit() or int(size) < 2:
+        raise ValueError(f"차원 축소 형식은 <{'|'.join(REDUCTION_METHODS)}>:<차원> 입니다 (예: pca:256): {spec}")
+    return method, int(size)
+
+
+class EmbeddingReducer:
+    """
+    get_embeddings와 cluster_embeddings 사이의 임베딩 차원 축소 단계 (결과는 다시 L2 정규화)
+
+    - api: API가 이미 n_components 차원으로 잘라 정규화한 벡터를 주므로 그대로 사용 (캐시도 차원별로 분리)
+    - pca: IncrementalPCA를 임베딩 캐시 옆(.npz)에 저장하고, 처음 학습한 기준을 refit_days 동안 고정
+      (그 사이 새로 임베딩한 기사는 .pending.npy에 모아 두었다가 재학습 때 partial_fit, 재학습마다 revision 증가)
+    - random: 고정 seed의 가우시안 random projection (학습/저장 없음, cosine 거리를 근사적으로 보존)
+    version은 축소 기준이 바뀔 때(pca는 재학습 때)만 달라지므로, 축소 벡터를 저장하는 ANN 인덱스는
+    이 값으로 재생성 여부를 판단
+    """
+
+    def __init__(self, method: str, n_components: int, model: str = "text-embedding-3-small",
+                 state_dir: Optional[str] = None, random_state: int = 42, refit_days: float = PCA_REFIT_DAYS):
+        if method not in REDUCTION_METHODS:
+            raise ValueError(f"지원하지 않는 차원 축소 방식: {method}")
+        self.method = method
+        self.n_components = n_components
+        self.random_state = random_state
+        self.refit_days = refit_days
+        self.state_dir = Path(state_dir) if state_dir else DEFAULT_CACHE_DIR
+        safe_model = re.sub(r'[^\w.-]', '_', model)
+        self.path = self.state_dir / f'{safe_model}.pca{n_components}.npz'
+        self.pending_path = self.state_dir / f'{safe_model}.pca{n_components}.pending.npy'
+        self.pca: Optional[IncrementalPCA] = None
+        # PCA 기준 번호와 마지막 학습 시각 (재학습할 때만 바뀜)
+        self.revision = 0
+        self.fitted_at: Optional[str] = None
+        self._projection: Optional[np.ndarray] = None
+        if method == 'pca':
+            self.load()
+
+    @property
+    def tag(self) -> str:
+        return f'{self.method}{self.n_components}'
+
+    @property
+    def api_dimensions(self) -> Optional[int]:
+        """임베딩 API에 넘길 dimensions (api 방식이 아니면 None)"""
+        return self.n_components if self.method == 'api' else None
+
+    @property
+    def fitted(self) -> bool:
+        return self.method != 'pca' or self.pca is not None
+
+    @property
+    def version(self) -> str:
+        if self.method == 'pca':
+            return f'{self.tag}-r{self.revision}'
+        if self.method == 'random':
+            return f'{self.tag}-{self.random_state}'
+        return self.tag
+
+    def load(self):
+        """저장된 PCA 상태 로드 (없거나 깨졌으면 다음 update에서 새로 학습)"""
+        self.pca = None
+        self.revision = 0
+        self.fitted_at = None
+        if not self.path.exists():
+            return
+        try:
+            with np.load(self.path) as state:
+                pca = IncrementalPCA(n_components=self.n_components)
+                for name in _PCA_ATTRIBUTES:
+                    value = state[name]
+                    setattr(pca, name, value.item() if value.ndim == 0 else value)
+                pca.n_components_ = self.n_components
+                pca.n_features_in_ = pca.components_.shape[1]
+                # revision을 기록하기 전에 저장한 상태는 파일 수정 시각에 학습한 1번 기준으로 간주
+                revision = int(state['revision']) if 'revision' in state.files else 1
+                fitted_at = (str(state['fitted_at']) if 'fitted_at' in state.files
+                             else datetime.fromtimestamp(self.path.stat().st_mtime).isoformat())
+            self.pca = pca
+            self.revision = revision
+            self.fitted_at = fitted_at
+        except Exception as e:
+            print(f"⚠️ PCA 상태 로드 실패, 새로 학습합니다: {e}")
+
+    def save(self):
+        """PCA 상태를 임시 파일에 쓴 뒤 교체"""
+        if self.pca is None:
+            return
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        buffer = io.BytesIO()
+        np.savez(buffer, revision=np.asarray(self.revision), fitted_at=np.asarray(self.fitted_at),
+                 **{name: np.asarray(getattr(self.pca, name)) for name in _PCA_ATTRIBUTES})
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(buffer.getvalue())
+        os.replace(tmp_path, self.path)
+
+    def _load_pending(self, dim: int) -> np.ndarray:
+        """이전 실행에서 학습하지 못하고 모아 둔 새 벡터 (없거나 차원이 다르면 빈 행렬)"""
+        try:
+            pending = np.load(self.pending_path)
+        except (OSError, ValueError):
+            return np.zeros((0, dim), dtype=np.float32)
+        return pending if pending.ndim == 2 and pending.shape[1] == dim else np.zeros((0, dim), dtype=np.float32)
+
+    def _save_pending(self, rows: np.ndarray):
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.pending_path.with_name(self.pending_path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.save(f, rows.astype(np.float32))
+        os.replace(tmp_path, self.pending_path)
+
+    def refit_due(self) -> bool:
+        """마지막 학습 후 refit_days가 지났는지"""
+        if self.fitted_at is None:
+            return True
+        return datetime.now() - datetime.fromisoformat(self.fitted_at) >= timedelta(days=self.refit_days)
+
+    def update(self, vectors: np.ndarray, fresh: Optional[np.ndarray] = None, refit: Optional[bool] = None) -> bool:
+        """
+        pca: 처음이면 vectors 전체로 학습, 이후에는 기준을 고정하고 fresh(이번 실행에 새로 임베딩한 행)를
+        pending 파일에 모아 두었다가 재학습 때(refit=None이면 refit_days마다) 함께 partial_fit, 갱신 여부 반환
+        IncrementalPCA는 한 번에 n_components개 이상이 필요해서, 그보다 적으면 재학습을 다음으로 미룸
+        """
+        if self.method != 'pca' or vectors.shape[1] < self.n_components:
+            return False
+        if self.pca is None:
+            # 전체로 처음 학습할 때는 모아 둔 벡터도 vectors에 포함되어 있으므로 사용하지 않음
+            rows = normalize_rows(vectors)
+            if len(rows) < self.n_components:
+                print(f"⚠️ PCA 학습에는 기사 {self.n_components}개 이상이 필요합니다 (현재 {len(rows)}개)")
+                return False
+            self.pca = IncrementalPCA(n_components=self.n_components)
+        else:
+            new_rows = normalize_rows(vectors if fresh is None else vectors[np.asarray(fresh, dtype=bool)])
+            rows = np.concatenate([self._load_pending(vectors.shape[1]), new_rows])
+            rows = rows[-self.n_components * PENDING_ROWS_FACTOR:]
+            if refit is None:
+                refit = self.refit_due()
+            if not refit or len(rows) < self.n_components:
+                if len(new_rows):
+                    self._save_pending(rows)
+                return False
+        self.pca.partial_fit(rows)
+        self.revision += 1
+        self.fitted_at = datetime.now().isoformat()
+        self.save()
+        if self.pending_path.exists():
+            os.remove(self.pending_path)
+        return True
+
+    def _random_projection(self, dim: int) -> np.ndarray:
+        if self._projection is None or self._projection.shape[0] != dim:
+            rng = np.random.default_rng(self.random_state)
+            self._projection = (rng.standard_normal((dim, self.n_components)) / np.sqrt(self.n_components)).astype(np.float32)
+        return self._projection
+
+    def transform(self, vectors: np.ndarray) -> np.ndarray:
+        """정규화한 벡터를 축소한 뒤 다시 정규화 (float32)"""
+        if self.method == 'api':
+            return normalize_rows(vectors)
+        if self.method == 'random':
+            return normalize_rows(normalize_rows(vectors) @ self._random_projection(vectors.shape[1]))
+        if self.pca is None:
+            raise RuntimeError("PCA가 아직 학습되지 않았습니다 (update 먼저 호출)")
+        return normalize_rows(self.pca.transform(normalize_rows(vectors)))
+
+    def reduce_store(self, store: EmbeddingStore) -> EmbeddingStore:
+        """store의 유효 행을 축소한 새 EmbeddingStore (무효 행은 0 벡터, valid/fresh 유지)"""
+        if self.method == 'api':
+            return store
+        reduced = EmbeddingStore(len(store), dim=self.n_components, dtype=store.vectors.dtype)
+        rows = np.flatnonzero(store.valid)
+        if len(rows):
+            reduced.fill(rows, self.transform(store.vectors[rows]))
+        reduced.fresh = store.fresh.copy()
+        return reduced
+
+
+def create_reducer(spec: Optional[str], model: str = "text-embedding-3-small") -> Optional[EmbeddingReducer]:
+    """--reduce 값('pca:256' 등)으로 EmbeddingReducer 생성 (지정하지 않으면 None)"""
+    parsed = parse_reduction(spec)
+    if parsed is None:
+        return None
+    method, n_components = parsed
+    return EmbeddingReducer(method, n_components, model=model)
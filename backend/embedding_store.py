@@ -0,0 +1,73 @@
+import base64
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+# text-embedding-3-small 차원
+EMBEDDING_DIM = 1536
+
+
+class EmbeddingStore:
+    """
+    기사 임베딩을 담는 미리 할당된 행렬 (기본 float32, float16 선택 가능)
+
+    - vectors: (기사 수, 차원) 행렬, API 응답/캐시에서 바로 채움
+    - valid: 임베딩을 받지 못한 행은 False (0 벡터가 클러스터링에 섞이지 않도록)
+    - fresh: 캐시에 없어서 이번 실행에 API로 새로 받은 행 (PCA 증분 학습용)
+    - 카테고리별 조회는 category_slices로 구한 구간의 슬라이스(view)로 복사 없이 사용
+    """
+
+    def __init__(self, n: int, dim: int = EMBEDDING_DIM, dtype=np.float32):
+        self.vectors = np.zeros((n, dim), dtype=dtype)
+        self.valid = np.zeros(n, dtype=bool)
+        self.fresh = np.zeros(n, dtype=bool)
+
+    def __len__(self):
+        return len(self.vectors)
+
+    @property
+    def dim(self) -> int:
+        return self.vectors.shape[1]
+
+    def fill(self, rows: Sequence[int], block: np.ndarray):
+        """rows 위치에 벡터 블록 기록"""
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) == 0:
+            return
+        self.vectors[rows] = block
+        self.valid[rows] = True
+
+    def view(self, rows: slice):
+        """(vectors, valid) 슬라이스 view 반환"""
+        return self.vectors[rows], self.valid[rows]
+
+    @property
+    def nbytes(self) -> int:
+        return self.vectors.nbytes + self.valid.nbytes
+
+
+def decode_base64_embeddings(encoded: Sequence[str], dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """encoding_format='base64' 응답(float32 리틀엔디언)들을 파이썬 float 리스트 없이 (n, dim) 행렬로 변환"""
+    raw = b''.join(base64.b64decode(item) for item in encoded)
+    return np.frombuffer(raw, dtype='<f4').reshape(len(encoded), dim)
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """행 단위 L2 정규화 (0 벡터는 그대로)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def category_slices(categories: pd.Series) -> Dict[str, slice]:
+    """
+    category 기준으로 정렬된 컬럼에서 카테고리별 [start, end) 구간 계산
+    (df를 category로 stable 정렬해 두면 카테고리별 임베딩을 슬라이스 view로 꺼낼 수 있음)
+    """
+    values = categories.to_numpy()
+    if len(values) == 0:
+        return {}
+    bounds = np.concatenate(([0], np.flatnonzero(values[1:] != values[:-1]) + 1, [len(values)]))
+    return {values[start]: slice(int(start), int(end)) for start, end in zip(bounds[:-1], bounds[1:])}
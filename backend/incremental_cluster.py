@@ -0,0 +1,368 @@
+import json
+import os
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from sklearn.cluster import DBSCAN
+
+from embedding_store import normalize_rows
+
+# 기본 상태 위치 (backend/.cluster_state/)
+DEFAULT_STATE_DIR = Path(__file__).parent / '.cluster_state'
+# 이 시간보다 오래 noise로 남은 기사는 남은 기사 DBSCAN에서 제외 (이슈 중심 배정은 계속 시도)
+NOISE_MAX_AGE_HOURS = 72
+# 멤버가 모두 조회 구간 밖으로 빠진 이슈도 마지막으로 기사가 추가된 뒤 이 시간 동안은 중심으로 유지
+ISSUE_MAX_AGE_HOURS = 72
+# 이슈별로 기억해 두는 최근 멤버 임베딩 캐시 키 수 (구간 밖으로 빠진 멤버와의 이웃 배정에 사용)
+MAX_HISTORY_KEYS = 200
+
+
+def _unit(vector: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(vector)
+    return (vector / norm if norm else vector).astype(np.float32)
+
+
+def centroid(vectors: np.ndarray) -> np.ndarray:
+    """정규화한 멤버 벡터 평균을 다시 정규화한 이슈 중심"""
+    return _unit(normalize_rows(vectors).mean(axis=0))
+
+
+class ClusterState:
+    """
+    증분 클러스터링용 이전 실행 결과 (이슈 id → 카테고리, 멤버 기사 id, 멤버 수, 중심 벡터)
+
+    중심은 지금까지 배정된 모든 멤버(n_members개)의 가중 평균으로 갱신하므로, 오래된 멤버가
+    조회 구간 밖으로 빠져도 움직이지 않는다. article_ids에는 구간 안의 멤버만 두고,
+    member_keys에는 구간 밖 멤버를 포함한 최근 멤버의 임베딩 캐시 키를 MAX_HISTORY_KEYS개까지 둔다.
+
+    인덱스(state.json)와 중심 행렬(.f32)을 나눠 저장하고, 인덱스는 임시 파일 교체로 원자적으로 갱신한다.
+    멤버 기사 임베딩은 임베딩 캐시에서 다시 읽으므로 여기에는 기사 id만 둔다.
+    noise는 카테고리별로 기사 id → 처음 noise가 된 시각을 두어 오래된 noise를 다시 클러스터링하지 않는다.
+    """
+
+    def __init__(self, state_dir: Optional[str] = None):
+        self.state_dir = Path(state_dir) if state_dir else DEFAULT_STATE_DIR
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.state_dir / 'state.json'
+        self.issues: Dict[str, Dict[str, Any]] = {}
+        self.centroids: Dict[str, np.ndarray] = {}
+        self.noise: Dict[str, Dict[str, str]] = {}
+        self.last_maintenance: Optional[str] = None
+        self.matrix_name: Optional[str] = None
+        self.load()
+
+    def load(self):
+        """상태 파일 로드 (없거나 깨졌으면 빈 상태로 시작)"""
+        self.issues, self.centroids, self.noise = {}, {}, {}
+        if not self.index_path.exists():
+            return
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            self.last_maintenance = index.get('last_maintenance')
+            self.matrix_name = index.get('matrix')
+            order = index.get('order', [])
+            if order and self.matrix_name:
+                matrix = np.fromfile(self.state_dir / self.matrix_name, dtype=np.float32).reshape(len(order), -1)
+                self.centroids = {issue_id: matrix[row] for row, issue_id in enumerate(order)}
+            self.issues = index.get('issues', {})
+            self.noise = index.get('noise', {})
+        except Exception as e:
+            print(f"⚠️ 클러스터 상태 로드 실패, 새로 시작합니다: {e}")
+            self.issues, self.centroids, self.noise = {}, {}, {}
+
+    def save(self):
+        """중심 행렬을 새 파일로 쓴 뒤 인덱스 교체, 이전 행렬 파일 삭제"""
+        order = [issue_id for issue_id in self.issues if issue_id in self.centroids]
+        old_matrix = self.matrix_name
+        matrix_name = f'centroids.{uuid.uuid4().hex}.f32' if order else None
+        if order:
+            with open(self.state_dir / matrix_name, 'wb') as f:
+                f.write(np.stack([self.centroids[issue_id] for issue_id in order]).astype(np.float32).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        tmp_path = self.index_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'last_maintenance': self.last_maintenance,
+                'matrix': matrix_name,
+                'order': order,
+                'issues': {issue_id: self.issues[issue_id] for issue_id in order},
+                'noise': self.noise,
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+        self.matrix_name = matrix_name
+        if old_matrix and old_matrix != matrix_name:
+            try:
+                os.remove(self.state_dir / old_matrix)
+            except OSError:
+                pass
+
+    def category_issue_ids(self, category: str) -> List[str]:
+        return [issue_id for issue_id, issue in self.issues.items() if issue['category'] == category]
+
+    def maintenance_due(self, interval_hours: float) -> bool:
+        """병합/분할 주기가 지났는지 여부"""
+        if not self.last_maintenance:
+            return True
+        return datetime.now() - datetime.fromisoformat(self.last_maintenance) >= timedelta(hours=interval_hours)
+
+    def new_issue(self, category: str) -> str:
+        issue_id = str(uuid.uuid4())
+        now = datetime.now().isoformat()
+        self.issues[issue_id] = {'category': category, 'article_ids': [], 'created_at': now, 'updated_at': now}
+        return issue_id
+
+    def remove_issue(self, issue_id: str):
+        self.issues.pop(issue_id, None)
+        self.centroids.pop(issue_id, None)
+
+    def member_count(self, issue_id: str) -> int:
+        """중심에 반영된 멤버 수 (멤버 수를 기록하기 전 상태 파일은 현재 멤버 수로 간주)"""
+        issue = self.issues[issue_id]
+        return issue.get('n_members') or max(len(issue['article_ids']), 1)
+
+    def history_keys(self) -> set:
+        """모든 이슈의 최근 멤버 임베딩 캐시 키 (임베딩 캐시 정리 때 남겨 둘 키)"""
+        return {key for issue in self.issues.values() for key in issue.get('member_keys', [])}
+
+    def _remember_keys(self, issue_id: str, keys: Sequence[str]):
+        issue = self.issues[issue_id]
+        issue['member_keys'] = (issue.get('member_keys', []) + list(keys))[-MAX_HISTORY_KEYS:]
+
+    def add_members(self, issue_id: str, vectors: np.ndarray, keys: Optional[Sequence[str]] = None):
+        """새 멤버 벡터를 이슈 중심에 가중 평균으로 반영 (keys는 멤버의 임베딩 캐시 키)"""
+        if keys is not None:
+            self._remember_keys(issue_id, keys)
+        total = normalize_rows(vectors).sum(axis=0)
+        n = len(vectors)
+        if issue_id in self.centroids:
+            count = self.member_count(issue_id)
+            total = total + self.centroids[issue_id] * count
+            n += count
+        self.centroids[issue_id] = _unit(total)
+        self.issues[issue_id]['n_members'] = n
+
+    def remove_members(self, issue_id: str, removed: np.ndarray, kept: np.ndarray,
+                       removed_keys: Optional[Sequence[str]] = None):
+        """분할로 떨어져 나간 멤버를 중심에서 뺌 (남는 멤버 수가 없으면 남은 멤버 벡터로 다시 계산)"""
+        if removed_keys is not None:
+            removed_keys = set(removed_keys)
+            issue = self.issues[issue_id]
+            issue['member_keys'] = [key for key in issue.get('member_keys', []) if key not in removed_keys]
+        n = self.member_count(issue_id) - len(removed)
+        if n > 0:
+            self.centroids[issue_id] = _unit(self.centroids[issue_id] * (n + len(removed))
+                                             - normalize_rows(removed).sum(axis=0))
+        else:
+            self.centroids[issue_id], n = centroid(kept), len(kept)
+        self.issues[issue_id]['n_members'] = n
+
+    def merge_issue(self, keep_id: str, other_id: str):
+        """other_id 이슈를 keep_id로 합침 (중심은 두 멤버 수로 가중 평균)"""
+        keep_n, other_n = self.member_count(keep_id), self.member_count(other_id)
+        self.centroids[keep_id] = _unit(self.centroids[keep_id] * keep_n + self.centroids[other_id] * other_n)
+        self.issues[keep_id]['n_members'] = keep_n + other_n
+        self.issues[keep_id]['updated_at'] = datetime.now().isoformat()
+        self._remember_keys(keep_id, self.issues[other_id].get('member_keys', []))
+        self.remove_issue(other_id)
+
+
+def _row_keys(keys: Optional[Sequence[str]], rows) -> Optional[List[str]]:
+    return [keys[row] for row in rows] if keys is not None else None
+
+
+def _dbscan(vectors: np.ndarray, eps: float, min_samples: int, ann_index=None, keys=None) -> np.ndarray:
+    """ann_index가 있으면 근사 이웃 그래프(metric='precomputed'), 없으면 cosine 거리로 DBSCAN"""
+    if len(vectors) < min_samples:
+        return np.full(len(vectors), -1, dtype=np.int64)
+    if ann_index is not None:
+        graph = ann_index.radius_graph(keys, vectors, eps)
+        return DBSCAN(eps=eps, min_samples=min_samples, metric='precomputed').fit_predict(graph)
+    return DBSCAN(eps=eps, min_samples=min_samples, metric='cosine').fit_predict(vectors)
+
+
+def _merge_close_issues(state: ClusterState, members: Dict[str, List[int]], merge_eps: float) -> int:
+    """중심 간 cosine 거리가 merge_eps 이하인 이슈를 가장 오래된 이슈로 병합, 병합된 이슈 수 반환"""
+    issue_ids = sorted(members, key=lambda issue_id: state.issues[issue_id]['created_at'])
+    if len(issue_ids) < 2:
+        return 0
+    centers = np.stack([state.centroids[issue_id] for issue_id in issue_ids])
+    close = (1.0 - centers @ centers.T) <= merge_eps
+    parent = list(range(len(issue_ids)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in zip(*np.nonzero(np.triu(close, k=1))):
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            # 먼저 만들어진 이슈 id를 유지
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+    merged = 0
+    for i, issue_id in enumerate(issue_ids):
+        root = find(i)
+        if root != i:
+            members[issue_ids[root]].extend(members.pop(issue_id))
+            state.merge_issue(issue_ids[root], issue_id)
+            merged += 1
+    return merged
+
+
+def _split_loose_issues(state: ClusterState, category: str, members: Dict[str, List[int]],
+                        vectors: np.ndarray, eps: float, min_samples: int,
+                        keys: Optional[Sequence[str]] = None) -> int:
+    """멤버끼리 다시 DBSCAN해서 여러 덩어리로 나뉘는 이슈 분할 (가장 큰 덩어리가 id 유지), 새 이슈 수 반환"""
+    created = 0
+    for issue_id in list(members):
+        rows = np.asarray(members[issue_id], dtype=np.int64)
+        labels = _dbscan(vectors[rows], eps, min_samples)
+        groups = [rows[labels == label].tolist() for label in sorted(set(labels.tolist()) - {-1})]
+        if len(groups) < 2:
+            continue
+        groups.sort(key=len, reverse=True)
+        # 어느 덩어리에도 속하지 않는 멤버는 다음 실행에서 다시 배정
+        members[issue_id] = groups[0]
+        for group in groups[1:]:
+            new_id = state.new_issue(category)
+            state.add_members(new_id, vectors[group], _row_keys(keys, group))
+            members[new_id] = group
+            created += 1
+        moved = sum(groups[1:], [])
+        state.remove_members(issue_id, vectors[moved], vectors[groups[0]], _row_keys(keys, moved))
+    return created
+
+
+def update_category(state: ClusterState, category: str, article_ids: Sequence, vectors: np.ndarray,
+                    valid: Optional[np.ndarray] = None, eps: float = 0.3, min_samples: int = 3,
+                    maintain: bool = False, merge_eps: Optional[float] = None,
+                    ann_index=None, keys: Optional[Sequence[str]] = None, history=None,
+                    noise_max_age_hours: Optional[float] = NOISE_MAX_AGE_HOURS,
+                    issue_max_age_hours: Optional[float] = ISSUE_MAX_AGE_HOURS) -> Dict[str, List[int]]:
+    """
+    카테고리 하나의 이슈를 증분 갱신 → {이슈 id: 행 번호 목록} (구간 안에 멤버가 있는 이슈만)
+
+    1. 이전 이슈 멤버 중 아직 있는 기사는 그대로 유지
+       (멤버가 모두 빠진 이슈도 마지막 기사 추가 후 issue_max_age_hours 동안은 중심으로 유지)
+    2. 새 기사는 저장된 이슈 중심과의 cosine 거리가 eps 이하인 가장 가까운 이슈에 배정
+       history(EmbeddingCache)가 있으면 중심에서 먼 기사도 이슈의 최근 멤버(구간 밖 포함) 중 가장 가까운 기사가
+       eps 이내면 그 이슈에 배정 (캐시의 int8 사본으로 후보를 고른 뒤 float32로 재정렬)
+    3. 배정되지 않은 기사(새 기사 + noise_max_age_hours 이내의 이전 noise)만 DBSCAN해서 새 이슈 생성
+    4. maintain=True면 가까운 이슈 병합(merge_eps, 기본 eps/2)과 느슨한 이슈 분할 수행
+    이슈 중심은 새로 배정된 멤버만큼만 가중 평균으로 갱신 (구간 밖으로 빠진 멤버는 중심에 그대로 남음)
+    keys는 행별 임베딩 캐시 키 (history 검색, 이슈별 최근 멤버 기록, ann_index 이웃 조회에 사용)
+    ann_index(ANNIndex)가 있으면 3의 이웃 탐색을 근사 이웃 그래프로 수행
+    """
+    ids = [str(article_id) for article_id in article_ids]
+    valid = np.ones(len(ids), dtype=bool) if valid is None else np.asarray(valid, dtype=bool)
+    row_of = {article_id: row for row, article_id in enumerate(ids) if valid[row]}
+    vectors = normalize_rows(vectors)
+    now = datetime.now().isoformat()
+    cutoff = (datetime.now() - timedelta(hours=issue_max_age_hours)).isoformat() if issue_max_age_hours else now
+
+    # 1. 기존 이슈 멤버 유지 (멤버가 없고 오래된 이슈, 벡터 차원이 바뀌어 중심을 쓸 수 없는 이슈 삭제)
+    members: Dict[str, List[int]] = {}
+    n_previous = n_kept = 0
+    for issue_id in state.category_issue_ids(category):
+        n_previous += 1
+        issue = state.issues[issue_id]
+        rows = [row_of[a] for a in issue['article_ids'] if a in row_of]
+        center = state.centroids.get(issue_id)
+        if center is None or center.shape[0] != vectors.shape[1]:
+            if not rows:
+                state.remove_issue(issue_id)
+                continue
+            state.centroids.pop(issue_id, None)
+            issue['n_members'] = 0
+            state.add_members(issue_id, vectors[rows])
+        if not rows and issue['updated_at'] < cutoff:
+            state.remove_issue(issue_id)
+            continue
+        if keys is not None and 'member_keys' not in issue:
+            issue['member_keys'] = _row_keys(keys, rows)
+        n_kept += not rows
+        members[issue_id] = rows
+    assigned = np.zeros(len(ids), dtype=bool)
+    for rows in members.values():
+        assigned[rows] = True
+
+    # 2. 새 기사를 가장 가까운 이슈 중심에 배정 후 배정된 기사만큼 중심 갱신
+    pending = np.flatnonzero(valid & ~assigned)
+    n_assigned = 0
+    if len(pending) and members:
+        issue_ids = list(members)
+        centers = np.stack([state.centroids[issue_id] for issue_id in issue_ids])
+        similarity = vectors[pending] @ centers.T
+        best = similarity.argmax(axis=1)
+        close = (1.0 - similarity[np.arange(len(pending)), best]) <= eps
+        for k in np.unique(best[close]).tolist():
+            rows = pending[close & (best == k)]
+            members[issue_ids[k]].extend(rows.tolist())
+            state.add_members(issue_ids[k], vectors[rows], _row_keys(keys, rows))
+            state.issues[issue_ids[k]]['updated_at'] = now
+        assigned[pending[close]] = True
+        n_assigned = int(close.sum())
+
+    # 2-1. 중심에서 먼 새 기사는 캐시에 남은 이슈 멤버 중 가장 가까운 기사의 이슈에 배정
+    n_history = 0
+    pending = np.flatnonzero(valid & ~assigned)
+    if history is not None and keys is not None and len(pending) and members:
+        issue_of = {key: issue_id for issue_id in members for key in state.issues[issue_id].get('member_keys', [])}
+        cache_rows = history.lookup_rows(_row_keys(keys, pending))
+        queries = pending[cache_rows >= 0]
+        if issue_of and len(queries):
+            nearest, distances = history.search(np.asarray(history.matrix[cache_rows[cache_rows >= 0]]), k=1,
+                                                among=list(issue_of))
+            by_issue: Dict[str, List[int]] = {}
+            for row, found, distance in zip(queries.tolist(), nearest, distances.tolist()):
+                if found and distance[0] <= eps:
+                    by_issue.setdefault(issue_of[found[0]], []).append(row)
+            for issue_id, rows in by_issue.items():
+                members[issue_id].extend(rows)
+                state.add_members(issue_id, vectors[rows], _row_keys(keys, rows))
+                state.issues[issue_id]['updated_at'] = now
+                assigned[rows] = True
+                n_history += len(rows)
+
+    # 3. 남은 기사만 DBSCAN (오래된 noise는 제외하고 noise로 유지)
+    leftover = np.flatnonzero(valid & ~assigned)
+    noise_since = state.noise.get(category, {})
+    expired = np.zeros(len(leftover), dtype=bool)
+    if noise_max_age_hours is not None and noise_since:
+        noise_cutoff = (datetime.now() - timedelta(hours=noise_max_age_hours)).isoformat()
+        expired = np.array([noise_since.get(ids[row], now) < noise_cutoff for row in leftover], dtype=bool)
+    stale_noise, leftover = leftover[expired], leftover[~expired]
+    leftover_keys = _row_keys(keys, leftover) if ann_index is not None else None
+    labels = (_dbscan(vectors[leftover], eps, min_samples, ann_index, leftover_keys) if len(leftover)
+              else np.array([], dtype=np.int64))
+    n_new = 0
+    for label in sorted(set(labels.tolist()) - {-1}):
+        issue_id = state.new_issue(category)
+        members[issue_id] = leftover[labels == label].tolist()
+        state.add_members(issue_id, vectors[members[issue_id]], _row_keys(keys, members[issue_id]))
+        n_new += 1
+    noise_rows = np.concatenate([stale_noise, leftover[labels == -1]])
+    state.noise[category] = {ids[row]: noise_since.get(ids[row], now) for row in noise_rows.tolist()}
+
+    # 4. 주기적 병합/분할 (저장된 중심 기준)
+    n_merged = n_split = 0
+    if maintain and members:
+        n_merged = _merge_close_issues(state, members, eps / 2 if merge_eps is None else merge_eps)
+        n_split = _split_loose_issues(state, category, members, vectors, eps, min_samples, keys)
+
+    # 상태 반영: article_ids는 구간 안의 멤버만
+    for issue_id, rows in members.items():
+        rows.sort()
+        state.issues[issue_id]['article_ids'] = [ids[row] for row in rows]
+    print(f"   🔁 증분: 기존 이슈 {n_previous}개 (멤버 없이 유지 {n_kept}개), 새 기사 배정 {n_assigned}개"
+          + (f" (이전 멤버 이웃 {n_history}개)" if n_history else "")
+          + f", 남은 기사 {len(leftover)}개 → 새 이슈 {n_new}개"
+          + (f" | 오래된 noise 제외 {len(stale_noise)}개" if len(stale_noise) else "")
+          + (f" | 병합 {n_merged}개, 분할 {n_split}개" if maintain else ""))
+    return {issue_id: rows for issue_id, rows in members.items() if rows}
@@ -0,0 +1,47 @@
+import asyncio
+from typing import Optional
+
+from openai import AsyncOpenAI
+
+
+class LLMPool:
+    """
+    chat completion 호출을 동시에 max_concurrency개까지 보내는 asyncio 풀
+    호출마다 timeout(초)을 적용하고, 실패/시간 초과는 예외로 호출한 쪽에 전달
+
+    사용:
+        async with LLMPool(api_key) as llm:
+            text = await llm.complete(prompt, model="gpt-3.5-turbo", max_tokens=300, temperature=0.4)
+    """
+
+    def __init__(self, api_key: str, max_concurrency: int = 8, timeout: float = 60.0):
+        self.api_key = api_key
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.client: Optional[AsyncOpenAI] = None
+
+    async def __aenter__(self):
+        self.client = AsyncOpenAI(api_key=self.api_key)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.client.close()
+        self.client = None
+
+    async def complete(self, prompt: str, model: str, max_tokens: int, temperature: float,
+                       json_mode: bool = False) -> Optional[str]:
+        """프롬프트 하나에 대한 응답 텍스트 (비어 있으면 None), json_mode면 JSON 객체 응답 요청"""
+        extra = {"response_format": {"type": "json_object"}} if json_mode else {}
+        async with self._semaphore:
+            res = await asyncio.wait_for(
+                self.client.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    **extra
+                ),
+                timeout=self.timeout
+            )
+        content = getattr(res.choices[0].message, "content", None)
+        return content.strip() if content else None
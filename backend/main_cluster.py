@@ -1,80 +1,114 @@
 import os
 import pandas as pd
-from supabase.client import create_client
 from dotenv import load_dotenv
 from openai import OpenAI
-from sklearn.cluster import DBSCAN
 import numpy as np
 import json
 from tqdm import tqdm
-from datetime import datetime
+from datetime import datetime, timedelta
 import argparse
-import tiktoken
 import subprocess
 import glob
+import asyncio
+import hashlib
+from storage import create_storage
+from article_fetch import fetch_article_rows, article_frame, window_bounds
+from title_dedup import tokenize_title, jaccard, greedy_dedup
+from embedding_cache import EmbeddingCache, embedding_text, text_key
+from embedding_store import EMBEDDING_DIM, EmbeddingStore, category_slices
+from embedding_reduction import create_reducer
+from neighbor_graph import radius_neighbor_graph, knn_distances, knee_eps
+from cluster_engines import ENGINES, run_engine
+from cluster_metrics import BIAS_GROUPS, evaluate_clustering, summarize_metrics, select_best
+from ann_index import ANNIndex, ann_available
+from async_embedder import AsyncEmbedder
+from llm_pool import LLMPool
+from summary_cache import SummaryCache, reuse_plan
+from token_budget import count_tokens, fixed_tokens, joined_tokens, pack_chunks
+from incremental_cluster import ISSUE_MAX_AGE_HOURS, ClusterState, update_category
 
 # 1. 환경 변수 로드 및 설정
 load_dotenv()
-SUPABASE_URL = os.getenv('SUPABASE_URL')
-SUPABASE_KEY = os.getenv('SUPABASE_ANON_KEY')
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise ValueError("SUPABASE_URL과 SUPABASE_ANON_KEY 환경 변수를 설정해주세요.")
 if not OPENAI_API_KEY:
     raise ValueError("OPENAI_API_KEY 환경 변수를 설정해주세요.")
 
 client = OpenAI(api_key=OPENAI_API_KEY)
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+# STORAGE_BACKEND=sqlite이면 로컬 DB, 기본은 Supabase
+storage = create_storage()
 
 # 2. DB에서 기사 데이터 불러오기 (media_outlet_id 포함)
-def fetch_articles():
-    response = supabase.table('articles').select('id, title, content, category, media_outlet_id, url').execute()
-    df = pd.DataFrame(response.data)
-    print(f"✅ {len(df)}개 기사 로드 완료")
+# 본문은 임베딩 캐시에 없는 기사와 요약에 샘플링된 기사만 나중에 일괄 조회 (text_hash = 임베딩 입력 sha256)
+ARTICLE_COLUMNS = ['id', 'title', 'category', 'media_outlet_id', 'url', 'content_length', 'published_at', 'text_hash']
+
+def fetch_articles(window_hours=None):
+    """
+    메타데이터와 text_hash만 조회 (본문은 article_bodies에 분리 저장, 필요한 기사만 load_article_bodies로 조회)
+    window_hours가 있으면 최근 window_hours시간에 발행된 기사만, (published_at, id) keyset 페이지를 시간 조각별로 동시에 조회
+    """
+    since = window_bounds(window_hours)
+    df = article_frame(fetch_article_rows(storage, ARTICLE_COLUMNS, since=since), ARTICLE_COLUMNS)
+    print(f"✅ {len(df)}개 기사 로드 완료" + (f" (최근 {window_hours:g}시간)" if window_hours else ""))
     
-    # 중복 제거 적용
+    # 중복 제거 적용 (본문 길이는 content_length 사용)
     df_deduped = remove_duplicate_articles(df)
     print(f"🧹 중복 제거 후: {len(df_deduped)}개 기사 ({len(df) - len(df_deduped)}개 중복 제거)")
-    
     return df_deduped
 
+def load_article_bodies(df, rows=None):
+    """
+    article_bodies에서 df 기사들(rows를 주면 그 행만)의 본문을 한 번에 조회해 content 컬럼에 채움
+    이미 본문이 채워진 행은 다시 조회하지 않음
+    """
+    if 'content' not in df:
+        df['content'] = pd.Series(None, index=df.index, dtype=object)
+    target = df if rows is None else df.loc[rows]
+    ids = target.loc[target['content'].isna(), 'id'].astype(str)
+    if len(ids) == 0:
+        return df
+    bodies = storage.select_article_bodies(ids.tolist())
+    missing = len(ids) - sum(1 for article_id in ids if article_id in bodies)
+    # 본문이 없는 기사는 빈 문자열로 채워 다시 조회하지 않음
+    df.loc[ids.index, 'content'] = ids.map(bodies).fillna('')
+    print(f"📄 본문 조회: {len(ids)}개 기사")
+    if missing:
+        print(f"⚠️ 본문이 없는 기사 {missing}개 (supabase_uploader.py --backfill-bodies 실행 필요)")
+    return df
+
 # 언론사 정보 로드 (id→name, id→bias)
 def fetch_media_outlets():
-    response = supabase.table('media_outlets').select('id, name, bias').execute()
     mapping = {}
-    for row in response.data:
+    for row in storage.select_media_outlets(['id', 'name', 'bias']):
         mapping[row['id']] = {'name': row['name'], 'bias': row['bias']}
     return mapping
 
+def media_bias_column(media_ids, media_map):
+    """media_outlet_id → 편향 categorical (left/center/right, 언론사 정보가 없거나 그 외 값이면 NaN)"""
+    bias = pd.Series(media_ids).map({media_id: info['bias'] for media_id, info in media_map.items()})
+    return pd.Categorical(bias, categories=BIAS_GROUPS)
+
 # 중복 기사 제거 함수들
 def calculate_title_similarity(title1, title2):
     """제목 간 유사도 계산 (Jaccard 유사도 사용)"""
-    import re
-    
-    # 특수문자 제거하고 단어 단위로 분리
-    def tokenize(text):
-        text = re.sub(r'[^\w\s]', '', str(text).lower())
-        return set(text.split())
-    
-    tokens1 = tokenize(title1)
-    tokens2 = tokenize(title2)
-    
-    if len(tokens1) == 0 and len(tokens2) == 0:
-        return 1.0
-    if len(tokens1) == 0 or len(tokens2) == 0:
-        return 0.0
-    
-    intersection = len(tokens1.intersection(tokens2))
-    union = len(tokens1.union(tokens2))
-    
-    return intersection / union if union > 0 else 0.0
+    return jaccard(tokenize_title(title1), tokenize_title(title2))
 
-def remove_duplicate_articles(df, title_similarity_threshold=0.8):
+def article_content_lengths(df):
+    """기사 본문 길이 목록 (content_length 컬럼 우선, 없으면 content 길이)"""
+    if 'content' in df:
+        fallback = df['content'].astype(str).str.len()
+    else:
+        fallback = pd.Series(0, index=df.index)
+    if 'content_length' in df:
+        return df['content_length'].fillna(fallback).astype(int).tolist()
+    return fallback.tolist()
+
+def remove_duplicate_articles(df, title_similarity_threshold=0.8, verbose=False):
     """
     중복 기사 제거:
     1. URL 기반 완전 중복 제거
     2. 제목 유사도 기반 중복 제거 (같은 이슈를 다룬 기사들)
+    verbose=True이면 제거된 기사 제목 출력
     """
     if len(df) == 0:
         return df
@@ -101,47 +135,14 @@ def remove_duplicate_articles(df, title_similarity_threshold=0.8):
         
         print(f"   🗂️ [{category}] 카테고리: {len(cat_df)}개 기사")
         
-        # 제목 유사도 기반 그룹핑
-        to_remove = set()
+        # 제목 유사도 기반 그룹핑 (제목은 한 번만 토큰화, 후보 쌍만 비교)
         articles = cat_df.reset_index(drop=True)
-        
-        for i in range(len(articles)):
-            if i in to_remove:
-                continue
-                
-            current_title = articles.loc[i, 'title']
-            current_media = articles.loc[i, 'media_outlet_id']
-            
-            # 이후 기사들과 비교
-            for j in range(i+1, len(articles)):
-                if j in to_remove:
-                    continue
-                    
-                compare_title = articles.loc[j, 'title']
-                compare_media = articles.loc[j, 'media_outlet_id']
-                
-                # 같은 언론사면 스킵 (언론사 내 중복은 URL로 이미 처리됨)
-                if current_media == compare_media:
-                    continue
-                
-                similarity = calculate_title_similarity(current_title, compare_title)
-                
-                if similarity >= title_similarity_threshold:
-                    # 유사한 기사 발견 - 더 긴 본문을 가진 기사를 유지
-                    current_content_len = len(str(articles.loc[i, 'content']))
-                    compare_content_len = len(str(articles.loc[j, 'content']))
-                    
-                    if compare_content_len > current_content_len:
-                        to_remove.add(i)
-                        print(f"      🔄 유사 제목 발견 (유사도: {similarity:.2f})")
-                        print(f"         제거: {current_title[:50]}...")
-                        print(f"         유지: {compare_title[:50]}...")
-                        break
-                    else:
-                        to_remove.add(j)
-                        print(f"      🔄 유사 제목 발견 (유사도: {similarity:.2f})")
-                        print(f"         유지: {current_title[:50]}...")
-                        print(f"         제거: {compare_title[:50]}...")
+        token_sets = [tokenize_title(title) for title in articles['title']]
+        to_remove = greedy_dedup(token_sets, articles['media_outlet_id'].tolist(),
+                                 article_content_lengths(articles), title_similarity_threshold)
+        if verbose:
+            for i in sorted(to_remove):
+                print(f"      🔄 유사 제목 제거: {str(articles.loc[i, 'title'])[:50]}...")
         
         # 제거할 기사들 제외하고 남은 기사들 추가
         filtered_articles = articles.drop(index=list(to_remove))
@@ -160,48 +161,95 @@ def remove_duplicate_articles(df, title_similarity_threshold=0.8):
     return final_df
 
 # 3. 임베딩 생성 (OpenAI text-embedding-3-small)
-def get_embeddings(texts, model="text-embedding-3-small", cache=None, batch_size=256):
-    embeddings = []
+def get_embeddings(texts, model="text-embedding-3-small", cache=None, dtype=np.float32, max_concurrency=4,
+                   dimensions=None, keys=None):
+    """
+    텍스트 임베딩을 EmbeddingStore(미리 할당한 float32 행렬 + 유효 마스크)에 채워 반환
+    cache(EmbeddingCache)에 있는 텍스트는 API 호출 없이 재사용하고, 새로 받은 임베딩은 cache에 저장
+    캐시에 없는 텍스트는 AsyncEmbedder로 토큰 기준 batch를 동시에 요청하고, 끝까지 실패한 텍스트는 valid=False
+    dimensions를 주면 API에 짧은 임베딩을 요청 (cache도 같은 dimensions로 만든 것을 넘겨야 함)
+    keys(텍스트 sha256)를 주면 texts는 캐시에 없는 키의 행만 채워져 있으면 됨 (나머지는 None 가능)
+    """
     if cache is None:
-        cache = {}
-    n = len(texts)
-    for i in range(0, n, batch_size):
-        batch = texts[i:i+batch_size]
-        batch_embeddings = []
-        uncached_idx = []
-        uncached_texts = []
-        # 캐시 확인
-        for idx, text in enumerate(batch):
-            if text in cache:
-                batch_embeddings.append(cache[text])
-            else:
-                batch_embeddings.append(None)
-                uncached_idx.append(idx)
-                uncached_texts.append(text)
-        # uncached만 batch로 임베딩 요청
-        if uncached_texts:
-            try:
-                res = client.embeddings.create(input=uncached_texts, model=model)
-                for j, emb in enumerate(res.data):
-                    cache[uncached_texts[j]] = emb.embedding
-                    batch_embeddings[uncached_idx[j]] = emb.embedding
-            except Exception as e:
-                print(f"❌ 임베딩 실패(batch): {e}")
-                for j in uncached_idx:
-                    batch_embeddings[j] = [0.0]*1536
-        embeddings.extend(batch_embeddings)
-    return np.array(embeddings)
-
-# 4. 클러스터링 (DBSCAN)
-def cluster_embeddings(embeddings, eps=0.5, min_samples=3):
-    db = DBSCAN(eps=eps, min_samples=min_samples, metric='cosine')
-    labels = db.fit_predict(embeddings)
+        cache = EmbeddingCache(model, dimensions=dimensions)
+    store = EmbeddingStore(len(texts), dim=dimensions or EMBEDDING_DIM, dtype=dtype)
+    if keys is None:
+        keys = [text_key(text) for text in texts]
+    # 캐시 적중분은 행렬에서 한 번에 복사
+    cache_rows = cache.lookup_rows(keys)
+    hit = cache_rows >= 0
+    if hit.any():
+        store.fill(np.flatnonzero(hit), cache.matrix[cache_rows[hit]])
+    # 캐시에 없는 텍스트만 (중복 제거해서) 임베딩 요청
+    uncached = {}
+    for pos in np.flatnonzero(~hit):
+        uncached.setdefault(keys[pos], []).append(pos)
+    uncached_keys = list(uncached.keys())
+    if texts:
+        print(f"   💾 임베딩 캐시 적중: {int(hit.sum())}/{len(texts)}개")
+    if uncached_keys:
+        embedder = AsyncEmbedder(OPENAI_API_KEY, model=model, dim=store.dim, max_concurrency=max_concurrency,
+                                 dimensions=dimensions)
+        block, ok = embedder.embed_sync([texts[uncached[key][0]] for key in uncached_keys])
+        done = np.flatnonzero(ok)
+        if len(done):
+            rows = np.concatenate([uncached[uncached_keys[j]] for j in done])
+            src = np.repeat(done, [len(uncached[uncached_keys[j]]) for j in done])
+            store.fill(rows, block[src])
+            store.fresh[rows] = True
+            for j in done:
+                cache.put(uncached_keys[j], block[j])
+        if len(done) < len(uncached_keys):
+            print(f"❌ 임베딩 실패: {len(uncached_keys) - len(done)}개 텍스트")
+    cache.save()
+    return store
+
+# 4. 클러스터링 (DBSCAN / HDBSCAN / agglomerative)
+def cluster_embeddings(embeddings, eps=0.5, min_samples=3, valid=None, graph=None, engine='dbscan'):
+    """
+    valid=False인 행(임베딩 실패)은 클러스터링에서 빼고 noise(-1)로 표시
+    graph: valid 행끼리의 radius_neighbor_graph (radius >= eps), 주어지면 거리 계산 없이 재사용
+    engine: cluster_engines.ENGINES 중 하나 (hdbscan은 eps를 쓰지 않고 min_samples만 사용)
+    """
+    labels = np.full(len(embeddings), -1, dtype=np.int64)
+    rows = np.arange(len(embeddings)) if valid is None else np.flatnonzero(valid)
+    if len(rows) == 0:
+        return labels
+    labels[rows] = run_engine(engine, embeddings[rows] if valid is not None else embeddings,
+                              eps, min_samples, graph=graph)
     return labels
 
+def auto_tune_eps(embeddings, valid, min_samples=3, min_eps=0.1, max_eps=0.7):
+    """카테고리 기사들의 min_samples번째 이웃 거리 곡선(k-distance)의 knee를 eps로 선택"""
+    rows = np.flatnonzero(valid)
+    if len(rows) < min_samples:
+        return max_eps
+    k_distances = knn_distances(embeddings[rows], min_samples)[:, -1]
+    return knee_eps(k_distances, min_eps=min_eps, max_eps=max_eps)
+
+def category_neighbor_graph(embeddings, valid, radius, keys=None, ann_index=None):
+    """
+    카테고리 valid 행끼리의 희소 이웃 그래프 (grid의 모든 eps <= radius 조합이 공유)
+    ann_index가 있으면 keys(행별 임베딩 캐시 키)로 근사 이웃 그래프 생성
+    """
+    rows = np.flatnonzero(valid)
+    if ann_index is not None:
+        return ann_index.radius_graph([keys[row] for row in rows], embeddings[rows], radius)
+    return radius_neighbor_graph(embeddings[rows], radius)
+
 # 5. 클러스터 대표 이슈 요약 (gpt-3.5-turbo)
-def summarize_cluster(df_cluster, model="gpt-3.5-turbo", max_tokens=300, max_articles=12, chunk_size=6000):
-    enc = tiktoken.encoding_for_model(model)
-    # 1. 언론사/편향별 고른 샘플링
+SUMMARY_PROMPT_HEAD = "다음 뉴스 기사들을 대표하는 이슈에 대해, 처음 보는 사람도 이해할 수 있도록 4~5문단 이상의 풍부한 설명, 배경, 주요 쟁점까지 포함해 자세히 요약해줘:\n"
+
+def run_with_llm_pool(make_coro, max_concurrency=8, timeout=60.0):
+    """LLMPool을 열어 make_coro(llm) 코루틴을 실행 (동기 코드에서 호출용)"""
+    async def run():
+        async with LLMPool(OPENAI_API_KEY, max_concurrency=max_concurrency, timeout=timeout) as llm:
+            return await make_coro(llm)
+    return asyncio.run(run())
+
+def sample_summary_rows(df_cluster, max_articles=12):
+    """요약용 기사 샘플 (random_state 고정이라 본문을 채우기 전후에 같은 기사가 뽑힘)"""
+    # 언론사/편향별 고른 샘플링
     sampled = []
     # 우선 bias별 그룹핑
     for bias in ['left', 'center', 'right']:
@@ -209,105 +257,125 @@ def summarize_cluster(df_cluster, model="gpt-3.5-turbo", max_tokens=300, max_art
         group = group[df_cluster['bias'] == bias] if 'bias' in df_cluster else df_cluster
         group = group.sample(min(len(group), max_articles//3), random_state=42) if len(group) > 0 else pd.DataFrame()
         sampled.append(group)
-    sampled_df = pd.concat(sampled) if sampled else df_cluster.sample(min(len(df_cluster), max_articles), random_state=42)
-    # 2. 기사별로 제목+본문 일부만 추출
-    def make_text(row):
-        title = str(row['title'])
-        content = str(row['content'])[:1000]
-        return f"[제목] {title}\n[본문] {content}"
+    return pd.concat(sampled) if sampled else df_cluster.sample(min(len(df_cluster), max_articles), random_state=42)
+
+def sample_title_rows(df_cluster, max_articles=8):
+    """제목 생성용 대표 기사 샘플"""
+    return df_cluster.sample(min(len(df_cluster), max_articles), random_state=42)
+
+def summary_article_text(row):
+    """요약/요약 갱신 프롬프트의 기사 텍스트 (제목 + 본문 앞 1000자)"""
+    return f"[제목] {row['title']}\n[본문] {str(row['content'])[:1000]}"
+
+def title_article_text(row):
+    """제목 생성 프롬프트의 기사 텍스트 (제목 + 본문 앞 200자)"""
+    return f"• {row['title']}\n  요약: {str(row['content'])[:200]}..."
+
+# 프롬프트 종류별 (기사 텍스트 함수, 기사 행에 저장하는 토큰 수 컬럼)
+ARTICLE_PROMPT_TEXTS = {
+    'summary': (summary_article_text, 'summary_tokens'),
+    'title': (title_article_text, 'title_tokens'),
+}
+
+def article_prompt_texts(sampled_df, kind):
+    """
+    샘플 기사들의 프롬프트용 텍스트와 토큰 수 목록
+    토큰 수는 load_sampled_bodies가 기사 행에 저장해 둔 값을 쓰고, 없을 때만 공유 인코더로 한 번에 셈
+    """
+    make_text, column = ARTICLE_PROMPT_TEXTS[kind]
     texts = [make_text(row) for _, row in sampled_df.iterrows()]
-    # 3. context 초과 방지: 토큰 길이 체크 및 자르기
-    prompt_head = "다음 뉴스 기사들을 대표하는 이슈에 대해, 처음 보는 사람도 이해할 수 있도록 4~5문단 이상의 풍부한 설명, 배경, 주요 쟁점까지 포함해 자세히 요약해줘:\n"
+    if column in sampled_df and sampled_df[column].notna().all():
+        return texts, sampled_df[column].astype(int).tolist()
+    return texts, count_tokens(texts)
+
+def sample_summary_texts(df_cluster, max_articles=12):
+    """요약용 기사 샘플링 후 ("[제목] ...\n[본문] ..." 텍스트 목록, 토큰 수 목록) (제목+요약 통합 호출과 공유)"""
+    return article_prompt_texts(sample_summary_rows(df_cluster, max_articles), 'summary')
+
+async def summarize_cluster_async(df_cluster, llm, model="gpt-3.5-turbo", max_tokens=300, max_articles=12, chunk_size=6000,
+                                  max_prompt_tokens=14000):
+    texts, counts = sample_summary_texts(df_cluster, max_articles)
+    # 3. context 초과 방지: 기사별 토큰 수 합으로 길이 확인 (프롬프트를 다시 인코딩하지 않음)
+    prompt_head = SUMMARY_PROMPT_HEAD
     joined = "\n\n".join(texts)
-    tokens = len(enc.encode(prompt_head + joined))
+    tokens = fixed_tokens(prompt_head) + joined_tokens(counts)
     # 너무 길면 chunk별 부분 요약 후 합치기
-    if tokens > 14000:
-        # chunk 단위로 나눠 부분 요약
-        chunked = []
-        cur = []
-        cur_tokens = 0
-        for t in texts:
-            t_tokens = len(enc.encode(t))
-            if cur_tokens + t_tokens > chunk_size:
-                chunked.append(cur)
-                cur = []
-                cur_tokens = 0
-            cur.append(t)
-            cur_tokens += t_tokens
-        if cur:
-            chunked.append(cur)
+    if tokens > max_prompt_tokens:
+        # 기사별 토큰 수로 chunk_size 안에 들어가게 묶어 부분 요약
+        chunked = [[texts[j] for j in chunk] for chunk in pack_chunks(counts, chunk_size)]
+        # 부분 요약은 동시에 요청하고 chunk 순서대로 합침
+        results = await asyncio.gather(*(
+            llm.complete(prompt_head + "\n\n".join(chunk), model=model, max_tokens=max_tokens, temperature=0.4)
+            for chunk in chunked
+        ), return_exceptions=True)
         partial_summaries = []
-        for chunk in chunked:
-            prompt = prompt_head + "\n\n".join(chunk)
-            try:
-                res = client.chat.completions.create(
-                    model=model,
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=max_tokens,
-                    temperature=0.4
-                )
-                content = getattr(res.choices[0].message, "content", None)
-                if content:
-                    partial_summaries.append(content.strip())
-            except Exception as e:
-                print(f"❌ 부분 요약 실패: {e}")
+        for result in results:
+            if isinstance(result, BaseException):
+                print(f"❌ 부분 요약 실패: {result!r}")
+            elif result:
+                partial_summaries.append(result)
         # 부분 요약 합쳐서 최종 요약
         final_prompt = prompt_head + "\n\n".join(partial_summaries)
         try:
-            res = client.chat.completions.create(
-                model=model,
-                messages=[{"role": "user", "content": final_prompt}],
-                max_tokens=max_tokens,
-                temperature=0.4
-            )
-            content = getattr(res.choices[0].message, "content", None)
-            if content:
-                return content.strip()
-            else:
-                return "요약 실패"
+            content = await llm.complete(final_prompt, model=model, max_tokens=max_tokens, temperature=0.4)
+            return content if content else "요약 실패"
         except Exception as e:
-            print(f"❌ 최종 요약 실패: {e}")
+            print(f"❌ 최종 요약 실패: {e!r}")
             return "요약 실패"
     else:
         prompt = prompt_head + joined
         try:
-            res = client.chat.completions.create(
-                model=model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=max_tokens,
-                temperature=0.4
-            )
-            content = getattr(res.choices[0].message, "content", None)
-            if content:
-                return content.strip()
-            else:
-                return "요약 실패"
+            content = await llm.complete(prompt, model=model, max_tokens=max_tokens, temperature=0.4)
+            return content if content else "요약 실패"
         except Exception as e:
-            print(f"❌ 요약 실패: {e}")
+            print(f"❌ 요약 실패: {e!r}")
             return "요약 실패"
 
+def summarize_cluster(df_cluster, **kwargs):
+    return run_with_llm_pool(lambda llm: summarize_cluster_async(df_cluster, llm, **kwargs))
+
 # 5-1. 클러스터 대표 제목 생성 (GPT가 직관적이고 흥미로운 제목 생성)
-def generate_cluster_title(df_cluster, model="gpt-3.5-turbo", max_tokens=100, max_articles=8):
-    """
-    클러스터에 포함된 기사들을 분석해서 GPT가 직관적이고 흥미로운 제목을 생성
-    """
-    enc = tiktoken.encoding_for_model(model)
-    
-    # 1. 대표 기사들 샘플링 (너무 많으면 토큰 초과)
-    sampled_df = df_cluster.sample(min(len(df_cluster), max_articles), random_state=42)
-    
-    # 2. 기사별로 제목+본문 요약 추출
-    def make_text(row):
-        title = str(row['title'])
-        content = str(row['content'])[:500]  # 제목 생성용이므로 짧게
-        return f"• {title}\n  요약: {content[:200]}..."
+def fallback_cluster_title(df_cluster):
+    """제목 생성 실패 시 기사 제목에서 핵심 키워드 추출 (summary와 완전히 다른 방식)"""
+    if len(df_cluster) > 0:
+        # 가장 대표적인 기사 제목을 기반으로 임팩트 있는 제목 생성
+        original_title = str(df_cluster['title'].iloc[0])
+        
+        # 핵심 단어 추출을 위한 간단한 처리
+        keywords = []
+        common_words = ['기자', '뉴스', '일보', '방송', '취재', '보도', '발표', '기사']
+        
+        words = original_title.split()
+        for word in words:
+            if len(word) > 1 and word not in common_words:
+                keywords.append(word)
+                if len(keywords) >= 3:  # 최대 3개 키워드
+                    break
+        
+        if keywords:
+            fallback_title = ' '.join(keywords[:2])  # 상위 2개 키워드만
+            if len(fallback_title) > 25:
+                fallback_title = fallback_title[:22] + "..."
+            return fallback_title + " 이슈!"
+        else:
+            return original_title[:20] + "... 주목!"
+    return "긴급 이슈 발생!"
+
+def clean_cluster_title(content):
+    """생성된 제목 정리 (따옴표, 불필요한 문자 제거, 길이 제한)"""
+    if not content:
+        return "새로운 이슈 발생"
+    title = content.strip().strip('"').strip("'").strip()
     
-    texts = [make_text(row) for _, row in sampled_df.iterrows()]
+    # 제목이 너무 길면 자르기
+    if len(title) > 50:
+        title = title[:47] + "..."
     
-    # 3. 제목 전용 프롬프트 (summary와 확실히 구분)
-    prompt = f"""다음은 같은 이슈에 관한 뉴스 기사들입니다:
+    return title if title else "새로운 이슈 발생"
+
+TITLE_PROMPT = """다음은 같은 이슈에 관한 뉴스 기사들입니다:
 
-{chr(10).join(texts)}
+{articles}
 
 위 기사들의 핵심 이슈를 한눈에 파악할 수 있는 **임팩트 있는 헤드라인**을 만들어주세요.
 
@@ -320,69 +388,354 @@ def generate_cluster_title(df_cluster, model="gpt-3.5-turbo", max_tokens=100, ma
 
 반드시 제목만 출력하세요:"""
 
-    # 4. 토큰 길이 체크
-    tokens = len(enc.encode(prompt))
-    if tokens > 3000:  # 너무 길면 기사 수 줄이기
-        sampled_df = df_cluster.sample(min(len(df_cluster), 4), random_state=42)
-        texts = [make_text(row) for _, row in sampled_df.iterrows()]
-        prompt = f"""다음 기사들의 핵심 이슈를 나타내는 임팩트 있는 헤드라인을 15-25자로 생성하세요:
+TITLE_PROMPT_SHORT = """다음 기사들의 핵심 이슈를 나타내는 임팩트 있는 헤드라인을 15-25자로 생성하세요:
 
-{chr(10).join(texts)}
+{articles}
 
 짧고 강렬한 제목만 출력:"""
 
-    # 5. GPT 호출
+async def generate_cluster_title_async(df_cluster, llm, model="gpt-3.5-turbo", max_tokens=100, max_articles=8,
+                                       max_prompt_tokens=3000):
+    """
+    클러스터에 포함된 기사들을 분석해서 GPT가 직관적이고 흥미로운 제목을 생성
+    """
+    # 1. 대표 기사들 샘플링 후 기사별 제목+본문 요약 텍스트 (너무 많으면 토큰 초과)
+    texts, counts = article_prompt_texts(sample_title_rows(df_cluster, max_articles), 'title')
+    
+    # 2. 제목 전용 프롬프트 (summary와 확실히 구분)
+    prompt = TITLE_PROMPT.format(articles="\n".join(texts))
+
+    # 3. 토큰 길이 체크 (기사별 토큰 수 + 프롬프트 틀의 토큰 수)
+    tokens = fixed_tokens(TITLE_PROMPT.format(articles="")) + joined_tokens(counts, "\n")
+    if tokens > max_prompt_tokens:  # 너무 길면 기사 수 줄이기
+        texts, _ = article_prompt_texts(sample_title_rows(df_cluster, 4), 'title')
+        prompt = TITLE_PROMPT_SHORT.format(articles="\n".join(texts))
+
+    # 4. GPT 호출 (창의적인 제목을 위해 temperature 조금 높게)
     try:
-        res = client.chat.completions.create(
-            model=model,
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=max_tokens,
-            temperature=0.7  # 창의적인 제목을 위해 조금 높게
-        )
-        content = getattr(res.choices[0].message, "content", None)
-        if content:
-            # 생성된 제목 정리 (따옴표, 불필요한 문자 제거)
-            title = content.strip().strip('"').strip("'").strip()
-            
-            # 제목이 너무 길면 자르기
-            if len(title) > 50:
-                title = title[:47] + "..."
-            
-            return title if title else "새로운 이슈 발생"
-        else:
-            return "새로운 이슈 발생"
+        content = await llm.complete(prompt, model=model, max_tokens=max_tokens, temperature=0.7)
+        return clean_cluster_title(content)
     except Exception as e:
-        print(f"❌ 제목 생성 실패: {e}")
-        # 폴백: 기사 제목에서 핵심 키워드 추출 (summary와 완전히 다른 방식)
-        if len(df_cluster) > 0:
-            # 가장 대표적인 기사 제목을 기반으로 임팩트 있는 제목 생성
-            original_title = str(df_cluster['title'].iloc[0])
-            
-            # 핵심 단어 추출을 위한 간단한 처리
-            keywords = []
-            common_words = ['기자', '뉴스', '일보', '방송', '취재', '보도', '발표', '기사']
-            
-            words = original_title.split()
-            for word in words:
-                if len(word) > 1 and word not in common_words:
-                    keywords.append(word)
-                    if len(keywords) >= 3:  # 최대 3개 키워드
-                        break
-            
-            if keywords:
-                fallback_title = ' '.join(keywords[:2])  # 상위 2개 키워드만
-                if len(fallback_title) > 25:
-                    fallback_title = fallback_title[:22] + "..."
-                return fallback_title + " 이슈!"
-            else:
-                return original_title[:20] + "... 주목!"
-        return "긴급 이슈 발생!"
+        print(f"❌ 제목 생성 실패: {e!r}")
+        return fallback_cluster_title(df_cluster)
+
+def generate_cluster_title(df_cluster, **kwargs):
+    return run_with_llm_pool(lambda llm: generate_cluster_title_async(df_cluster, llm, **kwargs))
+
+# 5-2. 제목+요약 한 번에 생성 (JSON 응답)
+TITLE_SUMMARY_PROMPT_TAIL = """
+
+위 기사들을 바탕으로 아래 두 가지를 작성해줘.
+1. title: 핵심 이슈를 한눈에 파악할 수 있는 임팩트 있는 뉴스 헤드라인 (15-25자, "!", "?", "..." 등으로 강조, 상세 설명 금지)
+2. summary: 위 요청대로 4~5문단 이상의 자세한 이슈 요약
+
+반드시 {"title": "...", "summary": "..."} 형식의 JSON 객체만 출력해."""
+
+# 프롬프트를 바꾸면 요약 캐시가 자동으로 무효화되도록 프롬프트 내용으로 버전 생성
+# (제목 전용 프롬프트 등 함수 안의 프롬프트를 바꿀 때는 PROMPT_REVISION을 올릴 것)
+PROMPT_REVISION = 1
+PROMPT_VERSION = hashlib.sha256(
+    f"{PROMPT_REVISION}\n{SUMMARY_PROMPT_HEAD}\n{TITLE_SUMMARY_PROMPT_TAIL}".encode('utf-8')
+).hexdigest()[:16]
+
+def parse_title_summary(content):
+    """통합 호출 응답(JSON)에서 (제목, 요약) 추출, 형식이 맞지 않으면 None"""
+    if not content:
+        return None
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    title = data.get('title')
+    summary = data.get('summary')
+    if not isinstance(title, str) or not isinstance(summary, str) or not title.strip() or not summary.strip():
+        return None
+    return clean_cluster_title(title), summary.strip()
+
+async def generate_title_and_summary_async(df_cluster, llm, model="gpt-3.5-turbo", max_tokens=450, max_articles=12, max_prompt_tokens=14000):
+    """
+    요약용 샘플 기사와 프롬프트를 공유해서 제목과 요약을 한 번의 호출로 생성
+    반환: (제목, 요약), 프롬프트가 너무 길거나 응답 파싱에 실패하면 None (기존 2회 호출로 대체)
+    """
+    texts, counts = sample_summary_texts(df_cluster, max_articles)
+    # 부분 요약(chunk)이 필요한 긴 클러스터는 기존 경로로 처리
+    if fixed_tokens(SUMMARY_PROMPT_HEAD) + joined_tokens(counts) + fixed_tokens(TITLE_SUMMARY_PROMPT_TAIL) > max_prompt_tokens:
+        return None
+    prompt = SUMMARY_PROMPT_HEAD + "\n\n".join(texts) + TITLE_SUMMARY_PROMPT_TAIL
+    try:
+        content = await llm.complete(prompt, model=model, max_tokens=max_tokens, temperature=0.5, json_mode=True)
+    except Exception as e:
+        print(f"⚠️ 제목+요약 통합 생성 실패, 개별 생성으로 대체: {e!r}")
+        return None
+    result = parse_title_summary(content)
+    if result is None:
+        print("⚠️ 제목+요약 JSON 파싱 실패, 개별 생성으로 대체")
+    return result
+
+# 5-3. 기존 요약 + 새 기사로 요약 갱신 (소수 기사만 추가된 클러스터)
+SUMMARY_UPDATE_PROMPT = """다음은 어떤 뉴스 이슈에 대한 기존 요약과, 이 이슈에 새로 추가된 기사들이야.
+기존 요약의 구성과 분량(4~5문단 이상)을 유지하면서 새 기사에서 달라지거나 추가된 사실, 쟁점을 반영해 갱신된 요약을 작성해줘.
+요약만 출력해.
+
+[기존 요약]
+{summary}
+
+[새 기사]
+{articles}"""
+
+async def update_summary_async(previous_summary, df_new, llm, model="gpt-3.5-turbo", max_tokens=300, max_articles=6):
+    """기존 요약과 새로 추가된 기사만으로 갱신된 요약 생성 (실패하면 None → 전체 재생성)"""
+    texts = [summary_article_text(row) for _, row in df_new.head(max_articles).iterrows()]
+    prompt = SUMMARY_UPDATE_PROMPT.format(summary=previous_summary, articles="\n\n".join(texts))
+    try:
+        return await llm.complete(prompt, model=model, max_tokens=max_tokens, temperature=0.4)
+    except Exception as e:
+        print(f"⚠️ 요약 갱신 실패, 전체 재생성으로 대체: {e!r}")
+        return None
+
+# 5-4. 샘플 기사 본문만 조회
+def attach_bodies(df, bodies, token_counts=None):
+    """
+    df의 content를 bodies(기사 id → 본문)로 채운 사본 (이미 있는 본문 유지, 없으면 빈 문자열)
+    token_counts({컬럼: {기사 id: 토큰 수}})가 있으면 기사별 프롬프트 텍스트 토큰 수 컬럼도 추가
+    """
+    ids = df['id'].astype(str)
+    content = ids.map(bodies)
+    if 'content' in df:
+        content = df['content'].where(df['content'].notna(), content)
+    columns = {column: ids.map(counts).astype('Int32') for column, counts in (token_counts or {}).items()}
+    return df.assign(content=content.fillna(''), **columns)
+
+def load_sampled_bodies(df_clusters, indices, deltas):
+    """
+    indices 클러스터의 제목/요약/요약 갱신 프롬프트에 샘플링될 기사 본문만 한 번에 조회해 채우고,
+    샘플 기사의 프롬프트용 텍스트 토큰 수도 한 번에 세어 기사 행(summary_tokens, title_tokens)에 저장
+    반환: 본문을 채운 df_clusters 사본 (deltas의 새 기사 df도 제자리에서 교체)
+    """
+    frames = []
+    for i in indices:
+        df_cluster = df_clusters[i]
+        # 제목 생성은 프롬프트가 길면 4개로 다시 샘플링
+        frames += [sample_summary_rows(df_cluster), sample_title_rows(df_cluster), sample_title_rows(df_cluster, 4)]
+        if i in deltas:
+            frames.append(deltas[i][1].head(6))
+    sampled = pd.concat(frames)
+    sampled = sampled[~sampled['id'].astype(str).duplicated()]
+    missing = sampled['content'].isna() if 'content' in sampled else np.ones(len(sampled), dtype=bool)
+    ids = sampled.loc[missing, 'id'].astype(str).tolist()
+    bodies = storage.select_article_bodies(ids) if ids else {}
+    if ids:
+        print(f"📄 요약용 샘플 기사 본문 조회: {len(ids)}개 (클러스터 {len(indices)}개)")
+    # 프롬프트 종류별 기사 텍스트를 한 번의 encode_batch로 셈 (클러스터마다 다시 인코딩하지 않음)
+    records = attach_bodies(sampled, bodies)[['id', 'title', 'content']].to_dict('records')
+    sampled_ids = [str(record['id']) for record in records]
+    counts = iter(count_tokens([make_text(record) for make_text, _ in ARTICLE_PROMPT_TEXTS.values() for record in records]))
+    token_counts = {column: {article_id: next(counts) for article_id in sampled_ids}
+                    for _, column in ARTICLE_PROMPT_TEXTS.values()}
+    df_clusters = list(df_clusters)
+    for i in indices:
+        df_clusters[i] = attach_bodies(df_clusters[i], bodies, token_counts)
+        if i in deltas:
+            entry, df_new = deltas[i]
+            deltas[i] = (entry, attach_bodies(df_new, bodies, token_counts))
+    return df_clusters
+
+# 5-5. 전체 클러스터 제목/요약 동시 생성
+def generate_titles_and_summaries(df_clusters, max_concurrency=8, timeout=60.0, combined=True,
+                                  cache=None, reuse_threshold=0.8, delta_threshold=0.3):
+    """
+    모든 클러스터의 제목/요약(부분 요약 포함) 호출을 하나의 LLMPool로 동시에 실행
+    combined=True면 클러스터당 1회 호출(JSON)로 제목과 요약을 함께 받고, 실패한 클러스터만 2회 호출로 생성
+    cache(SummaryCache)가 있으면
+    - 구성이 같거나 기사 id Jaccard가 reuse_threshold 이상인 클러스터는 그대로 재사용
+    - 그 외 새 기사 비율과 빠진 기사 비율이 모두 delta_threshold 이하인 클러스터는 기존 요약 + 새 기사만으로
+      1회 갱신 (제목 유지, summary_cache.reuse_plan)
+    본문은 캐시로 처리되지 않은 클러스터의 샘플 기사만 조회
+    반환: df_clusters 순서대로 (제목, 요약) 목록
+    """
+    if not df_clusters:
+        return []
+    results = [None] * len(df_clusters)
+    todo = list(range(len(df_clusters)))
+    deltas = {}
+    if cache is not None:
+        hits = {'exact': 0, 'overlap': 0}
+        todo = []
+        for i, df_cluster in enumerate(df_clusters):
+            entry = cache.closest(df_cluster['id'])
+            plan = reuse_plan(entry, reuse_threshold, delta_threshold)
+            if plan == 'reuse':
+                cache.touch(entry['key'])
+                results[i] = (entry['title'], entry['summary'])
+                hits[entry['match']] += 1
+                continue
+            todo.append(i)
+            if plan == 'delta':
+                df_new = df_cluster[df_cluster['id'].astype(str).isin(entry['new_ids'])]
+                deltas[i] = (entry, df_new)
+        print(f"💾 요약 캐시: 동일 {hits['exact']}개, 유사(≥{reuse_threshold}) {hits['overlap']}개 재사용 | "
+              f"요약 갱신 {len(deltas)}개, 새로 생성 {len(todo) - len(deltas)}개")
+        if not todo:
+            return results
+    # 본문은 샘플링된 기사만 일괄 조회
+    df_clusters = load_sampled_bodies(df_clusters, todo, deltas)
+    fallbacks = []
+    async def run(llm):
+        async def one(i):
+            df_cluster = df_clusters[i]
+            if i in deltas:
+                entry, df_new = deltas[i]
+                summary = await update_summary_async(entry['summary'], df_new, llm)
+                if summary:
+                    return entry['title'], summary
+            if combined:
+                result = await generate_title_and_summary_async(df_cluster, llm)
+                if result is not None:
+                    return result
+                fallbacks.append(1)
+            return await asyncio.gather(
+                generate_cluster_title_async(df_cluster, llm),
+                summarize_cluster_async(df_cluster, llm)
+            )
+        return await asyncio.gather(*(one(i) for i in todo))
+    mode = "통합 호출" if combined else "개별 호출"
+    print(f"🎯 클러스터 {len(todo)}개 제목/요약 동시 생성 중... ({mode}, 동시 {max_concurrency}개)")
+    started = datetime.now()
+    generated = run_with_llm_pool(run, max_concurrency=max_concurrency, timeout=timeout)
+    if combined and fallbacks:
+        print(f"   ↩️ 개별 호출로 대체된 클러스터: {len(fallbacks)}개")
+    print(f"✨ 제목/요약 생성 완료 ({(datetime.now() - started).total_seconds():.1f}초)")
+    for i, result in zip(todo, generated):
+        results[i] = tuple(result)
+        # 새로 생성한 결과만 기록 (유사 재사용 결과는 원래 구성 기준으로 남겨서 변화가 누적되면 다시 생성)
+        if cache is not None and result[1] != "요약 실패":
+            cache.put(df_clusters[i]['id'], *result)
+    if cache is not None:
+        cache.save()
+    return results
+
+# 5-6. 클러스터 카드 구성
+def build_cluster_entries(df, labels):
+    """
+    클러스터별 기사/편향 집계 (noise 제외)
+    df: category로 정렬한 전체 기사 (media_bias 컬럼 포함), labels: 행별 카테고리 내 클러스터 번호 (noise -1)
+    (category, 클러스터 번호)로 한 번만 groupby하고 편향 수는 그룹별 value_counts로 집계
+    반환: (category, 클러스터 번호) 순서의 entry 목록
+    """
+    labels = np.asarray(labels)
+    clustered = df[labels != -1]
+    if len(clustered) == 0:
+        return []
+    cluster_ids = pd.Series(labels[labels != -1], index=clustered.index, name='cluster_id')
+    grouped = clustered.groupby([clustered['category'], cluster_ids], observed=True, sort=True)
+    bias_counts = (grouped['media_bias'].value_counts().unstack(fill_value=0)
+                   .reindex(columns=BIAS_GROUPS, fill_value=0).to_dict('index'))
+    return [{'category': category, 'cluster_id': int(cluster_id), 'df_cluster': df_cluster,
+             'bias_counter': {bias: int(count) for bias, count in bias_counts[(category, cluster_id)].items()}}
+            for (category, cluster_id), df_cluster in grouped]
+
+def make_cluster_card(category, entry, cluster_title, summary):
+    """(카드 텍스트, JSON용 클러스터 정보) 생성"""
+    df_cluster = entry['df_cluster']
+    bias_counter = entry['bias_counter']
+    cluster_id = entry['cluster_id']
+    total = sum(bias_counter.values())
+    bias_percent = {k: (v, v/total*100 if total else 0) for k, v in bias_counter.items()}
+    bar = '🟥'*int(bias_percent['left'][1]//5) + '⬜'*int(bias_percent['center'][1]//5) + '🟦'*int(bias_percent['right'][1]//5)
+    card_lines = []
+    card_lines.append(f"🏷️ 카테고리: **{category}** | 클러스터 #{cluster_id+1}\n")
+    card_lines.append(f"### 🏷️ 이슈 제목\n**{cluster_title}**\n")
+    card_lines.append("========================================\n")
+    card_lines.append(f"#### 🧠 대표 이슈 요약\n\n**{summary}**\n")
+    card_lines.append("========================================\n")
+    card_lines.append(f"#### 📰 포함된 기사들 (총 {len(df_cluster)}개)\n")
+    card_lines.append(f"#### 📊 편향 게이지\n{bar}\nleft: {bias_counter['left']} ({round(bias_percent['left'][1],1)}%) | center: {bias_counter['center']} ({round(bias_percent['center'][1],1)}%) | right: {bias_counter['right']} ({round(bias_percent['right'][1],1)}%)\n")
+    card = {'category': category, 'card_text': "\n".join(card_lines)}
+    cluster_json = {
+        'category': category,
+        'title': cluster_title,
+        'summary': summary,
+        'article_count': len(df_cluster),
+        'bias_left': bias_counter['left'],
+        'bias_center': bias_counter['center'],
+        'bias_right': bias_counter['right'],
+        'article_ids': df_cluster['id'].tolist()
+    }
+    if entry.get('issue_id'):
+        # 증분 모드: 실행이 바뀌어도 유지되는 이슈 id
+        cluster_json['issue_id'] = entry['issue_id']
+    return card, cluster_json
 
 # 6. 전체 파이프라인 실행
-def main(output_path=None, eps_list=None, min_samples_list=None):
-    df = fetch_articles()
-    # 임베딩 입력 길이 제한(3000자)
-    df['text'] = (df['title'] + '\n' + df['content'].fillna('')).str.slice(0, 3000)
+def embed_articles(df, model="text-embedding-3-small", reducer=None, keep_keys=()):
+    """
+    df를 category 기준으로 정렬해 전체 기사 임베딩을 한 번에 생성
+    text_hash가 임베딩 캐시에 있는 기사는 본문 없이 캐시 벡터를 쓰고, 나머지 기사만 본문을 일괄 조회해 입력 텍스트 생성
+    reducer(EmbeddingReducer)가 있으면 api 방식은 짧은 임베딩을 요청하고, pca/random 방식은 받은 벡터를 축소
+    keep_keys는 현재 기사에 없어도 캐시에서 지우지 않을 키 (증분 모드의 이전 이슈 멤버)
+    반환: (정렬된 df, EmbeddingStore, 카테고리 → 행 구간 slice)
+    """
+    df = df.sort_values('category', kind='stable').reset_index(drop=True)
+    dimensions = reducer.api_dimensions if reducer is not None else None
+    embedding_cache = EmbeddingCache(model, dimensions=dimensions)
+    # 임베딩 캐시/ANN 인덱스 키 (입력 텍스트 sha256, 업로드 시 저장한 text_hash가 있으면 그대로 사용)
+    hashes = df['text_hash'] if 'text_hash' in df else pd.Series(None, index=df.index, dtype=object)
+    cached = hashes.notna().to_numpy() & (embedding_cache.lookup_rows(hashes.fillna('').tolist()) >= 0)
+    need_text = ~cached
+    if need_text.any():
+        df = load_article_bodies(df, need_text)
+    texts = [None] * len(df)
+    for row in np.flatnonzero(need_text):
+        texts[row] = embedding_text(df.at[row, 'title'], df.at[row, 'content'])
+    df['embed_key'] = [hashes.iat[row] if cached[row] else text_key(texts[row]) for row in range(len(df))]
+    # 현재 기사와 keep_keys에 없는 캐시 항목 정리
+    embedding_cache.evict(set(df['embed_key']) | set(keep_keys))
+    print(f"🧠 전체 임베딩 생성 중... ({len(df)}개 기사, 캐시/batch)")
+    store = get_embeddings(texts, model=model, cache=embedding_cache, dimensions=dimensions,
+                           keys=df['embed_key'].tolist())
+    invalid = int((~store.valid).sum())
+    if invalid:
+        print(f"⚠️ 임베딩 실패 {invalid}개 기사는 클러스터링에서 제외됩니다")
+    if reducer is not None and reducer.method != 'api':
+        reducer.update(store.vectors[store.valid], store.fresh[store.valid])
+        if reducer.fitted:
+            full_dim = store.dim
+            store = reducer.reduce_store(store)
+            print(f"📉 차원 축소({reducer.method}, 기준 {reducer.version}): {full_dim} → {store.dim}차원")
+        else:
+            print("⚠️ 차원 축소를 건너뛰고 전체 차원으로 클러스터링합니다")
+    print(f"📦 임베딩 행렬: {store.vectors.shape} {store.vectors.dtype} ({store.nbytes / 1024 / 1024:.1f}MB)")
+    return df, store, category_slices(df['category'])
+
+def build_ann_index(df, store, model="text-embedding-3-small", reducer=None):
+    """
+    임베딩 캐시 옆에 저장된 HNSW 인덱스에 현재 기사 벡터를 증분 반영 (hnswlib가 없으면 None)
+    차원 축소를 쓰면 방식별로 인덱스를 따로 두고, 축소 기준(reducer.version)이 바뀌면 새로 만듦
+    """
+    if not ann_available():
+        print("⚠️ hnswlib가 설치되지 않아 ANN 대신 정확한 이웃 계산을 사용합니다")
+        return None
+    if reducer is not None and store.dim == reducer.n_components:
+        index = ANNIndex(f'{model}.{reducer.tag}', store.dim, version=reducer.version)
+    else:
+        index = ANNIndex(model, store.dim)
+    removed = index.evict(df['embed_key'])
+    rows = np.flatnonzero(store.valid)
+    added = index.add(df['embed_key'].to_numpy()[rows].tolist(), store.vectors[rows])
+    index.save()
+    print(f"🧭 ANN 인덱스: {len(index)}개 벡터 (추가 {added}개, 삭제 {removed}개)")
+    return index
+
+def main(output_path=None, eps_list=None, min_samples_list=None, combined=True, use_summary_cache=True, summarize=True,
+         use_ann=False, reduction=None, window_hours=None):
+    """
+    (eps, min_samples) grid 탐색: 조합마다 LLM 호출 없이 품질 지표(클러스터 수, noise 비율, 샘플 silhouette,
+    편향 분포)만 계산하고, score가 가장 높은 조합에 대해서만 제목/요약 생성 (summarize=False면 생략)
+    use_ann=True면 이웃 그래프를 ANN 인덱스로 근사 계산, reduction('pca:256' 등)이 있으면 축소한 임베딩 사용
+    """
+    df = fetch_articles(window_hours)
     media_map = fetch_media_outlets()
     categories = df['category'].unique()
     # 파라미터 grid
@@ -396,110 +749,90 @@ def main(output_path=None, eps_list=None, min_samples_list=None):
         output_path = f"{now_str}_grid.json"
     all_results = []
     summary_lines = []
-    summary_lines.append("| eps | min_samples | category | clusters | noise | total |")
-    summary_lines.append("|-----|-------------|----------|----------|-------|-------|")
-    # 전체 기사 임베딩 캐싱 (텍스트: 벡터)
-    embedding_cache = {}
-    # 카테고리별 텍스트 미리 준비
-    cat_texts = {cat: df[df['category'] == cat]['text'].tolist() for cat in categories}
-    cat_embeddings = {}
-    for category in categories:
-        texts = cat_texts[category]
-        if len(texts) == 0:
-            cat_embeddings[category] = np.zeros((0, 1536))
-        else:
-            print(f"🧠 [{category}] 전체 임베딩 생성 중... (중복 제거, batch)")
-            cat_embeddings[category] = get_embeddings(texts, cache=embedding_cache)
+    summary_lines.append("| eps | min_samples | category | clusters | noise | total | silhouette | bias_spread |")
+    summary_lines.append("|-----|-------------|----------|----------|-------|-------|------------|-------------|")
+    # 전체 기사 임베딩 (디스크 캐시 + 카테고리별 슬라이스)
+    reducer = create_reducer(reduction)
+    df, store, cat_slices = embed_articles(df, reducer=reducer)
+    # 카테고리별 이웃 그래프를 가장 큰 eps 기준으로 한 번만 계산해 모든 조합에서 재사용
+    ann_index = build_ann_index(df, store, reducer=reducer) if use_ann else None
+    started = datetime.now()
+    graphs = {category: category_neighbor_graph(*store.view(rows), radius=max(eps_list),
+                                                keys=df['embed_key'].tolist()[rows], ann_index=ann_index)
+              for category, rows in cat_slices.items()}
+    print(f"🕸️ 이웃 그래프 계산 완료 (eps ≤ {max(eps_list)}, 간선 {sum(g.nnz for g in graphs.values())}개, "
+          f"{(datetime.now() - started).total_seconds():.1f}초)")
+    df['media_bias'] = media_bias_column(df['media_outlet_id'], media_map)
+    biases = df['media_bias'].tolist()
+    fmt = lambda value: '-' if value is None else f"{value:.3f}"
+    labels_by_combo = {}
+    started = datetime.now()
     for eps in eps_list:
         for min_samples in min_samples_list:
-            print(f"\n==================== [eps={eps}, min_samples={min_samples}] ====================")
             meta = []
-            cards = []
-            clusters_json = []
+            labels_by_category = {}
             for category in categories:
-                print(f"\n🗂️  ===== [카테고리: {category}] =====")
-                texts = cat_texts[category]
-                embeddings = cat_embeddings[category]
-                if len(texts) == 0:
-                    print("(해당 카테고리 기사 없음)")
+                if category not in cat_slices:
                     continue
-                print(f"🔗 클러스터링 중...")
-                labels = cluster_embeddings(embeddings, eps=eps, min_samples=min_samples)
-                n_total = len(labels)
-                n_noise = sum(1 for l in labels if l == -1)
-                n_clusters = len(set(labels)) - (1 if -1 in labels else 0)
-                print(f"📊 클러스터 개수: {n_clusters} | noise(이상치): {n_noise} | 전체 기사: {n_total}")
-                meta.append({
-                    'category': category,
-                    'n_clusters': n_clusters,
-                    'n_noise': n_noise,
-                    'n_total': n_total
-                })
-                # 클러스터별 카드 생성
-                for cluster_id in sorted(set(labels)):
-                    if cluster_id == -1:
-                        continue  # noise 제외
-                    idxs = [i for i, l in enumerate(labels) if l == cluster_id]
-                    df_cluster = df[(df['category'] == category)].iloc[idxs]
-                    bias_counter = {'left': 0, 'center': 0, 'right': 0}
-                    for _, row in df_cluster.iterrows():
-                        media_info = media_map.get(row['media_outlet_id'], {'name': 'Unknown', 'bias': 'unknown'})
-                        bias = media_info['bias']
-                        if bias in bias_counter:
-                            bias_counter[bias] += 1
-                    total = sum(bias_counter.values())
-                    bias_percent = {k: (v, v/total*100 if total else 0) for k, v in bias_counter.items()}
-                    bar = '🟥'*int(bias_percent['left'][1]//5) + '⬜'*int(bias_percent['center'][1]//5) + '🟦'*int(bias_percent['right'][1]//5)
-                    # GPT가 클러스터 내용을 분석해서 직관적이고 흥미로운 제목 생성
-                    print(f"🎯 클러스터 #{cluster_id+1} 제목 생성 중...")
-                    cluster_title = generate_cluster_title(df_cluster)
-                    print(f"✨ 생성된 제목: {cluster_title}")
-                    
-                    summary = summarize_cluster(df_cluster)
-                    card_lines = []
-                    card_lines.append(f"🏷️ 카테고리: **{category}** | 클러스터 #{cluster_id+1}\n")
-                    card_lines.append(f"### 🏷️ 이슈 제목\n**{cluster_title}**\n")
-                    card_lines.append("========================================\n")
-                    card_lines.append(f"#### 🧠 대표 이슈 요약\n\n**{summary}**\n")
-                    card_lines.append("========================================\n")
-                    card_lines.append(f"#### 📰 포함된 기사들 (총 {len(df_cluster)}개)\n")
-                    card_lines.append(f"#### 📊 편향 게이지\n{bar}\nleft: {bias_counter['left']} ({round(bias_percent['left'][1],1)}%) | center: {bias_counter['center']} ({round(bias_percent['center'][1],1)}%) | right: {bias_counter['right']} ({round(bias_percent['right'][1],1)}%)\n")
-                    card_text = "\n".join(card_lines)
-                    cards.append({'category': category, 'card_text': card_text})
-                    # JSON용 클러스터 정보 추가
-                    clusters_json.append({
-                        'category': category,
-                        'title': cluster_title,
-                        'summary': summary,
-                        'article_count': len(df_cluster),
-                        'bias_left': bias_counter['left'],
-                        'bias_center': bias_counter['center'],
-                        'bias_right': bias_counter['right'],
-                        'article_ids': df_cluster['id'].tolist()
-                    })
-                summary_lines.append(f"| {eps} | {min_samples} | {category} | {n_clusters} | {n_noise} | {n_total} |")
+                rows = cat_slices[category]
+                embeddings, valid = store.view(rows)
+                labels = cluster_embeddings(embeddings, eps=eps, min_samples=min_samples, valid=valid,
+                                            graph=graphs[category])
+                labels_by_category[category] = labels
+                metrics = evaluate_clustering(embeddings, labels, biases[rows])
+                meta.append({'category': category, **metrics})
+                summary_lines.append(f"| {eps} | {min_samples} | {category} | {metrics['n_clusters']} | {metrics['n_noise']} | "
+                                     f"{metrics['n_total']} | {fmt(metrics['silhouette'])} | {fmt(metrics['bias_spread'])} |")
+            overall = summarize_metrics(meta)
+            labels_by_combo[(eps, min_samples)] = labels_by_category
+            print(f"📊 [eps={eps}, min_samples={min_samples}] 클러스터 {overall['n_clusters']}개 | "
+                  f"noise {overall['noise_ratio']:.1%} | silhouette {fmt(overall['silhouette'])} | "
+                  f"편향 분포 {fmt(overall['bias_spread'])} | score {fmt(overall['score'])}")
             all_results.append({
                 'eps': eps,
                 'min_samples': min_samples,
-                'meta': meta,
-                'cards': cards
+                'overall': overall,
+                'meta': meta
             })
+    print(f"⏱️ grid {len(all_results)}개 조합 평가 완료 ({(datetime.now() - started).total_seconds():.1f}초, LLM 호출 없음)")
+    best = select_best(all_results)
+    selected = {'eps': best['eps'], 'min_samples': best['min_samples']} if best else None
+    cards = []
+    clusters_json = []
+    if best and summarize:
+        # 선택된 조합만 제목/요약 생성
+        print(f"\n🏆 선택된 조합: eps={best['eps']}, min_samples={best['min_samples']} (score {fmt(best['overall']['score'])})")
+        summary_cache = SummaryCache(PROMPT_VERSION) if use_summary_cache else None
+        labels = np.full(len(df), -1, dtype=np.int64)
+        for category, category_labels in labels_by_combo[(best['eps'], best['min_samples'])].items():
+            labels[cat_slices[category]] = category_labels
+        pending = [(entry['category'], entry) for entry in build_cluster_entries(df, labels)]
+        titles_summaries = generate_titles_and_summaries([entry['df_cluster'] for _, entry in pending],
+                                                         combined=combined, cache=summary_cache)
+        for (category, entry), (cluster_title, summary) in zip(pending, titles_summaries):
+            card, cluster_json = make_cluster_card(category, entry, cluster_title, summary)
+            cards.append(card)
+            clusters_json.append(cluster_json)
+    # grid 지표와 선택된 조합의 카드/클러스터를 한 파일에 저장
     with open(output_path, "w", encoding="utf-8") as f:
-        json.dump({'results': all_results}, f, ensure_ascii=False, indent=2)
+        json.dump({'results': all_results, 'selected': selected, 'cards': cards, 'clusters': clusters_json},
+                  f, ensure_ascii=False, indent=2)
     print(f"\n✅ 자동 파라미터 탐색 결과가 {output_path}에 저장되었습니다!")
     # summary_table.txt로 표 저장
     with open("summary_table.txt", "w", encoding="utf-8") as f:
         f.write("\n".join(summary_lines))
     print("✅ 파라미터별 클러스터링 결과 요약표가 summary_table.txt에 저장되었습니다!")
-    # JSON 결과도 함께 저장
-    json_output_path = output_path.replace('.json', '.json')
-    with open(json_output_path, "w", encoding="utf-8") as f:
-        json.dump({'clusters': clusters_json}, f, ensure_ascii=False, indent=2)
-    print(f"\n✅ 최종본(이슈 카드 TXT)이 {output_path}에, JSON이 {json_output_path}에 저장되었습니다!")
 
-def main_single(output_path=None, eps=0.3, min_samples=3):
-    df = fetch_articles()
-    df['text'] = (df['title'] + '\n' + df['content'].fillna('')).str.slice(0, 3000)
+def main_single(output_path=None, eps=0.3, min_samples=3, combined=True, use_summary_cache=True, auto_eps=False,
+                use_ann=False, engine='dbscan', reduction=None, window_hours=None):
+    """
+    추천 조합으로 최종본 생성 (auto_eps=True면 카테고리별 k-distance knee로 eps 자동 선택)
+    use_ann=True면 이웃 그래프를 ANN 인덱스에서 조회
+    engine: 클러스터링 방식 (dbscan, hdbscan, agglomerative)
+    reduction: 임베딩 차원 축소 ('api:256', 'pca:256', 'random:256', None이면 전체 차원)
+    window_hours: 최근 몇 시간에 발행된 기사만 클러스터링할지 (None이면 전체, 모든 모드 공통)
+    """
+    df = fetch_articles(window_hours)
     media_map = fetch_media_outlets()
     categories = df['category'].unique()
     if output_path is None:
@@ -507,80 +840,134 @@ def main_single(output_path=None, eps=0.3, min_samples=3):
         output_dir = "backend/results"
         os.makedirs(output_dir, exist_ok=True)
         output_path = os.path.join(output_dir, f"{now_str}_final.txt")
-    # 임베딩 캐싱 및 batch 처리
-    embedding_cache = {}
-    cat_texts = {cat: df[df['category'] == cat]['text'].tolist() for cat in categories}
-    cat_embeddings = {}
-    for category in categories:
-        texts = cat_texts[category]
-        if len(texts) == 0:
-            cat_embeddings[category] = np.zeros((0, 1536))
-        else:
-            print(f"🧠 [{category}] 전체 임베딩 생성 중... (중복 제거, batch)")
-            cat_embeddings[category] = get_embeddings(texts, cache=embedding_cache)
+    # 임베딩 캐싱 및 batch 처리 (디스크 캐시 + 카테고리별 슬라이스)
+    reducer = create_reducer(reduction)
+    df, store, cat_slices = embed_articles(df, reducer=reducer)
+    df['media_bias'] = media_bias_column(df['media_outlet_id'], media_map)
+    ann_index = build_ann_index(df, store, reducer=reducer) if use_ann else None
+    # 이전 실행과 구성이 같은 클러스터는 요약 캐시 재사용
+    summary_cache = SummaryCache(PROMPT_VERSION) if use_summary_cache else None
     cards = []
     clusters_json = []
+    # 행별 카테고리 내 클러스터 번호 (카드 재료는 카테고리 루프 뒤에 한 번에 모음)
+    all_labels = np.full(len(df), -1, dtype=np.int64)
+    cluster_params = {}
     for category in categories:
         print(f"\n🗂️  ===== [카테고리: {category}] =====")
-        texts = cat_texts[category]
-        embeddings = cat_embeddings[category]
-        if len(texts) == 0:
+        if category not in cat_slices:
             print("(해당 카테고리 기사 없음)")
             continue
-        print(f"🔗 클러스터링 중...")
-        labels = cluster_embeddings(embeddings, eps=eps, min_samples=min_samples)
+        embeddings, valid = store.view(cat_slices[category])
+        df_category = df.iloc[cat_slices[category]]
+        category_eps = auto_tune_eps(embeddings, valid, min_samples) if auto_eps else eps
+        cluster_params[category] = {'engine': engine, 'eps': round(category_eps, 4), 'min_samples': min_samples,
+                                    'auto_eps': auto_eps}
+        print(f"🔗 클러스터링 중... ({engine}, eps={category_eps:.3f}{' 자동' if auto_eps else ''}, min_samples={min_samples})")
+        graph = None
+        if ann_index is not None and engine != 'hdbscan':
+            graph = category_neighbor_graph(embeddings, valid, category_eps,
+                                            keys=df_category['embed_key'].tolist(), ann_index=ann_index)
+        labels = cluster_embeddings(embeddings, eps=category_eps, min_samples=min_samples, valid=valid, graph=graph,
+                                    engine=engine)
         n_total = len(labels)
         n_noise = sum(1 for l in labels if l == -1)
         n_clusters = len(set(labels)) - (1 if -1 in labels else 0)
         print(f"📊 클러스터 개수: {n_clusters} | noise(이상치): {n_noise} | 전체 기사: {n_total}")
-        # 클러스터별 카드 생성
-        for cluster_id in sorted(set(labels)):
-            if cluster_id == -1:
-                continue  # noise 제외
-            idxs = [i for i, l in enumerate(labels) if l == cluster_id]
-            df_cluster = df[(df['category'] == category)].iloc[idxs]
-            bias_counter = {'left': 0, 'center': 0, 'right': 0}
-            for _, row in df_cluster.iterrows():
-                media_info = media_map.get(row['media_outlet_id'], {'name': 'Unknown', 'bias': 'unknown'})
-                bias = media_info['bias']
-                if bias in bias_counter:
-                    bias_counter[bias] += 1
-            total = sum(bias_counter.values())
-            bias_percent = {k: (v, v/total*100 if total else 0) for k, v in bias_counter.items()}
-            bar = '🟥'*int(bias_percent['left'][1]//5) + '⬜'*int(bias_percent['center'][1]//5) + '🟦'*int(bias_percent['right'][1]//5)
-            # GPT가 클러스터 내용을 분석해서 직관적이고 흥미로운 제목 생성
-            print(f"🎯 클러스터 #{cluster_id+1} 제목 생성 중...")
-            cluster_title = generate_cluster_title(df_cluster)
-            print(f"✨ 생성된 제목: {cluster_title}")
-            
-            summary = summarize_cluster(df_cluster)
-            card_lines = []
-            card_lines.append(f"🏷️ 카테고리: **{category}** | 클러스터 #{cluster_id+1}\n")
-            card_lines.append(f"### 🏷️ 이슈 제목\n**{cluster_title}**\n")
-            card_lines.append("========================================\n")
-            card_lines.append(f"#### 🧠 대표 이슈 요약\n\n**{summary}**\n")
-            card_lines.append("========================================\n")
-            card_lines.append(f"#### 📰 포함된 기사들 (총 {len(df_cluster)}개)\n")
-            card_lines.append(f"#### 📊 편향 게이지\n{bar}\nleft: {bias_counter['left']} ({round(bias_percent['left'][1],1)}%) | center: {bias_counter['center']} ({round(bias_percent['center'][1],1)}%) | right: {bias_counter['right']} ({round(bias_percent['right'][1],1)}%)\n")
-            card_text = "\n".join(card_lines)
-            cards.append({'category': category, 'card_text': card_text})
-            # JSON용 클러스터 정보 추가
-            clusters_json.append({
-                'category': category,
-                'title': cluster_title,
-                'summary': summary,
-                'article_count': len(df_cluster),
-                'bias_left': bias_counter['left'],
-                'bias_center': bias_counter['center'],
-                'bias_right': bias_counter['right'],
-                'article_ids': df_cluster['id'].tolist()
-            })
+        all_labels[cat_slices[category]] = labels
+    # 클러스터별 카드 재료 모으기 (제목/요약은 전체 클러스터를 한 번에 동시 생성)
+    pending = [(entry['category'], entry) for entry in build_cluster_entries(df, all_labels)]
+    titles_summaries = generate_titles_and_summaries([entry['df_cluster'] for _, entry in pending],
+                                                     combined=combined, cache=summary_cache)
+    for (category, entry), (cluster_title, summary) in zip(pending, titles_summaries):
+        card, cluster_json = make_cluster_card(category, entry, cluster_title, summary)
+        cards.append(card)
+        clusters_json.append(cluster_json)
     with open(output_path, "w", encoding="utf-8") as f:
         for card in cards:
             f.write(card['card_text'])
             f.write("\n" + ("-"*40) + "\n")
     # JSON 결과도 함께 저장
     json_output_path = output_path.replace('.txt', '.json')
+    with open(json_output_path, "w", encoding="utf-8") as f:
+        json.dump({'clusters': clusters_json, 'params': cluster_params}, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ 최종본(이슈 카드 TXT)이 {output_path}에, JSON이 {json_output_path}에 저장되었습니다!")
+
+def main_incremental(output_path=None, eps=0.3, min_samples=3, combined=True, use_summary_cache=True,
+                     maintain=None, maintenance_interval_hours=24, use_ann=False, reduction=None,
+                     window_hours=None):
+    """
+    이전 실행의 이슈를 이어받아 새 기사만 배정/클러스터링 (이슈 id 유지)
+    maintain=None이면 maintenance_interval_hours마다 이슈 병합/분할 수행
+    use_ann=True면 남은 기사 클러스터링의 이웃을 ANN 인덱스에서 조회, reduction은 main_single과 같음
+    이슈의 최근 멤버 임베딩은 구간 밖으로 빠져도 캐시에 남겨 두고 중심에서 먼 새 기사의 이웃 배정에 사용
+    """
+    df = fetch_articles(window_hours)
+    media_map = fetch_media_outlets()
+    categories = df['category'].unique()
+    if output_path is None:
+        now_str = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_dir = "backend/results"
+        os.makedirs(output_dir, exist_ok=True)
+        output_path = os.path.join(output_dir, f"{now_str}_final.txt")
+    reducer = create_reducer(reduction)
+    state = ClusterState()
+    df, store, cat_slices = embed_articles(df, reducer=reducer, keep_keys=state.history_keys())
+    # 이전 멤버 검색용 캐시 (축소 여부와 관계없이 캐시에 저장된 차원의 벡터로 검색)
+    history = EmbeddingCache("text-embedding-3-small", dimensions=reducer.api_dimensions if reducer else None)
+    df['media_bias'] = media_bias_column(df['media_outlet_id'], media_map)
+    ann_index = build_ann_index(df, store, reducer=reducer) if use_ann else None
+    summary_cache = SummaryCache(PROMPT_VERSION) if use_summary_cache else None
+    if maintain is None:
+        maintain = state.maintenance_due(maintenance_interval_hours)
+    print(f"🔁 증분 클러스터링: 이전 이슈 {len(state.issues)}개" + (" (병합/분할 포함)" if maintain else ""))
+    # 기사가 모두 사라진 카테고리의 이슈 정리 (마지막 기사 추가 후 ISSUE_MAX_AGE_HOURS가 지난 이슈만)
+    issue_cutoff = (datetime.now() - timedelta(hours=ISSUE_MAX_AGE_HOURS)).isoformat()
+    for issue_id in [issue_id for issue_id, issue in state.issues.items()
+                     if issue['category'] not in cat_slices and issue['updated_at'] < issue_cutoff]:
+        state.remove_issue(issue_id)
+    for category in [category for category in state.noise if category not in cat_slices]:
+        del state.noise[category]
+    cards = []
+    clusters_json = []
+    all_labels = np.full(len(df), -1, dtype=np.int64)
+    issue_ids_by_category = {}
+    for category in categories:
+        print(f"\n🗂️  ===== [카테고리: {category}] =====")
+        if category not in cat_slices:
+            print("(해당 카테고리 기사 없음)")
+            continue
+        embeddings, valid = store.view(cat_slices[category])
+        df_category = df.iloc[cat_slices[category]]
+        members = update_category(state, category, df_category['id'].tolist(), embeddings, valid,
+                                  eps=eps, min_samples=min_samples, maintain=maintain,
+                                  ann_index=ann_index, keys=df_category['embed_key'].tolist(), history=history)
+        # 이슈 생성 순서대로 클러스터 번호 부여
+        issue_ids = sorted(members, key=lambda issue_id: state.issues[issue_id]['created_at'])
+        labels = np.full(len(df_category), -1, dtype=np.int64)
+        for k, issue_id in enumerate(issue_ids):
+            labels[members[issue_id]] = k
+        n_noise = int((labels == -1).sum())
+        print(f"📊 클러스터 개수: {len(issue_ids)} | noise(이상치): {n_noise} | 전체 기사: {len(labels)}")
+        all_labels[cat_slices[category]] = labels
+        issue_ids_by_category[category] = issue_ids
+    pending = []
+    for entry in build_cluster_entries(df, all_labels):
+        entry['issue_id'] = issue_ids_by_category[entry['category']][entry['cluster_id']]
+        pending.append((entry['category'], entry))
+    if maintain:
+        state.last_maintenance = datetime.now().isoformat()
+    state.save()
+    titles_summaries = generate_titles_and_summaries([entry['df_cluster'] for _, entry in pending],
+                                                     combined=combined, cache=summary_cache)
+    for (category, entry), (cluster_title, summary) in zip(pending, titles_summaries):
+        card, cluster_json = make_cluster_card(category, entry, cluster_title, summary)
+        cards.append(card)
+        clusters_json.append(cluster_json)
+    with open(output_path, "w", encoding="utf-8") as f:
+        for card in cards:
+            f.write(card['card_text'])
+            f.write("\n" + ("-"*40) + "\n")
+    json_output_path = output_path.replace('.txt', '.json')
     with open(json_output_path, "w", encoding="utf-8") as f:
         json.dump({'clusters': clusters_json}, f, ensure_ascii=False, indent=2)
     print(f"\n✅ 최종본(이슈 카드 TXT)이 {output_path}에, JSON이 {json_output_path}에 저장되었습니다!")
@@ -589,15 +976,37 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument('output_path', nargs='?', default=None, help='저장할 JSON 경로')
     parser.add_argument('--single', action='store_true', default=True, help='추천 조합(최종본)만 저장')
+    parser.add_argument('--separate-calls', action='store_true', help='제목/요약을 클러스터당 2회 호출로 따로 생성')
+    parser.add_argument('--no-summary-cache', action='store_true', help='요약 캐시를 쓰지 않고 모든 클러스터 새로 생성')
+    parser.add_argument('--incremental', action='store_true', help='이전 실행 이슈를 이어받아 새 기사만 클러스터링 (이슈 id 유지)')
+    parser.add_argument('--maintain', action='store_true', help='증분 모드에서 주기와 관계없이 이슈 병합/분할 수행')
+    parser.add_argument('--grid', action='store_true', help='(eps, min_samples) grid를 지표로 평가하고 가장 좋은 조합만 요약')
+    parser.add_argument('--skip-summary', action='store_true', help='grid 모드에서 지표만 계산하고 제목/요약 생성 생략')
+    parser.add_argument('--auto-eps', action='store_true', help='카테고리별 k-distance 곡선의 knee로 eps 자동 선택')
+    parser.add_argument('--ann', action='store_true', help='DBSCAN 이웃을 HNSW 근사 최근접 이웃 인덱스로 조회 (hnswlib 필요)')
+    parser.add_argument('--reduce', default=None, metavar='METHOD:DIM',
+                        help='임베딩 차원 축소 (api:256 = API dimensions, pca:256 = 증분 PCA, random:256 = random projection)')
+    parser.add_argument('--window-hours', type=float, default=None,
+                        help='최근 N시간에 발행된 기사만 클러스터링 (예: 48, 기본은 전체 기사)')
+    parser.add_argument('--engine', choices=ENGINES, default='dbscan',
+                        help='최종본 클러스터링 방식 (hdbscan은 eps 없이 카테고리당 한 번 실행)')
     args = parser.parse_args()
-    if args.single:
-        main_single(args.output_path)
+    if args.incremental:
+        main_incremental(args.output_path, combined=not args.separate_calls,
+                         use_summary_cache=not args.no_summary_cache, maintain=True if args.maintain else None,
+                         use_ann=args.ann, reduction=args.reduce, window_hours=args.window_hours)
+    elif args.grid:
+        main(args.output_path, combined=not args.separate_calls, use_summary_cache=not args.no_summary_cache,
+             summarize=not args.skip_summary, use_ann=args.ann, reduction=args.reduce,
+             window_hours=args.window_hours)
     else:
-        main(args.output_path)
+        main_single(args.output_path, combined=not args.separate_calls, use_summary_cache=not args.no_summary_cache,
+                    auto_eps=args.auto_eps, use_ann=args.ann, engine=args.engine,
+                    reduction=args.reduce, window_hours=args.window_hours)
 
     # === 자동 DB 업로드 ===
     # 방금 생성된 최신 JSON 파일을 직접 전달
-    if args.single:
+    if not args.grid:
         # single 모드에서는 방금 생성된 JSON 파일을 사용
         if args.output_path:
             latest_json = args.output_path.replace('.txt', '.json')
@@ -607,12 +1016,12 @@ if __name__ == "__main__":
             json_files = sorted(glob.glob(os.path.join(result_dir, '*_final.json')), key=os.path.getmtime, reverse=True)
             latest_json = json_files[0] if json_files else None
     else:
-        # multi 모드에서는 최신 파일 찾기
-        result_dir = os.path.join(os.path.dirname(__file__), 'results')
-        json_files = sorted(glob.glob(os.path.join(result_dir, '*_final.json')), key=os.path.getmtime, reverse=True)
-        latest_json = json_files[0] if json_files else None
+        # grid 모드는 파라미터 탐색용이므로 자동 업로드하지 않음 (선택된 조합 결과는 grid JSON의 clusters)
+        latest_json = None
     
-    if latest_json and os.path.exists(latest_json):
+    if args.grid:
+        print(f"\nℹ️ grid 결과는 자동 업로드하지 않습니다. 필요하면 python supabase_uploader.py <grid JSON>으로 발행하세요.")
+    elif latest_json and os.path.exists(latest_json):
         print(f"\n🟢 클러스터 결과를 DB에 자동 업로드합니다: {latest_json}")
         try:
             # 기존 이슈 데이터 정리 후 최신 결과 업로드
@@ -0,0 +1,13 @@
+-- 클러스터 발행 세대(generation) 관리
+-- issues 행은 발행 실행마다 generation_id로 묶이고,
+-- API는 publish_state가 가리키는 현재 세대의 이슈만 조회한다.
+
+ALTER TABLE issues ADD COLUMN IF NOT EXISTS generation_id uuid;
+CREATE INDEX IF NOT EXISTS idx_issues_generation_created ON issues (generation_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_issue_articles_issue_id ON issue_articles (issue_id);
+
+CREATE TABLE IF NOT EXISTS publish_state (
+    key text PRIMARY KEY,
+    generation_id uuid NOT NULL,
+    published_at timestamptz NOT NULL DEFAULT now()
+);
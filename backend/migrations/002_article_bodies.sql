@@ -0,0 +1,14 @@
+-- 기사 본문 분리: articles에는 메타데이터만 두고 본문은 압축해서 article_bodies에 저장
+-- body는 zlib 압축 후 base64 인코딩한 문자열 (storage.compress_body)
+
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS content_length integer;
+UPDATE articles SET content_length = char_length(content) WHERE content_length IS NULL AND content IS NOT NULL;
+
+CREATE TABLE IF NOT EXISTS article_bodies (
+    article_id uuid PRIMARY KEY REFERENCES articles (id) ON DELETE CASCADE,
+    body text NOT NULL
+);
+
+-- 기존 기사 본문 이전: python supabase_uploader.py --backfill-bodies 실행 후
+-- 아래 문장으로 articles의 인라인 본문을 비운다.
+-- UPDATE articles SET content = NULL WHERE id IN (SELECT article_id FROM article_bodies);
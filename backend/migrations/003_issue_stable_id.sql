@@ -0,0 +1,5 @@
+-- 증분 클러스터링(main_cluster.py --incremental)의 이슈 식별자
+-- issues.id는 발행 세대마다 새로 만들어지고, stable_id는 같은 이슈라면 세대가 바뀌어도 유지된다.
+
+ALTER TABLE issues ADD COLUMN IF NOT EXISTS stable_id uuid;
+CREATE INDEX IF NOT EXISTS idx_issues_stable_id ON issues (stable_id);
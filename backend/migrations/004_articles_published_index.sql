@@ -0,0 +1,4 @@
+-- 클러스터링 기사 조회(article_fetch.py)의 시간 구간 + keyset pagination용 인덱스
+-- (published_at, id) 순서로 정렬된 페이지를 since/until 범위와 마지막 (published_at, id) 커서로 조회한다.
+
+CREATE INDEX IF NOT EXISTS idx_articles_published_id ON articles (published_at, id);
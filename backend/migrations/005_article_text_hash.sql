@@ -0,0 +1,5 @@
+-- 임베딩 입력 텍스트(제목 + 본문 앞 3000자)의 sha256
+-- 클러스터링 단계는 본문 없이 이 값으로 임베딩 캐시를 조회하고, 캐시에 없는 기사만 본문을 읽는다.
+-- 기존 기사: python supabase_uploader.py --backfill-text-hashes
+
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS text_hash text;
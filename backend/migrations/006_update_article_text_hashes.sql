@@ -0,0 +1,13 @@
+-- text_hash backfill을 기사마다 UPDATE 하지 않고 묶음 단위 한 번의 호출로 기록
+-- (id, text_hash만 담은 upsert는 title/url NOT NULL 제약 때문에 INSERT 단계에서 실패하므로 함수로 UPDATE)
+-- 호출: supabase.rpc('update_article_text_hashes', {'hashes': [{'id': ..., 'text_hash': ...}, ...]})
+
+CREATE OR REPLACE FUNCTION update_article_text_hashes(hashes jsonb)
+RETURNS void
+LANGUAGE sql
+AS $$
+    UPDATE articles AS a
+    SET text_hash = h.text_hash
+    FROM jsonb_to_recordset(hashes) AS h (id uuid, text_hash text)
+    WHERE a.id = h.id;
+$$;
@@ -0,0 +1,95 @@
+import numpy as np
+from scipy import sparse
+
+from embedding_store import normalize_rows
+
+# 블록 하나의 유사도 행렬 크기 상한 (float32 기준 약 64MB)
+MAX_BLOCK_BYTES = 64 * 1024 * 1024
+
+
+def radius_neighbor_graph(vectors: np.ndarray, radius: float, max_block_bytes: int = MAX_BLOCK_BYTES) -> sparse.csr_matrix:
+    """
+    cosine 거리가 radius 이하인 이웃만 담은 희소 거리 그래프 (n, n) CSR
+
+    정규화한 float32 벡터를 행 블록 단위로 곱해서 전체 거리 행렬을 만들지 않고 계산하고,
+    대각선(자기 자신, 거리 0)도 명시적으로 저장한다.
+    radius보다 작은 eps의 DBSCAN(metric='precomputed')은 같은 그래프를 그대로 쓸 수 있다.
+    """
+    vectors = normalize_rows(vectors)
+    n = len(vectors)
+    if n == 0:
+        return sparse.csr_matrix((0, 0), dtype=np.float32)
+    block = max(1, min(n, max_block_bytes // (n * 4)))
+    data, indices, counts = [], [], []
+    for start in range(0, n, block):
+        distance = 1.0 - vectors[start:start + block] @ vectors.T
+        np.maximum(distance, 0.0, out=distance)
+        rows = np.arange(len(distance))
+        distance[rows, rows + start] = 0.0
+        mask = distance <= radius
+        _, cols = np.nonzero(mask)
+        indices.append(cols)
+        data.append(distance[mask])
+        counts.append(mask.sum(axis=1))
+    indptr = np.concatenate(([0], np.cumsum(np.concatenate(counts))))
+    return sparse.csr_matrix(
+        (np.concatenate(data).astype(np.float32, copy=False), np.concatenate(indices), indptr),
+        shape=(n, n)
+    )
+
+
+def edges_to_graph(n: int, src: np.ndarray, dst: np.ndarray, distances: np.ndarray) -> sparse.csr_matrix:
+    """
+    (src, dst, 거리) 간선 목록을 radius_neighbor_graph와 같은 형식의 대칭 희소 그래프로 변환
+    (양방향 중 작은 거리 사용, 대각선 0 명시 저장)
+    """
+    diag = np.arange(n)
+    rows = np.concatenate((src, dst, diag))
+    cols = np.concatenate((dst, src, diag))
+    data = np.concatenate((np.maximum(distances, 0.0), np.maximum(distances, 0.0), np.zeros(n))).astype(np.float32)
+    # 같은 (행, 열) 간선은 가장 작은 거리 하나만 남김
+    order = np.lexsort((data, cols, rows))
+    rows, cols, data = rows[order], cols[order], data[order]
+    first = np.ones(len(rows), dtype=bool)
+    first[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+    rows, cols, data = rows[first], cols[first], data[first]
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=n))))
+    return sparse.csr_matrix((data, cols, indptr), shape=(n, n))
+
+
+def knn_distances(vectors: np.ndarray, k: int, max_block_bytes: int = MAX_BLOCK_BYTES) -> np.ndarray:
+    """
+    각 행의 가까운 k개 이웃까지의 cosine 거리 (n, k), 오름차순 (자기 자신 포함, DBSCAN min_samples와 같은 기준)
+    radius_neighbor_graph와 같은 블록 행렬곱으로 계산
+    """
+    vectors = normalize_rows(vectors)
+    n = len(vectors)
+    k = min(k, n)
+    out = np.zeros((n, k), dtype=np.float32)
+    if n == 0 or k == 0:
+        return out
+    block = max(1, min(n, max_block_bytes // (n * 4)))
+    for start in range(0, n, block):
+        distance = 1.0 - vectors[start:start + block] @ vectors.T
+        np.maximum(distance, 0.0, out=distance)
+        rows = np.arange(len(distance))
+        distance[rows, rows + start] = 0.0
+        nearest = np.partition(distance, k - 1, axis=1)[:, :k] if k < n else distance
+        out[start:start + len(distance)] = np.sort(nearest, axis=1)
+    return out
+
+
+def knee_eps(k_distances: np.ndarray, min_eps: float = 0.1, max_eps: float = 0.7) -> float:
+    """
+    정렬한 k-거리 곡선의 knee(양 끝을 잇는 직선에서 가장 아래로 떨어진 점)의 거리를 eps로 선택
+    (점이 너무 적거나 곡선이 평평하면 구간 중앙값, 결과는 [min_eps, max_eps]로 제한)
+    """
+    values = np.sort(np.asarray(k_distances, dtype=np.float64))
+    if len(values) < 3 or values[-1] - values[0] <= 1e-9:
+        eps = float(np.median(values)) if len(values) else (min_eps + max_eps) / 2
+        return float(np.clip(eps, min_eps, max_eps))
+    x = np.linspace(0.0, 1.0, len(values))
+    y = (values - values[0]) / (values[-1] - values[0])
+    # 볼록하게 증가하는 곡선이므로 x - y가 가장 큰 지점이 knee
+    knee = int(np.argmax(x - y))
+    return float(np.clip(values[knee], min_eps, max_eps))
@@ -0,0 +1,73 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+from embedding_store import normalize_rows
+from neighbor_graph import MAX_BLOCK_BYTES
+
+
+def quantize_rows(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    정규화한 벡터를 행별 scale의 int8로 양자화 → (codes (n, dim) int8, scales (n,) float32)
+    x ≈ codes * scale, scale = max|x| / 127 (0 벡터는 scale 1)
+    """
+    vectors = normalize_rows(vectors)
+    scales = np.abs(vectors).max(axis=1) / 127.0 if len(vectors) else np.zeros(0, dtype=np.float32)
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def dequantize_rows(codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    return np.asarray(codes, dtype=np.float32) * np.asarray(scales, dtype=np.float32)[:, None]
+
+
+def quantized_scores(codes: np.ndarray, scales: np.ndarray, queries: np.ndarray,
+                     max_block_bytes: int = MAX_BLOCK_BYTES) -> np.ndarray:
+    """
+    정규화한 질의 (m, dim)와 양자화 행렬 (n, dim)의 근사 cosine 유사도 (m, n)
+    int8 행렬을 행 블록 단위로만 float32로 바꿔 곱하므로 상주 메모리는 int8 크기 + 블록 하나
+    """
+    queries = normalize_rows(queries)
+    n, dim = codes.shape
+    out = np.empty((len(queries), n), dtype=np.float32)
+    block = max(1, max_block_bytes // (dim * 4))
+    for start in range(0, n, block):
+        chunk = np.asarray(codes[start:start + block], dtype=np.float32)
+        out[:, start:start + len(chunk)] = (queries @ chunk.T) * np.asarray(scales[start:start + block])
+    return out
+
+
+def search_quantized(codes: np.ndarray, scales: np.ndarray, full: np.ndarray, queries: np.ndarray,
+                     k: int = 10, candidates: int = 0,
+                     subset: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    양자화 행렬에서 질의별 후보 candidates개(기본 4k)를 고른 뒤, float32 원본(full, memmap 가능)의
+    후보 행만 읽어 정확한 cosine 거리로 다시 정렬 → (행 번호 (m, k), cosine 거리 (m, k)), 가까운 순
+    subset(정렬된 행 번호)을 주면 그 행 중에서만 찾음 (반환 행 번호는 전체 행렬 기준)
+    """
+    if subset is not None:
+        codes, scales = np.asarray(codes[subset]), np.asarray(scales[subset])
+    n = len(codes)
+    k = min(k, n)
+    if n == 0 or k == 0:
+        return np.zeros((len(queries), 0), dtype=np.int64), np.zeros((len(queries), 0), dtype=np.float32)
+    candidates = min(n, max(candidates or 4 * k, k))
+    queries = normalize_rows(queries)
+    scores = quantized_scores(codes, scales, queries)
+    if candidates < n:
+        top = np.argpartition(-scores, candidates - 1, axis=1)[:, :candidates]
+    else:
+        top = np.broadcast_to(np.arange(n), (len(queries), n))
+    found = np.empty((len(queries), k), dtype=np.int64)
+    distances = np.empty((len(queries), k), dtype=np.float32)
+    for i, query in enumerate(queries):
+        # 후보 행만 원본에서 읽음 (memmap이면 해당 페이지만 접근)
+        order = np.sort(top[i])
+        if subset is not None:
+            order = subset[order]
+        exact = normalize_rows(np.asarray(full[order], dtype=np.float32)) @ query
+        best = np.argsort(-exact, kind='stable')[:k]
+        found[i] = order[best]
+        distances[i] = np.maximum(1.0 - exact[best], 0.0)
+    return found, distances
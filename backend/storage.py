@@ -0,0 +1,564 @@
+import base64
+import os
+import sqlite3
+import threading
+import uuid
+import zlib
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# 저장소 선택: STORAGE_BACKEND=supabase(기본) | sqlite
+DEFAULT_SQLITE_PATH = Path(__file__).parent / 'blindspot.db'
+# in_() 필터 URL 길이 제한을 피하기 위한 조회/삭제 단위
+IN_FILTER_CHUNK = 100
+
+Columns = Optional[Sequence[str]]
+
+
+def compress_body(text: str) -> str:
+    """기사 본문을 zlib 압축 후 base64 문자열로 변환 (article_bodies.body 저장 형식)"""
+    return base64.b64encode(zlib.compress((text or '').encode('utf-8'), 6)).decode('ascii')
+
+
+def decompress_body(body: Optional[str]) -> str:
+    if not body:
+        return ''
+    return zlib.decompress(base64.b64decode(body)).decode('utf-8')
+
+
+class Storage(ABC):
+    """
+    articles / media_outlets / issues / issue_articles 접근 인터페이스
+    columns=None이면 전체 컬럼 조회
+    """
+
+    # articles
+    @abstractmethod
+    def select_articles(self, columns: Columns = None, ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def select_articles_page(self, columns: Columns = None, since: Optional[str] = None, until: Optional[str] = None,
+                             after: Optional[Tuple[str, str]] = None, limit: int = 1000) -> List[Dict[str, Any]]:
+        """
+        (published_at, id) 순서의 기사 한 페이지 (keyset pagination)
+        since <= published_at < until 구간에서 after=(published_at, id) 다음 행부터 limit개
+        columns에 published_at과 id가 없으면 다음 페이지 커서를 위해 추가됨
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def count_articles(self, published_at_missing: bool = False) -> int:
+        """기사 수 (published_at_missing=True면 published_at이 없는 기사만)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def count_articles_by_media_outlet(self) -> Dict[Optional[str], int]:
+        """media_outlet_id → 기사 수 (행을 가져오지 않고 집계)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def upsert_articles(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """URL 기준 upsert (이미 있는 기사는 무시), 새로 들어간 행의 id/url 목록 반환"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_articles(self, article_ids: List[str]):
+        """기사와 본문 삭제 (본문 저장 실패 시 되돌리기용)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_article_text_hashes(self, hashes: Dict[str, str]):
+        """article id → text_hash(임베딩 입력 텍스트 sha256) 기록 (기존 기사 backfill용)"""
+        raise NotImplementedError
+
+    # article_bodies (압축 본문, 클러스터링 단계에서만 조회)
+    @abstractmethod
+    def upsert_article_bodies(self, rows: List[Dict[str, Any]]):
+        """{'article_id', 'body'(compress_body 결과)} 행 저장, 이미 있으면 무시"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def select_article_bodies(self, article_ids: List[str]) -> Dict[str, str]:
+        """article_id → 압축 해제된 본문"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def select_articles_missing_body(self, after: Optional[str] = None, limit: int = 1000) -> List[Dict[str, Any]]:
+        """
+        articles.content는 있지만 article_bodies 행이 없는 기사의 id, content (본문 이전 backfill용)
+        id 순서로 after 다음 id부터 limit개 (keyset pagination)
+        """
+        raise NotImplementedError
+
+    # media_outlets
+    @abstractmethod
+    def select_media_outlets(self, columns: Columns = None) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    # issues
+    @abstractmethod
+    def select_issues(self, columns: Columns = None, generation_id: Optional[str] = None,
+                      category: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """이슈 목록 (created_at 내림차순)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_issue(self, issue_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def insert_issues(self, rows: List[Dict[str, Any]]):
+        raise NotImplementedError
+
+    @abstractmethod
+    def select_stale_issue_ids(self, keep_generation_ids: Sequence[str]) -> List[str]:
+        """keep_generation_ids에 속하지 않는(또는 세대 정보가 없는) 이슈 id 목록"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_issues(self, issue_ids: List[str]):
+        """이슈와 해당 이슈-기사 매핑 삭제"""
+        raise NotImplementedError
+
+    # issue_articles
+    @abstractmethod
+    def insert_issue_articles(self, rows: List[Dict[str, Any]]):
+        raise NotImplementedError
+
+    @abstractmethod
+    def select_issue_article_ids(self, issue_id: str) -> List[str]:
+        raise NotImplementedError
+
+    # publish_state
+    @abstractmethod
+    def get_current_generation(self) -> Optional[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def set_current_generation(self, generation_id: str, published_at: str):
+        raise NotImplementedError
+
+
+def _chunks(items: List[Any], size: int = IN_FILTER_CHUNK) -> Iterable[List[Any]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _page_columns(columns: Columns) -> Columns:
+    """keyset 커서에 필요한 published_at, id를 포함한 컬럼 목록"""
+    if not columns:
+        return columns
+    return list(columns) + [col for col in ('published_at', 'id') if col not in columns]
+
+
+class SupabaseStorage(Storage):
+    """Supabase(PostgREST) 구현"""
+
+    # 현재 발행 세대를 가리키는 publish_state 행의 key
+    CURRENT_GENERATION_KEY = 'current'
+
+    def __init__(self, url: str, key: str):
+        from supabase.client import create_client
+        self.client = create_client(url, key)
+
+    @staticmethod
+    def _select(columns: Columns) -> str:
+        return ', '.join(columns) if columns else '*'
+
+    def select_articles(self, columns: Columns = None, ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        if ids is None:
+            return self.client.table('articles').select(self._select(columns)).execute().data
+        rows = []
+        for chunk in _chunks(ids):
+            rows.extend(self.client.table('articles').select(self._select(columns)).in_('id', chunk).execute().data)
+        return rows
+
+    def select_articles_page(self, columns: Columns = None, since: Optional[str] = None, until: Optional[str] = None,
+                             after: Optional[Tuple[str, str]] = None, limit: int = 1000) -> List[Dict[str, Any]]:
+        query = self.client.table('articles').select(self._select(_page_columns(columns)))
+        if since:
+            query = query.gte('published_at', since)
+        if until:
+            query = query.lt('published_at', until)
+        if after:
+            published_at, article_id = after
+            # 시각 값의 ':'/'+'가 필터 구문과 섞이지 않도록 따옴표로 감쌈
+            query = query.or_(f'published_at.gt."{published_at}",'
+                              f'and(published_at.eq."{published_at}",id.gt.{article_id})')
+        # PostgREST 기본 최대 행 수(1000)보다 작거나 같은 limit으로 잘림 없이 페이지 단위 조회
+        return query.order('published_at').order('id').limit(limit).execute().data
+
+    def count_articles(self, published_at_missing: bool = False) -> int:
+        query = self.client.table('articles').select('id', count='exact')
+        if published_at_missing:
+            query = query.is_('published_at', 'null')
+        return query.limit(1).execute().count or 0
+
+    def count_articles_by_media_outlet(self) -> Dict[Optional[str], int]:
+        # PostgREST에는 GROUP BY가 없으므로 언론사(수십 개 이하)마다 count 요청, 나머지는 언론사 없음
+        counts: Dict[Optional[str], int] = {}
+        for outlet in self.select_media_outlets(['id']):
+            response = (self.client.table('articles').select('id', count='exact')
+                        .eq('media_outlet_id', outlet['id']).limit(1).execute())
+            if response.count:
+                counts[str(outlet['id'])] = response.count
+        unassigned = self.count_articles() - sum(counts.values())
+        if unassigned > 0:
+            counts[None] = unassigned
+        return counts
+
+    def upsert_articles(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        response = self.client.table('articles').upsert(rows, on_conflict='url', ignore_duplicates=True).execute()
+        return [{'id': row['id'], 'url': row['url']} for row in (response.data or [])]
+
+    def delete_articles(self, article_ids: List[str]):
+        for chunk in _chunks(article_ids):
+            self.client.table('article_bodies').delete().in_('article_id', chunk).execute()
+            self.client.table('articles').delete().in_('id', chunk).execute()
+
+    def update_article_text_hashes(self, hashes: Dict[str, str]):
+        # 기사마다 UPDATE 하지 않고 500개씩 RPC 한 번 (migrations/006_update_article_text_hashes.sql 필요)
+        rows = [{'id': article_id, 'text_hash': text_hash} for article_id, text_hash in hashes.items()]
+        for chunk in _chunks(rows, 500):
+            self.client.rpc('update_article_text_hashes', {'hashes': chunk}).execute()
+
+    def upsert_article_bodies(self, rows: List[Dict[str, Any]]):
+        self.client.table('article_bodies').upsert(rows, on_conflict='article_id', ignore_duplicates=True).execute()
+
+    def select_article_bodies(self, article_ids: List[str]) -> Dict[str, str]:
+        bodies = {}
+        for chunk in _chunks(article_ids):
+            response = self.client.table('article_bodies').select('article_id, body').in_('article_id', chunk).execute()
+            for row in response.data:
+                bodies[str(row['article_id'])] = decompress_body(row['body'])
+        return bodies
+
+    def select_articles_missing_body(self, after: Optional[str] = None, limit: int = 1000) -> List[Dict[str, Any]]:
+        # article_bodies를 left join으로 embed해서 본문 행이 없는 기사만 조회
+        query = (self.client.table('articles').select('id, content, article_bodies!left(article_id)')
+                 .is_('article_bodies', 'null').not_.is_('content', 'null'))
+        if after:
+            query = query.gt('id', after)
+        rows = query.order('id').limit(limit).execute().data
+        return [{'id': row['id'], 'content': row['content']} for row in rows]
+
+    def select_media_outlets(self, columns: Columns = None) -> List[Dict[str, Any]]:
+        return self.client.table('media_outlets').select(self._select(columns)).execute().data
+
+    def select_issues(self, columns: Columns = None, generation_id: Optional[str] = None,
+                      category: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        query = self.client.table('issues').select(self._select(columns))
+        if generation_id:
+            query = query.eq('generation_id', generation_id)
+        if category:
+            query = query.eq('category', category)
+        query = query.order('created_at', desc=True)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.execute().data
+
+    def get_issue(self, issue_id: str) -> Optional[Dict[str, Any]]:
+        response = self.client.table('issues').select('*').eq('id', issue_id).execute()
+        return response.data[0] if response.data else None
+
+    def insert_issues(self, rows: List[Dict[str, Any]]):
+        self.client.table('issues').insert(rows).execute()
+
+    def select_stale_issue_ids(self, keep_generation_ids: Sequence[str]) -> List[str]:
+        stale_filter = f"generation_id.is.null,generation_id.not.in.({','.join(keep_generation_ids)})"
+        response = self.client.table('issues').select('id').or_(stale_filter).execute()
+        return [row['id'] for row in (response.data or [])]
+
+    def delete_issues(self, issue_ids: List[str]):
+        for chunk in _chunks(issue_ids):
+            self.client.table('issue_articles').delete().in_('issue_id', chunk).execute()
+            self.client.table('issues').delete().in_('id', chunk).execute()
+
+    def insert_issue_articles(self, rows: List[Dict[str, Any]]):
+        self.client.table('issue_articles').insert(rows).execute()
+
+    def select_issue_article_ids(self, issue_id: str) -> List[str]:
+        response = self.client.table('issue_articles').select('article_id').eq('issue_id', issue_id).execute()
+        return [item['article_id'] for item in response.data]
+
+    def get_current_generation(self) -> Optional[str]:
+        response = self.client.table('publish_state').select('generation_id').eq('key', self.CURRENT_GENERATION_KEY).execute()
+        return response.data[0]['generation_id'] if response.data else None
+
+    def set_current_generation(self, generation_id: str, published_at: str):
+        self.client.table('publish_state').upsert(
+            {'key': self.CURRENT_GENERATION_KEY, 'generation_id': generation_id, 'published_at': published_at},
+            on_conflict='key'
+        ).execute()
+
+
+# Supabase 스키마와 같은 테이블/인덱스 (migrations/ 반영 포함)
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS media_outlets (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    bias TEXT
+);
+CREATE TABLE IF NOT EXISTS articles (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL UNIQUE,
+    content TEXT,
+    content_length INTEGER,
+    text_hash TEXT,
+    media_outlet_id TEXT REFERENCES media_outlets (id),
+    category TEXT,
+    published_at TEXT,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+CREATE INDEX IF NOT EXISTS idx_articles_category ON articles (category);
+CREATE INDEX IF NOT EXISTS idx_articles_published_id ON articles (published_at, id);
+CREATE TABLE IF NOT EXISTS article_bodies (
+    article_id TEXT PRIMARY KEY REFERENCES articles (id) ON DELETE CASCADE,
+    body TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS issues (
+    id TEXT PRIMARY KEY,
+    category TEXT,
+    title TEXT,
+    summary TEXT,
+    article_count INTEGER NOT NULL DEFAULT 0,
+    bias_left INTEGER NOT NULL DEFAULT 0,
+    bias_center INTEGER NOT NULL DEFAULT 0,
+    bias_right INTEGER NOT NULL DEFAULT 0,
+    generation_id TEXT,
+    stable_id TEXT,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+CREATE INDEX IF NOT EXISTS idx_issues_generation_created ON issues (generation_id, created_at DESC);
+CREATE TABLE IF NOT EXISTS issue_articles (
+    issue_id TEXT NOT NULL REFERENCES issues (id),
+    article_id TEXT NOT NULL REFERENCES articles (id)
+);
+CREATE INDEX IF NOT EXISTS idx_issue_articles_issue_id ON issue_articles (issue_id);
+CREATE TABLE IF NOT EXISTS publish_state (
+    key TEXT PRIMARY KEY,
+    generation_id TEXT NOT NULL,
+    published_at TEXT NOT NULL
+);
+"""
+
+# 로컬 DB 초기 언론사 (supabase_uploader의 media_mapping 이름과 동일)
+DEFAULT_MEDIA_OUTLETS = [
+    {'name': '한겨레', 'bias': 'left'},
+    {'name': '조선일보', 'bias': 'right'},
+    {'name': 'KBS', 'bias': 'center'},
+    {'name': 'YTN', 'bias': 'center'},
+]
+
+
+class SQLiteStorage(Storage):
+    """내장 SQLite 구현 (오프라인 실행/벤치마크용)"""
+
+    CURRENT_GENERATION_KEY = SupabaseStorage.CURRENT_GENERATION_KEY
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = str(path or DEFAULT_SQLITE_PATH)
+        # 업로더의 배치 스레드에서도 쓰므로 연결 하나를 락으로 보호
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self._lock, self.conn:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.executescript(SQLITE_SCHEMA)
+            # 이전 스키마로 만든 DB 파일에 추가된 컬럼 반영
+            issue_columns = {row['name'] for row in self.conn.execute('PRAGMA table_info(issues)')}
+            if 'stable_id' not in issue_columns:
+                self.conn.execute('ALTER TABLE issues ADD COLUMN stable_id TEXT')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_issues_stable_id ON issues (stable_id)')
+            article_columns = {row['name'] for row in self.conn.execute('PRAGMA table_info(articles)')}
+            if 'text_hash' not in article_columns:
+                self.conn.execute('ALTER TABLE articles ADD COLUMN text_hash TEXT')
+            if not self.conn.execute('SELECT 1 FROM media_outlets LIMIT 1').fetchone():
+                self.conn.executemany(
+                    'INSERT INTO media_outlets (id, name, bias) VALUES (?, ?, ?)',
+                    [(str(uuid.uuid4()), outlet['name'], outlet['bias']) for outlet in DEFAULT_MEDIA_OUTLETS]
+                )
+
+    @staticmethod
+    def _select(columns: Columns) -> str:
+        return ', '.join(columns) if columns else '*'
+
+    def _query(self, sql: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(row) for row in self.conn.execute(sql, params).fetchall()]
+
+    def _insert(self, table: str, rows: List[Dict[str, Any]], conflict: str = '') -> int:
+        """행 dict 목록 insert, 실제로 들어간 행 수 반환 (하나라도 실패하면 전체 롤백)"""
+        if not rows:
+            return 0
+        columns = list(rows[0].keys())
+        sql = (f"INSERT INTO {table} ({', '.join(columns)}) "
+               f"VALUES ({', '.join('?' for _ in columns)}) {conflict}")
+        with self._lock, self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(sql, [tuple(row.get(col) for col in columns) for row in rows])
+            return self.conn.total_changes - before
+
+    def select_articles(self, columns: Columns = None, ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        if ids is None:
+            return self._query(f'SELECT {self._select(columns)} FROM articles')
+        rows = []
+        for chunk in _chunks(ids, 500):
+            placeholders = ', '.join('?' for _ in chunk)
+            rows.extend(self._query(f'SELECT {self._select(columns)} FROM articles WHERE id IN ({placeholders})', chunk))
+        return rows
+
+    def select_articles_page(self, columns: Columns = None, since: Optional[str] = None, until: Optional[str] = None,
+                             after: Optional[Tuple[str, str]] = None, limit: int = 1000) -> List[Dict[str, Any]]:
+        sql = f'SELECT {self._select(_page_columns(columns))} FROM articles WHERE published_at IS NOT NULL'
+        params: List[Any] = []
+        if since:
+            sql += ' AND published_at >= ?'
+            params.append(since)
+        if until:
+            sql += ' AND published_at < ?'
+            params.append(until)
+        if after:
+            sql += ' AND (published_at > ? OR (published_at = ? AND id > ?))'
+            params.extend([after[0], after[0], after[1]])
+        sql += ' ORDER BY published_at, id LIMIT ?'
+        params.append(limit)
+        return self._query(sql, params)
+
+    def count_articles(self, published_at_missing: bool = False) -> int:
+        where = ' WHERE published_at IS NULL' if published_at_missing else ''
+        return self._query(f'SELECT COUNT(*) AS n FROM articles{where}')[0]['n']
+
+    def count_articles_by_media_outlet(self) -> Dict[Optional[str], int]:
+        rows = self._query('SELECT media_outlet_id, COUNT(*) AS n FROM articles GROUP BY media_outlet_id')
+        return {row['media_outlet_id']: row['n'] for row in rows}
+
+    def upsert_articles(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        rows = [{'id': str(uuid.uuid4()), **row} for row in rows]
+        if not rows:
+            return []
+        columns = list(rows[0].keys())
+        sql = (f"INSERT INTO articles ({', '.join(columns)}) "
+               f"VALUES ({', '.join('?' for _ in columns)}) ON CONFLICT (url) DO NOTHING")
+        inserted = []
+        with self._lock, self.conn:
+            for row in rows:
+                if self.conn.execute(sql, tuple(row.get(col) for col in columns)).rowcount:
+                    inserted.append({'id': row['id'], 'url': row['url']})
+        return inserted
+
+    def delete_articles(self, article_ids: List[str]):
+        with self._lock, self.conn:
+            for chunk in _chunks(article_ids, 500):
+                placeholders = ', '.join('?' for _ in chunk)
+                self.conn.execute(f'DELETE FROM article_bodies WHERE article_id IN ({placeholders})', chunk)
+                self.conn.execute(f'DELETE FROM articles WHERE id IN ({placeholders})', chunk)
+
+    def update_article_text_hashes(self, hashes: Dict[str, str]):
+        with self._lock, self.conn:
+            self.conn.executemany('UPDATE articles SET text_hash = ? WHERE id = ?',
+                                  [(text_hash, article_id) for article_id, text_hash in hashes.items()])
+
+    def upsert_article_bodies(self, rows: List[Dict[str, Any]]):
+        self._insert('article_bodies', rows, 'ON CONFLICT (article_id) DO NOTHING')
+
+    def select_article_bodies(self, article_ids: List[str]) -> Dict[str, str]:
+        bodies = {}
+        for chunk in _chunks(article_ids, 500):
+            placeholders = ', '.join('?' for _ in chunk)
+            for row in self._query(f'SELECT article_id, body FROM article_bodies WHERE article_id IN ({placeholders})', chunk):
+                bodies[row['article_id']] = decompress_body(row['body'])
+        return bodies
+
+    def select_articles_missing_body(self, after: Optional[str] = None, limit: int = 1000) -> List[Dict[str, Any]]:
+        sql = ('SELECT a.id, a.content FROM articles a LEFT JOIN article_bodies b ON b.article_id = a.id '
+               'WHERE b.article_id IS NULL AND a.content IS NOT NULL')
+        params: List[Any] = []
+        if after:
+            sql += ' AND a.id > ?'
+            params.append(after)
+        sql += ' ORDER BY a.id LIMIT ?'
+        params.append(limit)
+        return self._query(sql, params)
+
+    def select_media_outlets(self, columns: Columns = None) -> List[Dict[str, Any]]:
+        return self._query(f'SELECT {self._select(columns)} FROM media_outlets')
+
+    def select_issues(self, columns: Columns = None, generation_id: Optional[str] = None,
+                      category: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        sql = f'SELECT {self._select(columns)} FROM issues WHERE 1 = 1'
+        params: List[Any] = []
+        if generation_id:
+            sql += ' AND generation_id = ?'
+            params.append(generation_id)
+        if category:
+            sql += ' AND category = ?'
+            params.append(category)
+        sql += ' ORDER BY created_at DESC'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return self._query(sql, params)
+
+    def get_issue(self, issue_id: str) -> Optional[Dict[str, Any]]:
+        rows = self._query('SELECT * FROM issues WHERE id = ?', (issue_id,))
+        return rows[0] if rows else None
+
+    def insert_issues(self, rows: List[Dict[str, Any]]):
+        self._insert('issues', [{'id': str(uuid.uuid4()), **row} for row in rows])
+
+    def select_stale_issue_ids(self, keep_generation_ids: Sequence[str]) -> List[str]:
+        placeholders = ', '.join('?' for _ in keep_generation_ids)
+        rows = self._query(f'SELECT id FROM issues WHERE generation_id IS NULL OR generation_id NOT IN ({placeholders})',
+                           list(keep_generation_ids))
+        return [row['id'] for row in rows]
+
+    def delete_issues(self, issue_ids: List[str]):
+        with self._lock, self.conn:
+            for chunk in _chunks(issue_ids, 500):
+                placeholders = ', '.join('?' for _ in chunk)
+                self.conn.execute(f'DELETE FROM issue_articles WHERE issue_id IN ({placeholders})', chunk)
+                self.conn.execute(f'DELETE FROM issues WHERE id IN ({placeholders})', chunk)
+
+    def insert_issue_articles(self, rows: List[Dict[str, Any]]):
+        self._insert('issue_articles', rows)
+
+    def select_issue_article_ids(self, issue_id: str) -> List[str]:
+        rows = self._query('SELECT article_id FROM issue_articles WHERE issue_id = ?', (issue_id,))
+        return [row['article_id'] for row in rows]
+
+    def get_current_generation(self) -> Optional[str]:
+        rows = self._query('SELECT generation_id FROM publish_state WHERE key = ?', (self.CURRENT_GENERATION_KEY,))
+        return rows[0]['generation_id'] if rows else None
+
+    def set_current_generation(self, generation_id: str, published_at: str):
+        with self._lock, self.conn:
+            self.conn.execute(
+                'INSERT INTO publish_state (key, generation_id, published_at) VALUES (?, ?, ?) '
+                'ON CONFLICT (key) DO UPDATE SET generation_id = excluded.generation_id, '
+                'published_at = excluded.published_at',
+                (self.CURRENT_GENERATION_KEY, generation_id, published_at or datetime.now().isoformat())
+            )
+
+
+def create_storage(backend: Optional[str] = None) -> Storage:
+    """환경 변수 STORAGE_BACKEND에 따라 저장소 생성"""
+    backend = (backend or os.getenv('STORAGE_BACKEND', 'supabase')).strip().lower()
+    if backend == 'sqlite':
+        return SQLiteStorage(os.getenv('SQLITE_PATH') or DEFAULT_SQLITE_PATH)
+    if backend != 'supabase':
+        raise ValueError(f"지원하지 않는 STORAGE_BACKEND입니다: {backend} (supabase | sqlite)")
+    url = os.getenv('SUPABASE_URL')
+    key = os.getenv('SUPABASE_ANON_KEY')
+    # 환경 변수에서 불필요한 문자 제거 (줄바꿈, 공백 등)
+    if url:
+        url = url.strip().replace('\n', '').replace('\r', '').replace('\\n', '')
+    if key:
+        key = key.strip().replace('\n', '').replace('\r', '').replace('\\n', '')
+    if not url or not key:
+        raise ValueError("SUPABASE_URL과 SUPABASE_ANON_KEY 환경 변수를 설정해주세요.")
+    return SupabaseStorage(url, key)
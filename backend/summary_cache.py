@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from title_dedup import jaccard
+
+# 기본 캐시 위치 (backend/.summary_cache.json)
+DEFAULT_SUMMARY_CACHE_PATH = Path(__file__).parent / '.summary_cache.json'
+
+
+def membership_key(article_ids: Iterable, prompt_version: str) -> str:
+    """정렬된 기사 id 목록 + 프롬프트 버전의 sha256"""
+    joined = '\n'.join(sorted(str(article_id) for article_id in article_ids))
+    return hashlib.sha256(f'{prompt_version}\n{joined}'.encode('utf-8')).hexdigest()
+
+
+def reuse_plan(entry: Optional[Dict[str, Any]], reuse_threshold: float = 0.8, delta_threshold: float = 0.3) -> str:
+    """
+    closest 결과로 요약 처리 방식 결정 → 'reuse'(그대로 재사용) / 'delta'(기존 요약 + 새 기사로 갱신) / 'new'(새로 생성)
+    delta는 새 기사 비율(현재 클러스터 기준)과 빠진 기사 비율(기존 항목 기준)이 모두 delta_threshold 이하일 때만
+    (기존 멤버가 많이 빠진 클러스터는 기존 요약이 다른 이슈를 설명할 수 있으므로 새로 생성)
+    """
+    if entry is None:
+        return 'new'
+    if entry['similarity'] >= reuse_threshold:
+        return 'reuse'
+    n_current = len(entry['article_ids']) - len(entry['removed_ids']) + len(entry['new_ids'])
+    if (entry['new_ids'] and len(entry['new_ids']) / n_current <= delta_threshold
+            and len(entry['removed_ids']) / len(entry['article_ids']) <= delta_threshold):
+        return 'delta'
+    return 'new'
+
+
+class SummaryCache:
+    """
+    클러스터 구성(기사 id 집합) → 생성된 제목/요약을 로컬 JSON 파일에 보관하는 캐시
+
+    - 구성이 같은 클러스터(정렬된 id + 프롬프트 버전 해시 일치)는 그대로 재사용
+    - 구성이 조금 바뀐 클러스터는 기사 id Jaccard 유사도가 threshold 이상인 항목을 재사용
+    - closest로 가장 비슷한 항목과 새로 추가된 기사 id를 찾아 요약 갱신(delta)에 사용
+    - 프롬프트 버전이 다른 항목은 조회하지 않고, max_age_days 동안 쓰이지 않은 항목은 저장 시 정리
+    """
+
+    def __init__(self, prompt_version: str, path: Optional[str] = None, max_age_days: int = 7):
+        self.prompt_version = prompt_version
+        self.path = Path(path) if path else DEFAULT_SUMMARY_CACHE_PATH
+        self.max_age_days = max_age_days
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._id_sets: Dict[str, Set[str]] = {}
+        self._by_article: Dict[str, Set[str]] = defaultdict(set)
+        self.load()
+
+    def load(self):
+        """캐시 파일 로드 (없거나 깨졌으면 빈 캐시로 시작)"""
+        self.entries = {}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get('entries', {})
+            except Exception as e:
+                print(f"⚠️ 요약 캐시 로드 실패, 새로 시작합니다: {e}")
+                self.entries = {}
+        self._id_sets = {}
+        self._by_article = defaultdict(set)
+        for key, entry in self.entries.items():
+            if entry.get('prompt_version') == self.prompt_version:
+                self._index(key, entry)
+
+    def _index(self, key: str, entry: Dict[str, Any]):
+        ids = set(entry['article_ids'])
+        self._id_sets[key] = ids
+        for article_id in ids:
+            self._by_article[article_id].add(key)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def closest(self, article_ids: Iterable) -> Optional[Dict[str, Any]]:
+        """
+        기사 id 집합이 가장 비슷한 항목 조회 (공유 기사가 없으면 None)
+        반환 dict에는 'match'('exact' 또는 'overlap'), 'similarity', 'new_ids'(항목에 없던 기사 id),
+        'removed_ids'(항목에만 있는 기사 id)가 추가됨
+        """
+        ids = {str(article_id) for article_id in article_ids}
+        key = membership_key(ids, self.prompt_version)
+        entry = self.entries.get(key)
+        if entry is not None and entry.get('prompt_version') == self.prompt_version:
+            return dict(entry, key=key, match='exact', similarity=1.0, new_ids=[], removed_ids=[])
+        # 기사를 하나라도 공유하는 항목만 후보로 비교
+        candidates = set()
+        for article_id in ids:
+            candidates.update(self._by_article.get(article_id, ()))
+        best_key, best_similarity = None, 0.0
+        for candidate in sorted(candidates):
+            similarity = jaccard(ids, self._id_sets[candidate])
+            if similarity > best_similarity:
+                best_key, best_similarity = candidate, similarity
+        if best_key is None:
+            return None
+        new_ids = sorted(ids - self._id_sets[best_key])
+        removed_ids = sorted(self._id_sets[best_key] - ids)
+        return dict(self.entries[best_key], key=best_key, match='overlap', similarity=best_similarity,
+                    new_ids=new_ids, removed_ids=removed_ids)
+
+    def touch(self, key: str):
+        """재사용한 항목의 마지막 사용 시각 갱신"""
+        if key in self.entries:
+            self.entries[key]['used_at'] = datetime.now().isoformat()
+
+    def put(self, article_ids: Iterable, title: str, summary: str):
+        """클러스터 구성에 대한 제목/요약 기록 (save 전까지 메모리에만 반영)"""
+        ids: List[str] = sorted({str(article_id) for article_id in article_ids})
+        key = membership_key(ids, self.prompt_version)
+        now = datetime.now().isoformat()
+        entry = {
+            'prompt_version': self.prompt_version,
+            'article_ids': ids,
+            'title': title,
+            'summary': summary,
+            'created_at': now,
+            'used_at': now,
+        }
+        if key in self._id_sets:
+            for article_id in self._id_sets.pop(key):
+                self._by_article[article_id].discard(key)
+        self.entries[key] = entry
+        self._index(key, entry)
+
+    def save(self):
+        """오래 쓰이지 않은 항목을 정리하고 임시 파일 교체로 저장"""
+        cutoff = (datetime.now() - timedelta(days=self.max_age_days)).isoformat()
+        self.entries = {key: entry for key, entry in self.entries.items() if entry.get('used_at', '') >= cutoff}
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'entries': self.entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.load()
@@ -1,36 +1,47 @@
 import json
 import os
+import re
+import uuid
 from datetime import datetime
-from typing import List, Dict, Any, Optional
-try:
-    from supabase.client import create_client, Client
-except ImportError:
-    print("❌ supabase 패키지가 설치되지 않았습니다. 'pip install supabase' 명령어로 설치해주세요.")
-    exit(1)
+from typing import List, Dict, Any, Optional, Callable
 import asyncio
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from dotenv import load_dotenv
 import glob
+from upload_journal import UploadJournal
+from storage import Storage, create_storage, compress_body
+from embedding_cache import embedding_text, text_key
+from article_fetch import fetch_article_rows
 
 # .env 파일 로드
 load_dotenv()
 
+
+def is_row_error(error: Exception) -> bool:
+    """
+    행 데이터 때문에 난 오류인지 (제약 조건/형식 오류, 408/429를 뗀 4xx)
+    그 외(5xx, timeout, 네트워크 오류)는 배치 전체의 일시적 오류로 봄
+    """
+    if isinstance(error, (sqlite3.IntegrityError, sqlite3.DataError)):
+        return True
+    # PostgREST APIError의 code는 Postgres SQLSTATE (22xxx: 데이터 형식, 23xxx: 제약 조건)
+    if str(getattr(error, 'code', None) or '')[:2] in ('22', '23'):
+        return True
+    status = getattr(error, 'status_code', None) or getattr(getattr(error, 'response', None), 'status_code', None)
+    return isinstance(status, int) and 400 <= status < 500 and status not in (408, 429)
+
+
 class SupabaseUploader:
-    def __init__(self):
-        """Supabase 클라이언트 초기화"""
-        # 환경 변수에서 Supabase 설정 가져오기
-        self.supabase_url = os.getenv('SUPABASE_URL')
-        self.supabase_key = os.getenv('SUPABASE_ANON_KEY')
-        
-        if not self.supabase_url or not self.supabase_key:
-            raise ValueError("SUPABASE_URL과 SUPABASE_ANON_KEY 환경 변수를 설정해주세요.")
-        
+    def __init__(self, storage: Optional[Storage] = None):
+        """저장소 초기화 (기본: STORAGE_BACKEND 환경 변수에 따라 Supabase 또는 로컬 SQLite)"""
         try:
-            self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
-        except Exception as e:
-            print(f"❌ Supabase 클라이언트 생성 실패: {e}")
-            # 간단한 방식으로 재시도
-            self.supabase = create_client(self.supabase_url, self.supabase_key)
+            self.storage = storage or create_storage()
+        except ImportError:
+            print("❌ supabase 패키지가 설치되지 않았습니다. 'pip install supabase' 명령어로 설치해주세요.")
+            raise
         
         # 언론사 매핑 (크롤러에서 사용하는 이름 → DB의 name)
         self.media_mapping = {
@@ -46,9 +57,7 @@ class SupabaseUploader:
     def load_media_outlets(self):
         """언론사 정보를 로드하여 ID 매핑 생성"""
         try:
-            response = self.supabase.table('media_outlets').select('id, name').execute()
-            
-            for outlet in response.data:
+            for outlet in self.storage.select_media_outlets(['id', 'name']):
                 self.media_outlet_ids[outlet['name']] = outlet['id']
             
             print(f"✅ 언론사 정보 로드 완료: {list(self.media_outlet_ids.keys())}")
@@ -57,11 +66,14 @@ class SupabaseUploader:
             print(f"❌ 언론사 정보 로드 실패: {e}")
             raise
     
-    def load_json_file(self, file_path: str) -> List[Dict[str, Any]]:
-        """JSON 파일 로드"""
+    def load_json_file(self, file_path: str, content: Optional[bytes] = None) -> List[Dict[str, Any]]:
+        """JSON 파일 로드 (content를 주면 파일을 다시 읽지 않고 그 바이트를 파싱)"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            if content is None:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            else:
+                data = json.loads(content.decode('utf-8'))
             
             print(f"✅ JSON 파일 로드 완료: {file_path} ({len(data)}개 기사)")
             return data
@@ -86,11 +98,15 @@ class SupabaseUploader:
                     print(f"⚠️ 언론사 ID를 찾을 수 없음: {source}")
                     continue
                 
-                # 데이터 변환
+                # 데이터 변환 (본문은 압축해서 article_bodies 테이블로 따로 저장)
+                content = article.get('content', '') or ''
                 prepared_article = {
                     'title': article.get('title', ''),
                     'url': article.get('url', ''),
-                    'content': article.get('content', ''),
+                    'content_length': len(content),
+                    # 클러스터링에서 본문 없이 임베딩 캐시를 조회하기 위한 입력 텍스트 해시
+                    'text_hash': text_key(embedding_text(article.get('title', ''), content)),
+                    'body': compress_body(content),
                     'media_outlet_id': media_outlet_id,
                     'category': article.get('category', ''),
                     'published_at': self.parse_datetime(article.get('crawled_at')),
@@ -136,43 +152,91 @@ class SupabaseUploader:
         except Exception:
             return datetime.now().isoformat()
     
-    def upload_articles(self, articles: List[Dict[str, Any]], batch_size: int = 100) -> Dict[str, int]:
-        """기사 데이터를 Supabase에 업로드"""
+    def _with_retry(self, fn: Callable[[], Any], max_retries: int) -> Any:
+        """fn 실행, 일시적 오류면 지수 백오프로 재시도 (행 데이터 오류는 다시 보내도 같으므로 바로 실패)"""
+        for attempt in range(max_retries):
+            try:
+                return fn()
+            except Exception as e:
+                if attempt < max_retries - 1 and not is_row_error(e):
+                    delay = 2 ** attempt
+                    print(f"⚠️ 업로드 재시도 {attempt + 1}/{max_retries} ({delay}초 후): {e}")
+                    time.sleep(delay)
+                else:
+                    raise
+
+    def _upsert_with_retry(self, batch: List[Dict[str, Any]], max_retries: int) -> int:
+        """
+        URL 기준 upsert (이미 있는 기사는 무시) 후 새로 들어간 기사의 본문을 article_bodies에 저장
+        새로 들어간 행 수 반환
+        """
+        article_rows = [{k: v for k, v in article.items() if k != 'body'} for article in batch]
+        bodies_by_url = {article['url']: article['body'] for article in batch}
+        inserted = self._with_retry(lambda: self.storage.upsert_articles(article_rows), max_retries)
+        if not inserted:
+            return 0
+        body_rows = [{'article_id': row['id'], 'body': bodies_by_url[row['url']]} for row in inserted]
+        try:
+            self._with_retry(lambda: self.storage.upsert_article_bodies(body_rows), max_retries)
+        except Exception:
+            # 본문 없이 남지 않도록 방금 넣은 기사를 되돌린 뒤 배치 실패로 처리
+            self.storage.delete_articles([row['id'] for row in inserted])
+            raise
+        return len(inserted)
+
+    def _upload_batch(self, batch: List[Dict[str, Any]], batch_no: int, max_retries: int,
+                      on_confirmed: Optional[Callable[[List[str]], None]] = None) -> Dict[str, int]:
+        """
+        배치 하나를 업로드. 일시적 오류(5xx, timeout)는 배치 그대로 재시도하고 끝까지 실패하면 배치 전체 실패,
+        행 데이터 오류(제약 조건/형식, 4xx)만 절반으로 나눠 재시도해 문제 기사를 격리
+        """
+        try:
+            uploaded = self._upsert_with_retry(batch, max_retries)
+            print(f"✅ 배치 {batch_no}: {uploaded}개 기사 업로드 완료 ({len(batch) - uploaded}개 중복 스킵)")
+            if on_confirmed:
+                on_confirmed([article['url'] for article in batch])
+            return {'uploaded': uploaded, 'failed': 0}
+        except Exception as e:
+            if len(batch) == 1:
+                print(f"❌ 배치 {batch_no} 기사 업로드 실패 ({batch[0].get('url')}): {e}")
+                return {'uploaded': 0, 'failed': 1}
+            if not is_row_error(e):
+                print(f"❌ 배치 {batch_no} 업로드 실패 ({len(batch)}개, 재시도 {max_retries}회 초과): {e}")
+                return {'uploaded': 0, 'failed': len(batch)}
+            mid = len(batch) // 2
+            print(f"⚠️ 배치 {batch_no} 행 데이터 오류, {mid}/{len(batch) - mid}개로 나눠 재시도: {e}")
+            left = self._upload_batch(batch[:mid], batch_no, max_retries, on_confirmed)
+            right = self._upload_batch(batch[mid:], batch_no, max_retries, on_confirmed)
+            return {
+                'uploaded': left['uploaded'] + right['uploaded'],
+                'failed': left['failed'] + right['failed']
+            }
+
+    def upload_articles(self, articles: List[Dict[str, Any]], batch_size: int = 100,
+                        max_workers: int = 4, max_retries: int = 3,
+                        on_confirmed: Optional[Callable[[List[str]], None]] = None) -> Dict[str, int]:
+        """
+        기사 데이터를 Supabase에 업로드 (URL 기준 upsert, 배치 병렬 전송)
+        on_confirmed: DB 반영이 확인된 배치의 URL 목록을 받는 콜백 (업로드 저널 기록용)
+        """
         total_articles = len(articles)
         uploaded_count = 0
         failed_count = 0
         
         print(f"📤 {total_articles}개 기사 업로드 시작...")
         
-        # 배치 단위로 업로드
-        for i in range(0, total_articles, batch_size):
-            batch = articles[i:i + batch_size]
-            
-            try:
-                # 중복 체크 (URL 기반)
-                urls = [article['url'] for article in batch]
-                existing_response = self.supabase.table('articles').select('url').in_('url', urls).execute()
-                existing_urls = {item['url'] for item in existing_response.data}
-                
-                # 중복되지 않은 기사만 필터링
-                new_articles = [article for article in batch if article['url'] not in existing_urls]
-                
-                if not new_articles:
-                    print(f"⚠️ 배치 {i//batch_size + 1}: 모든 기사가 이미 존재함")
-                    continue
-                
-                # 업로드 실행
-                response = self.supabase.table('articles').insert(new_articles).execute()
-                
-                batch_uploaded = len(new_articles)
-                uploaded_count += batch_uploaded
-                
-                print(f"✅ 배치 {i//batch_size + 1}: {batch_uploaded}개 기사 업로드 완료")
-                
-            except Exception as e:
-                print(f"❌ 배치 {i//batch_size + 1} 업로드 실패: {e}")
-                failed_count += len(batch)
-                continue
+        batches = [articles[i:i + batch_size] for i in range(0, total_articles, batch_size)]
+        
+        # 배치 단위로 동시 업로드 (중복 체크는 DB의 url unique 제약으로 처리)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self._upload_batch, batch, batch_no, max_retries, on_confirmed)
+                for batch_no, batch in enumerate(batches, start=1)
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                uploaded_count += result['uploaded']
+                failed_count += result['failed']
         
         return {
             'total': total_articles,
@@ -181,14 +245,21 @@ class SupabaseUploader:
             'skipped': total_articles - uploaded_count - failed_count
         }
     
-    def upload_from_json_files(self, data_dir: str = "../crawler/data/raw") -> Dict[str, Any]:
-        """JSON 파일들을 읽어서 Supabase에 업로드"""
-        # 언론사 정보 로드
-        self.load_media_outlets()
+    def upload_from_json_files(self, data_dir: str = "../crawler/data/raw", force: bool = False,
+                               journal: Optional[UploadJournal] = None) -> Dict[str, Any]:
+        """
+        JSON 파일들을 읽어서 Supabase에 업로드
+        업로드 저널을 참고해 바뀌지 않은 파일은 건너뛰고, 새로 추가된 기사만 업로드
+        force=True이면 저널을 초기화하고 전체 파일을 다시 동기화
+        """
+        journal = journal or UploadJournal()
+        if force:
+            print("🔁 강제 재동기화: 업로드 저널을 초기화합니다")
+            journal.reset()
         
         # JSON 파일 목록 가져오기
         data_path = Path(data_dir)
-        json_files = list(data_path.glob("*.json"))
+        json_files = sorted(data_path.glob("*.json"))
         
         if not json_files:
             print(f"❌ JSON 파일을 찾을 수 없습니다: {data_dir}")
@@ -198,6 +269,7 @@ class SupabaseUploader:
         
         total_results = {
             'files_processed': 0,
+            'files_unchanged': 0,
             'total_articles': 0,
             'uploaded_articles': 0,
             'failed_articles': 0,
@@ -205,27 +277,54 @@ class SupabaseUploader:
             'results_by_source': {}
         }
         
-        # 각 JSON 파일 처리
+        # 변경된 파일만 처리 대상
+        changed_files = []
         for json_file in json_files:
+            if journal.is_up_to_date(json_file):
+                total_results['files_unchanged'] += 1
+            else:
+                changed_files.append(json_file)
+        print(f"🗂️ 변경 없는 파일 {total_results['files_unchanged']}개 건너뜀, 처리할 파일 {len(changed_files)}개")
+        if not changed_files:
+            journal.save()
+            return total_results
+        
+        # 언론사 정보 로드
+        self.load_media_outlets()
+        
+        # 각 JSON 파일 처리
+        for json_file in changed_files:
             print(f"\n🔄 처리 중: {json_file.name}")
             
-            # JSON 데이터 로드
-            articles = self.load_json_file(str(json_file))
+            # JSON 데이터 로드 (저널에는 여기서 읽은 바이트의 해시를 기록해서 업로드 중 덧붙은 기사는 다음 실행에 반영)
+            snapshot = journal.snapshot(json_file)
+            articles = self.load_json_file(str(json_file), snapshot['data'])
             if not articles:
                 continue
             
-            # 데이터 변환
-            prepared_articles = self.prepare_article_data(articles)
-            if not prepared_articles:
+            # 이미 업로드 확인된 기사를 먼저 제외하고, 남은 기사만 변환 (본문 압축/해시 계산은 새 기사에만)
+            pending_articles = journal.pending_articles(json_file, articles)
+            print(f"🆕 새로 업로드할 기사: {len(pending_articles)}/{len(articles)}개")
+            prepared_articles = self.prepare_article_data(pending_articles)
+            if pending_articles and not prepared_articles:
                 print(f"⚠️ 변환된 기사가 없습니다: {json_file.name}")
                 continue
             
             # 업로드 실행
-            result = self.upload_articles(prepared_articles)
+            result = self.upload_articles(
+                prepared_articles,
+                on_confirmed=lambda urls, path=json_file: journal.confirm_batch(path, urls)
+            )
+            journal.mark_file(json_file, complete=result['failed'] == 0, snapshot=snapshot)
+            journal.save()
             
-            # 결과 집계
-            source_name = json_file.stem.replace('_20250705', '')  # 파일명에서 언론사명 추출
-            total_results['results_by_source'][source_name] = result
+            # 결과 집계 (파일명 '<언론사>_<YYYYMMDD>.json'에서 언론사명 추출)
+            source_name = re.sub(r'_\d{8}$', '', json_file.stem)
+            source_result = total_results['results_by_source'].setdefault(
+                source_name, {'total': 0, 'uploaded': 0, 'failed': 0, 'skipped': 0}
+            )
+            for key in source_result:
+                source_result[key] += result[key]
             total_results['files_processed'] += 1
             total_results['total_articles'] += result['total']
             total_results['uploaded_articles'] += result['uploaded']
@@ -234,13 +333,49 @@ class SupabaseUploader:
         
         return total_results
     
+    def backfill_article_bodies(self, batch_size: int = 100, page_size: int = 1000) -> int:
+        """
+        articles.content에 인라인으로 남아 있는 본문을 압축해서 article_bodies로 이전
+        article_bodies 행이 없는 기사만 id 순서로 page_size개씩 조회 (PostgREST 최대 행 수에 잘리지 않음)
+        """
+        moved = 0
+        after = None
+        while True:
+            rows = self.storage.select_articles_missing_body(after, page_size)
+            if not rows:
+                break
+            after = str(rows[-1]['id'])
+            body_rows = [{'article_id': row['id'], 'body': compress_body(row['content'])}
+                         for row in rows if row.get('content')]
+            for i in range(0, len(body_rows), batch_size):
+                self.storage.upsert_article_bodies(body_rows[i:i + batch_size])
+            moved += len(body_rows)
+            print(f"   📦 본문 이전 중... {moved}개")
+        print(f"✅ 본문 {moved}개 article_bodies로 이전 완료")
+        return moved
+
+    def backfill_text_hashes(self, batch_size: int = 500) -> int:
+        """text_hash가 없는 기존 기사의 임베딩 입력 텍스트 해시 기록 (본문은 batch 단위로 조회)"""
+        rows = [row for row in fetch_article_rows(self.storage, ['id', 'title', 'text_hash'])
+                if not row.get('text_hash')]
+        print(f"🔑 text_hash 기록 대상: {len(rows)}개 기사")
+        for i in range(0, len(rows), batch_size):
+            batch = rows[i:i + batch_size]
+            bodies = self.storage.select_article_bodies([str(row['id']) for row in batch])
+            self.storage.update_article_text_hashes({
+                str(row['id']): text_key(embedding_text(row['title'], bodies.get(str(row['id']))))
+                for row in batch
+            })
+        print(f"✅ text_hash {len(rows)}개 기록 완료")
+        return len(rows)
+
     def print_summary(self, results: Dict[str, Any]):
         """업로드 결과 요약 출력"""
         print("\n" + "="*50)
         print("📊 업로드 결과 요약")
         print("="*50)
         
-        print(f"처리된 파일: {results['files_processed']}개")
+        print(f"처리된 파일: {results['files_processed']}개 (변경 없음: {results.get('files_unchanged', 0)}개)")
         print(f"총 기사 수: {results['total_articles']}개")
         print(f"업로드 성공: {results['uploaded_articles']}개")
         print(f"업로드 실패: {results['failed_articles']}개")
@@ -254,10 +389,109 @@ class SupabaseUploader:
         for source, result in results['results_by_source'].items():
             print(f"  {source}: {result['uploaded']}/{result['total']}개 업로드")
 
+    def build_issue_row(self, cluster: Dict[str, Any], issue_no: int) -> Dict[str, Any]:
+        """클러스터 하나를 issues 테이블 행으로 변환 (제목 누락 시 summary 앞부분으로 대체)"""
+        title_val = cluster.get('title')
+        summary_val = cluster.get('summary')
+        title = str(title_val) if title_val is not None else ''
+        summary = str(summary_val) if summary_val is not None else ''
+        
+        # title이 None, 빈 문자열, 공백만 있을 경우 summary 앞부분으로 대체
+        if not title or title.strip() == '':
+            # summary에서 첫 번째 문장이나 의미 있는 부분 추출
+            if summary:
+                # 마침표나 느낌표, 물음표로 끝나는 첫 번째 문장 추출
+                sentences = re.split(r'[.!?]', summary)
+                if sentences and sentences[0].strip():
+                    title = sentences[0].strip()[:50]  # 50자로 제한
+                else:
+                    title = summary[:50].strip()  # 50자로 제한
+            else:
+                title = f"{cluster.get('category', '기타')} 관련 이슈"
+        
+        # 제목이 여전히 비어있다면 기본값 설정
+        if not title or title.strip() == '':
+            title = f"{cluster.get('category', '기타')} 관련 이슈 #{issue_no}"
+        
+        row = {
+            'category': cluster.get('category', '기타'),
+            'title': title,
+            'summary': summary,
+            'article_count': cluster.get('article_count', 0),
+            'bias_left': cluster.get('bias_left', 0),
+            'bias_center': cluster.get('bias_center', 0),
+            'bias_right': cluster.get('bias_right', 0),
+        }
+        # 증분 클러스터링 결과는 세대가 바뀌어도 유지되는 이슈 id를 함께 기록
+        # (migrations/003_issue_stable_id.sql 필요)
+        if cluster.get('issue_id'):
+            row['stable_id'] = cluster['issue_id']
+        return row
+
+    def retire_generations(self, keep_generation_ids: List[str]):
+        """keep_generation_ids(현재 세대와 직전 세대)에 속하지 않는 이슈와 이슈-기사 매핑 삭제"""
+        stale_ids = self.storage.select_stale_issue_ids(keep_generation_ids)
+        if stale_ids:
+            self.storage.delete_issues(stale_ids)
+        return len(stale_ids)
+
+    def publish_clusters(self, clusters: List[Dict[str, Any]], chunk_size: int = 500,
+                         retire_old: bool = True) -> Optional[str]:
+        """
+        클러스터 목록을 하나의 세대(generation)로 발행:
+        1. 이슈 id를 미리 생성해 issues / issue_articles를 몇 번의 bulk insert로 업로드
+        2. 모두 성공하면 publish_state의 현재 세대를 한 번에 교체 (API는 이 세대만 조회)
+        3. 현재 세대와 직전 세대를 제외한 이슈 정리
+           (전환 직전에 세대를 읽은 요청이 직전 세대를 계속 조회할 수 있도록 한 발행 동안 유예)
+        실패 시 업로드한 세대를 삭제하고 현재 세대는 그대로 유지
+        """
+        try:
+            previous_generation_id = self.storage.get_current_generation()
+        except Exception as e:
+            # 직전 세대를 모르면 어떤 세대가 아직 조회 중인지 알 수 없으므로 이번에는 정리하지 않음
+            print(f"⚠️ 현재 세대 조회 실패, 이번 발행에서는 이전 세대를 정리하지 않습니다: {e}")
+            previous_generation_id, retire_old = None, False
+        generation_id = str(uuid.uuid4())
+        published_at = datetime.now().isoformat()
+        issue_rows = []
+        mapping_rows = []
+        for issue_no, cluster in enumerate(clusters, start=1):
+            issue_row = self.build_issue_row(cluster, issue_no)
+            issue_row['id'] = str(uuid.uuid4())
+            issue_row['generation_id'] = generation_id
+            issue_rows.append(issue_row)
+            for article_id in dict.fromkeys(cluster.get('article_ids', [])):
+                mapping_rows.append({'issue_id': issue_row['id'], 'article_id': article_id})
+        
+        print(f"📤 세대 {generation_id[:8]} 발행 중: 이슈 {len(issue_rows)}개, 매핑 {len(mapping_rows)}개")
+        try:
+            for i in range(0, len(issue_rows), chunk_size):
+                self.storage.insert_issues(issue_rows[i:i + chunk_size])
+            for i in range(0, len(mapping_rows), chunk_size):
+                self.storage.insert_issue_articles(mapping_rows[i:i + chunk_size])
+            # 현재 세대 교체 (단일 행 upsert라 원자적으로 전환됨)
+            self.storage.set_current_generation(generation_id, published_at)
+        except Exception as e:
+            print(f"❌ 세대 발행 실패, 업로드된 부분 정리 중: {e}")
+            try:
+                self.storage.delete_issues([row['id'] for row in issue_rows])
+            except Exception as cleanup_error:
+                print(f"⚠️ 부분 발행 정리 실패: {cleanup_error}")
+            return None
+        
+        print(f"✅ 이슈 {len(issue_rows)}개, 이슈-기사 매핑 {len(mapping_rows)}개 발행 완료! (세대: {generation_id})")
+        if retire_old:
+            try:
+                keep_ids = [generation_id] + ([previous_generation_id] if previous_generation_id else [])
+                retired = self.retire_generations(keep_ids)
+                if retired:
+                    print(f"🧹 이전 세대 이슈 {retired}개 정리 완료")
+            except Exception as e:
+                print(f"⚠️ 이전 세대 정리 실패(다음 발행 시 재시도): {e}")
+        return generation_id
+
     def upload_clusters_from_json(self, json_path: Optional[str] = None):
-        """클러스터 결과 JSON을 읽어 issues, issue_articles 테이블에 업로드"""
-        import json
-        from pathlib import Path
+        """클러스터 결과 JSON을 읽어 issues, issue_articles 테이블에 하나의 세대로 발행"""
         if json_path is None:
             # backend/results/에서 가장 최근 *_final.json 사용
             result_dir = Path(__file__).parent / 'results'
@@ -273,65 +507,7 @@ class SupabaseUploader:
         if not clusters:
             print('❌ 클러스터 데이터가 비어 있습니다.')
             return
-        # 업로드 시작
-        self.load_media_outlets()  # 혹시 필요할 수 있으니 호출
-        issues_uploaded = 0
-        issue_articles_uploaded = 0
-        for cluster in clusters:
-            # issues 테이블에 저장
-            title_val = cluster.get('title')
-            summary_val = cluster.get('summary')
-            title = str(title_val) if title_val is not None else ''
-            summary = str(summary_val) if summary_val is not None else ''
-            
-            # title이 None, 빈 문자열, 공백만 있을 경우 summary 앞부분으로 대체
-            if not title or title.strip() == '':
-                # summary에서 첫 번째 문장이나 의미 있는 부분 추출
-                if summary:
-                    # 마침표나 느낌표, 물음표로 끝나는 첫 번째 문장 추출
-                    import re
-                    sentences = re.split(r'[.!?]', summary)
-                    if sentences and sentences[0].strip():
-                        title = sentences[0].strip()[:50]  # 50자로 제한
-                    else:
-                        title = summary[:50].strip()  # 50자로 제한
-                else:
-                    title = f"{cluster.get('category', '기타')} 관련 이슈"
-            
-            # 제목이 여전히 비어있다면 기본값 설정
-            if not title or title.strip() == '':
-                title = f"{cluster.get('category', '기타')} 관련 이슈 #{issues_uploaded + 1}"
-            
-            issue_insert = {
-                'category': cluster.get('category', '기타'),
-                'title': title,
-                'summary': summary,
-                'article_count': cluster.get('article_count', 0),
-                'bias_left': cluster.get('bias_left', 0),
-                'bias_center': cluster.get('bias_center', 0),
-                'bias_right': cluster.get('bias_right', 0),
-            }
-            try:
-                issue_resp = self.supabase.table('issues').insert(issue_insert).execute()
-                if not issue_resp.data or not issue_resp.data[0].get('id'):
-                    print(f"❌ 이슈 업로드 실패: {issue_insert}")
-                    continue
-                issue_id = issue_resp.data[0]['id']
-                issues_uploaded += 1
-                print(f"✅ 이슈 업로드 완료: {title[:30]}...")
-            except Exception as e:
-                print(f"❌ 이슈 업로드 실패: {e}")
-                continue
-            # issue_articles 테이블에 저장
-            for article_id in cluster.get('article_ids', []):
-                try:
-                    ia_insert = {'issue_id': issue_id, 'article_id': article_id}
-                    self.supabase.table('issue_articles').insert(ia_insert).execute()
-                    issue_articles_uploaded += 1
-                except Exception as e:
-                    print(f"❌ issue_articles 업로드 실패: {e}")
-                    continue
-        print(f"\n✅ 이슈 {issues_uploaded}개, 이슈-기사 매핑 {issue_articles_uploaded}개 업로드 완료!")
+        return self.publish_clusters(clusters)
 
 
 def main():
@@ -343,16 +519,30 @@ def main():
         print()
         uploader = SupabaseUploader()
         
+        # --resync: 업로드 저널을 무시하고 전체 크롤링 데이터 재동기화
+        force_resync = '--resync' in sys.argv[1:]
+        positional_args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+        
+        # --backfill-bodies: 기존 기사 본문을 article_bodies로 이전
+        if '--backfill-bodies' in sys.argv[1:]:
+            uploader.backfill_article_bodies()
+            return True
+
+        # --backfill-text-hashes: 기존 기사의 임베딩 입력 텍스트 해시 기록
+        if '--backfill-text-hashes' in sys.argv[1:]:
+            uploader.backfill_text_hashes()
+            return True
+        
         # 명시적으로 클러스터 JSON 파일이 지정된 경우
-        if len(sys.argv) > 1:
-            cluster_json_path = sys.argv[1]
+        if positional_args:
+            cluster_json_path = positional_args[0]
             print(f"\n🧠 지정된 클러스터(이슈) 결과를 DB에 업로드합니다: {cluster_json_path}")
             uploader.upload_clusters_from_json(cluster_json_path)
             return True
         
         # 크롤링 데이터 업로드 (실패해도 계속 진행)
         try:
-            results = uploader.upload_from_json_files()
+            results = uploader.upload_from_json_files(force=force_resync)
             uploader.print_summary(results)
         except Exception as e:
             print(f"⚠️ 크롤링 데이터 업로드 실패(무시): {e}")
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# backend/의 모듈은 패키지가 아니라 평면 모듈로 import함 (python main_cluster.py와 같은 방식)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
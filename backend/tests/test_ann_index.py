@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('hnswlib')
+
+from ann_index import ANNIndex
+from neighbor_graph import radius_neighbor_graph
+
+
+def clustered_vectors(n, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(n, dim))
+    vectors[:, 0] += 6
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def test_radius_graph_matches_exact_graph_inside_a_larger_index(tmp_path):
+    # 같은 영역에 다른 카테고리 기사가 훨씬 많아도 keys 안의 반경 이웃을 모두 찾아야 함
+    vectors = clustered_vectors(1200)
+    keys = [f'k{i}' for i in range(len(vectors))]
+    index = ANNIndex('test', vectors.shape[1], index_dir=tmp_path)
+    index.add(keys, vectors)
+    graph = index.radius_graph(keys[:150], vectors[:150], 0.2, k=8)
+    exact = radius_neighbor_graph(vectors[:150], 0.2)
+    graph.sort_indices()
+    exact.sort_indices()
+    assert np.array_equal(graph.indptr, exact.indptr)
+    assert np.array_equal(graph.indices, exact.indices)
+    assert np.allclose(graph.data, exact.data, atol=1e-5)
+
+
+def test_radius_graph_links_duplicate_keys(tmp_path):
+    vectors = clustered_vectors(3)
+    index = ANNIndex('test', vectors.shape[1], index_dir=tmp_path)
+    index.add(['a', 'b', 'c'], vectors)
+    graph = index.radius_graph(['a', 'a'], vectors[[0, 0]], 0.1)
+    # 대각선 0을 명시 저장하므로 2x2 전체가 채워짐
+    assert graph.nnz == 4
@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from article_fetch import _parse_time, fetch_article_rows, window_bounds
+from storage import SQLiteStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SQLiteStorage(tmp_path / 'articles.db')
+    base = datetime(2024, 1, 1)
+    # 같은 published_at이 여러 개 겹쳐야 (published_at, id) 커서의 id 비교까지 검증됨
+    rows = [{'title': f't{i}', 'url': f'https://example.com/{i}', 'category': '정치',
+             'published_at': (base + timedelta(minutes=i // 4)).isoformat()} for i in range(57)]
+    rows += [{'title': f'n{i}', 'url': f'https://example.com/n{i}', 'category': '정치', 'published_at': None}
+             for i in range(3)]
+    storage.upsert_articles(rows)
+    yield storage
+    storage.conn.close()
+
+
+class ClampedStorage:
+    """PostgREST max-rows처럼 요청한 limit보다 적게 돌려주는 저장소"""
+
+    def __init__(self, storage, max_rows):
+        self.storage = storage
+        self.max_rows = max_rows
+
+    def select_articles_page(self, columns, since=None, until=None, after=None, limit=1000):
+        return self.storage.select_articles_page(columns, since=since, until=until, after=after,
+                                                 limit=min(limit, self.max_rows))
+
+    def count_articles(self, published_at_missing=False):
+        return self.storage.count_articles(published_at_missing)
+
+
+@pytest.mark.parametrize('page_size,parts', [(1, 1), (3, 1), (5, 4), (1000, 3)])
+def test_keyset_pagination_returns_every_row_once(storage, page_size, parts):
+    rows = fetch_article_rows(storage, ['id', 'published_at'], page_size=page_size, max_workers=parts,
+                              until='2024-01-02T00:00:00')
+    ids = [row['id'] for row in rows]
+    assert len(ids) == len(set(ids)) == 57
+
+
+def test_short_server_pages_do_not_stop_pagination(storage):
+    rows = fetch_article_rows(ClampedStorage(storage, 4), ['id'], page_size=10, max_workers=2,
+                              until='2024-01-02T00:00:00')
+    assert len({row['id'] for row in rows}) == 57
+
+
+def test_missing_published_at_is_counted_and_logged(storage, capsys):
+    assert storage.count_articles() == 60
+    assert storage.count_articles(published_at_missing=True) == 3
+    fetch_article_rows(storage, ['id'], page_size=10, until='2024-01-02T00:00:00')
+    assert 'published_at이 없는 기사 3개' in capsys.readouterr().out
+
+
+def test_window_bounds_and_parse_time_use_utc():
+    now = datetime(2024, 1, 2, 9, 0, tzinfo=timezone(timedelta(hours=9)))
+    assert _parse_time(window_bounds(24, now)) == datetime(2024, 1, 1, 0, 0)
+    assert _parse_time('2024-01-01T00:00:00Z') == datetime(2024, 1, 1, 0, 0)
+    assert _parse_time('2024-01-01T00:00:00') == datetime(2024, 1, 1, 0, 0)
+    assert window_bounds(None) is None
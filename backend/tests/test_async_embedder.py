@@ -0,0 +1,91 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+import async_embedder
+from async_embedder import AsyncEmbedder, pack_batches, parse_reset_duration
+
+
+def test_pack_batches_respects_token_limit():
+    counts = [30, 40, 50, 20, 90, 10]
+    batches = pack_batches(counts, max_tokens=100, max_items=10)
+    assert [i for batch in batches for i in batch] == list(range(len(counts)))
+    assert all(sum(counts[i] for i in batch) <= 100 for batch in batches)
+    assert batches == [[0, 1], [2, 3], [4, 5]]
+
+
+def test_pack_batches_respects_item_limit():
+    batches = pack_batches([1] * 10, max_tokens=1000, max_items=4)
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+
+
+def test_pack_batches_oversized_item_gets_own_batch():
+    assert pack_batches([10, 500, 10], max_tokens=100) == [[0], [1], [2]]
+
+
+def test_parse_reset_duration():
+    assert parse_reset_duration('6m0s') == 360.0
+    assert parse_reset_duration('20ms') == pytest.approx(0.02)
+    assert parse_reset_duration(None) == 0.0
+
+
+class FakeError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f'status {status_code}')
+        self.status_code = status_code
+
+
+class FakeClient:
+    async def close(self):
+        pass
+
+
+def run_embed(monkeypatch, texts, fail, sleeps=None):
+    """fail(texts, call 번호) → 예외 또는 None, 요청별 입력 목록(과 sleeps에 대기 시간)을 기록"""
+    calls = []
+
+    async def request(self, client, governor, batch_texts, tokens):
+        calls.append(list(batch_texts))
+        error = fail(batch_texts, len(calls))
+        if error:
+            raise error
+        return np.ones((len(batch_texts), self.dim), dtype=np.float32)
+
+    async def no_sleep(seconds):
+        if sleeps is not None:
+            sleeps.append(seconds)
+
+    monkeypatch.setattr(async_embedder, 'AsyncOpenAI', lambda api_key: FakeClient())
+    monkeypatch.setattr(AsyncEmbedder, '_request', request)
+    monkeypatch.setattr(async_embedder.asyncio, 'sleep', no_sleep)
+    embedder = AsyncEmbedder('key', dim=4, max_retries=3)
+    monkeypatch.setattr(embedder, 'count_tokens', lambda batch: [1] * len(batch))
+    _, ok = asyncio.run(embedder.embed(texts))
+    return ok, calls
+
+
+def test_rate_limit_retries_whole_batch(monkeypatch):
+    texts = [f't{i}' for i in range(8)]
+    ok, calls = run_embed(monkeypatch, texts, lambda batch, n: FakeError(429) if n <= 2 else None)
+    assert ok.all()
+    # 항목별로 흩어지지 않고 같은 batch를 다시 보냄
+    assert calls == [texts] * 3
+
+
+def test_rate_limit_gives_up_without_splitting(monkeypatch):
+    texts = [f't{i}' for i in range(8)]
+    sleeps = []
+    ok, calls = run_embed(monkeypatch, texts, lambda batch, n: FakeError(429), sleeps)
+    assert not ok.any()
+    assert len(calls) == 3 and all(len(batch) == 8 for batch in calls)
+    # 마지막 시도 뒤에는 기다리지 않음
+    assert sleeps == [1, 2]
+
+
+def test_input_error_isolates_bad_item(monkeypatch):
+    texts = [f't{i}' for i in range(8)]
+    ok, calls = run_embed(monkeypatch, texts, lambda batch, n: FakeError(400) if 't5' in batch else None)
+    assert ok.tolist() == [i != 5 for i in range(8)]
+    # 절반씩 나눠 보내므로 요청 수는 항목 수보다 훨씬 적음
+    assert len(calls) < 1 + 2 * 3 + 1
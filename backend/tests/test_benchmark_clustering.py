@@ -0,0 +1,32 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmark_clustering import agreement, format_table, load_saved_labels
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def test_import_does_not_need_api_key_or_storage():
+    env = {key: value for key, value in os.environ.items() if key != 'OPENAI_API_KEY'}
+    code = "import sys, benchmark_clustering; assert 'main_cluster' not in sys.modules"
+    subprocess.run([sys.executable, '-c', code], cwd=BACKEND_DIR, env=env, check=True)
+
+
+def test_load_saved_labels_accepts_stringified_ids(tmp_path):
+    path = tmp_path / 'result_final.json'
+    path.write_text(json.dumps({'clusters': [{'article_ids': ['a', 'b']}, {'article_ids': "['c']"}]}),
+                    encoding='utf-8')
+    assert load_saved_labels(path) == {'a': 0, 'b': 0, 'c': 1}
+
+
+def test_agreement_and_table():
+    assert agreement([], []) == (None, None)
+    ari, nmi = agreement([0, 0, 1, -1], [1, 1, 0, -1])
+    assert ari == 1.0 and nmi == 1.0
+    row = {'category': '정치', 'engine': 'dbscan', 'n_clusters': 2, 'n_noise': 1, 'n_total': 4, 'seconds': 0.5,
+           'peak_mb': 1.0, 'ari_dbscan': 1.0, 'nmi_dbscan': 1.0, 'n_saved_overlap': 0, 'ari_saved': None,
+           'nmi_saved': None}
+    assert '| 정치 | dbscan | 2 | 1 | 4 |' in format_table([row])
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from cluster_metrics import evaluate_clustering, sampled_silhouette
+
+
+def skewed_clusters(n=3000, small_at=0, seed=0):
+    """큰 클러스터 하나 + 2개짜리 작은 클러스터 (작은 클러스터 위치를 small_at으로 바꿈)"""
+    rng = np.random.default_rng(seed)
+    embeddings = rng.normal(size=(n, 16)).astype(np.float32)
+    embeddings[:, 0] += 10
+    labels = np.zeros(n, dtype=np.int64)
+    small = [small_at, (small_at + 1) % n]
+    labels[small] = 1
+    embeddings[small, 1] += 10
+    return embeddings, labels
+
+
+@pytest.mark.parametrize('small_at', range(0, 3000, 100))
+def test_sampled_silhouette_skewed_clusters(small_at):
+    embeddings, labels = skewed_clusters(small_at=small_at)
+    score = sampled_silhouette(embeddings, labels, sample_size=500)
+    assert score is not None and -1.0 <= score <= 1.0
+
+
+def test_sampled_silhouette_needs_two_clusters():
+    embeddings, labels = skewed_clusters(n=100)
+    labels[labels == 1] = -1
+    assert sampled_silhouette(embeddings, labels) is None
+
+
+def test_sampled_silhouette_too_many_labels_returns_none():
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(1000, 8))
+    labels = np.arange(1000)
+    assert sampled_silhouette(embeddings, labels, sample_size=500) is None
+
+
+def test_evaluate_clustering_counts():
+    embeddings, labels = skewed_clusters(n=200)
+    labels[:10] = -1
+    metrics = evaluate_clustering(embeddings, labels, ['left'] * 200)
+    assert metrics['n_noise'] == 10 and metrics['n_total'] == 200
+    assert metrics['n_clusters'] == len(set(labels.tolist()) - {-1})
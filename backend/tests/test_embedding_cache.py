@@ -0,0 +1,61 @@
+import numpy as np
+
+from embedding_cache import EmbeddingCache
+
+
+def filled_cache(path, keys):
+    cache = EmbeddingCache('test-model', cache_dir=path)
+    for i, key in enumerate(keys):
+        cache.put(key, np.full(4, i, dtype=np.float32))
+    cache.save()
+    return cache
+
+
+def test_save_and_lookup_rows(tmp_path):
+    filled_cache(tmp_path, ['a', 'b', 'c'])
+    cache = EmbeddingCache('test-model', cache_dir=tmp_path)
+    assert cache.lookup_rows(['c', 'x', 'a']).tolist() == [2, -1, 0]
+    assert cache.get('b').tolist() == [1, 1, 1, 1]
+
+
+def test_evict_keeps_replaced_matrix_for_readers_until_next_evict(tmp_path):
+    writer = filled_cache(tmp_path, ['a', 'b', 'c'])
+    stale_index = writer._read_index()
+    writer.evict(['a', 'b'])
+    # evict 직전에 인덱스를 읽은 프로세스도 이전 행렬을 열 수 있음
+    assert (tmp_path / stale_index['matrix']).exists()
+    writer.evict(['a'])
+    assert not (tmp_path / stale_index['matrix']).exists()
+    assert writer.get('a').tolist() == [0, 0, 0, 0]
+
+
+def test_load_rereads_index_when_matrix_was_replaced(tmp_path, monkeypatch):
+    writer = filled_cache(tmp_path, ['a', 'b', 'c'])
+    stale_index = writer._read_index()
+    writer.evict(['a', 'b'])
+    writer.evict(['b'])
+    reader = EmbeddingCache('test-model', cache_dir=tmp_path)
+    reads = iter([stale_index])
+    real_read = reader._read_index
+    monkeypatch.setattr(reader, '_read_index', lambda: next(reads, None) or real_read())
+    reader.load()
+    assert reader.keys == ['b']
+    assert reader.get('b').tolist() == [1, 1, 1, 1]
+
+
+def test_search_uses_quantized_copy_and_evict_removes_it(tmp_path):
+    cache = EmbeddingCache('test-model', cache_dir=tmp_path)
+    for key, vector in {'x': [1, 0, 0, 0], 'y': [0, 1, 0, 0], 'xy': [1, 0.2, 0, 0]}.items():
+        cache.put(key, np.asarray(vector, dtype=np.float32))
+    cache.save()
+    assert cache.codes is not None and cache.codes.shape == (3, 4)
+    keys, distances = cache.search(np.asarray([[1, 0.1, 0, 0]], dtype=np.float32), k=2)
+    assert sorted(keys[0]) == ['x', 'xy']
+    keys, _ = cache.search(np.asarray([[1, 0, 0, 0]], dtype=np.float32), k=1, among=['y', 'missing'])
+    assert keys == [['y']]
+
+    stale = cache._quantized_paths(cache.matrix_name)
+    cache.evict(['x', 'y'])
+    cache.evict(['x'])
+    assert not any(path.exists() for path in stale)
+    assert cache.codes.shape == (1, 4)
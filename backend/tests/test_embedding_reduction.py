@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from embedding_reduction import EmbeddingReducer, create_reducer, parse_reduction
+
+
+@pytest.mark.parametrize('spec, expected', [
+    (None, None),
+    ('', None),
+    ('none', None),
+    ('pca:256', ('pca', 256)),
+    ('api:512', ('api', 512)),
+    ('random:2', ('random', 2)),
+])
+def test_parse_reduction(spec, expected):
+    assert parse_reduction(spec) == expected
+
+
+@pytest.mark.parametrize('spec', ['pca', 'pca:', 'pca:1', 'pca:abc', 'svd:256', 'pca:-3'])
+def test_parse_reduction_rejects_bad_specs(spec):
+    with pytest.raises(ValueError):
+        parse_reduction(spec)
+
+
+def test_create_reducer_api_passes_dimensions():
+    reducer = create_reducer('api:256')
+    assert reducer.api_dimensions == 256 and reducer.fitted
+
+
+def test_pca_basis_is_frozen_until_refit(tmp_path):
+    rng = np.random.default_rng(0)
+    reducer = EmbeddingReducer('pca', 8, state_dir=str(tmp_path))
+    assert reducer.update(rng.normal(size=(50, 32)).astype(np.float32))
+    version, components = reducer.version, reducer.pca.components_.copy()
+    # 재학습 주기 전에는 새 벡터를 모아 두기만 하고 기준과 version은 그대로
+    fresh = np.zeros(50, dtype=bool)
+    fresh[:5] = True
+    assert not reducer.update(rng.normal(size=(50, 32)).astype(np.float32), fresh)
+    assert not reducer.update(rng.normal(size=(50, 32)).astype(np.float32), fresh)
+    assert reducer.version == version
+    np.testing.assert_array_equal(reducer.pca.components_, components)
+    assert len(np.load(reducer.pending_path)) == 10
+    # 저장된 상태를 다시 읽어도 같은 version, 재학습하면 모아 둔 벡터까지 학습하고 revision 증가
+    reloaded = EmbeddingReducer('pca', 8, state_dir=str(tmp_path))
+    assert reloaded.version == version
+    seen = int(reloaded.pca.n_samples_seen_)
+    assert reloaded.update(rng.normal(size=(50, 32)).astype(np.float32), fresh, refit=True)
+    assert int(reloaded.pca.n_samples_seen_) == seen + 15
+    assert reloaded.version != version
+    assert not reloaded.pending_path.exists()
+
+
+def test_second_run_with_new_rows_reuses_saved_ann_index(tmp_path):
+    pytest.importorskip('hnswlib')
+    from ann_index import ANNIndex
+
+    rng = np.random.default_rng(2)
+    first = rng.normal(size=(40, 32)).astype(np.float32)
+    reducer = EmbeddingReducer('pca', 8, state_dir=str(tmp_path))
+    reducer.update(first)
+    index = ANNIndex(f'test.{reducer.tag}', 8, index_dir=tmp_path, version=reducer.version)
+    index.add([f'k{i}' for i in range(40)], reducer.transform(first))
+    index.save()
+
+    # 다음 실행: 새 기사 10개가 추가되어도 기준이 그대로라 저장된 인덱스를 다시 씀
+    second = np.concatenate([first, rng.normal(size=(10, 32)).astype(np.float32)])
+    fresh = np.arange(50) >= 40
+    reducer = EmbeddingReducer('pca', 8, state_dir=str(tmp_path))
+    assert not reducer.update(second, fresh)
+    index = ANNIndex(f'test.{reducer.tag}', 8, index_dir=tmp_path, version=reducer.version)
+    assert len(index) == 40
+
+
+def test_random_projection_is_normalized_and_deterministic():
+    vectors = np.random.default_rng(1).normal(size=(10, 64)).astype(np.float32)
+    a = EmbeddingReducer('random', 16).transform(vectors)
+    b = EmbeddingReducer('random', 16).transform(vectors)
+    assert a.shape == (10, 16)
+    np.testing.assert_allclose(np.linalg.norm(a, axis=1), 1.0, rtol=1e-5)
+    np.testing.assert_array_equal(a, b)
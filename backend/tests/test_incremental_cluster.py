@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from embedding_cache import EmbeddingCache
+from incremental_cluster import ClusterState, update_category
+
+
+def unit(*values):
+    vector = np.zeros(8, dtype=np.float32)
+    vector[:len(values)] = values
+    return vector / np.linalg.norm(vector)
+
+
+def test_new_articles_are_assigned_by_stored_centroid(tmp_path):
+    state = ClusterState(tmp_path)
+    issue_id = state.new_issue('정치')
+    state.issues[issue_id]['article_ids'] = ['a']
+    # 저장된 중심은 x축, 남아 있는 멤버 a는 중심에서 떨어져 있음
+    state.centroids[issue_id] = unit(1)
+    vectors = np.stack([unit(1, 1.2), unit(1, -0.1)])
+    members = update_category(state, '정치', ['a', 'b'], vectors, eps=0.05, min_samples=2)
+    assert members == {issue_id: [0, 1]}
+
+
+def test_old_noise_is_not_reclustered(tmp_path):
+    state = ClusterState(tmp_path)
+    old = (datetime.now() - timedelta(hours=100)).isoformat()
+    state.noise['정치'] = {'a': old, 'b': old}
+    vectors = np.stack([unit(1), unit(1, 0.01), unit(0, 1)])
+    members = update_category(state, '정치', ['a', 'b', 'c'], vectors, eps=0.1, min_samples=2)
+    assert members == {}
+    assert state.noise['정치']['a'] == old
+    assert set(state.noise['정치']) == {'a', 'b', 'c'}
+
+    members = update_category(state, '정치', ['a', 'b', 'c'], vectors, eps=0.1, min_samples=2,
+                              noise_max_age_hours=None)
+    assert sorted(members.values()) == [[0, 1]]
+    assert set(state.noise['정치']) == {'c'}
+
+
+def test_noise_survives_save_and_load(tmp_path):
+    state = ClusterState(tmp_path)
+    update_category(state, '정치', ['a'], np.stack([unit(1)]), eps=0.1, min_samples=2)
+    state.save()
+    assert set(ClusterState(tmp_path).noise['정치']) == {'a'}
+
+
+def test_centroid_does_not_drift_when_members_leave_window(tmp_path):
+    state = ClusterState(tmp_path)
+    update_category(state, '정치', ['a', 'b', 'c'], np.stack([unit(1), unit(1, 0.1), unit(1, -0.1)]),
+                    eps=0.1, min_samples=2)
+    [issue_id] = state.category_issue_ids('정치')
+    before = state.centroids[issue_id].copy()
+    assert state.issues[issue_id]['n_members'] == 3
+
+    # a, b가 조회 구간 밖으로 빠져도 중심은 그대로, 새 기사 d만큼만 가중 평균으로 이동
+    members = update_category(state, '정치', ['c', 'd'], np.stack([unit(1, -0.1), unit(1, 0.2)]),
+                              eps=0.1, min_samples=2)
+    assert members == {issue_id: [0, 1]}
+    assert state.issues[issue_id]['n_members'] == 4
+    expected = before * 3 + unit(1, 0.2)
+    np.testing.assert_allclose(state.centroids[issue_id], expected / np.linalg.norm(expected), atol=1e-6)
+
+
+def test_issue_without_members_stays_alive_while_recent(tmp_path):
+    state = ClusterState(tmp_path)
+    update_category(state, '정치', ['a', 'b'], np.stack([unit(1), unit(1, 0.1)]), eps=0.1, min_samples=2)
+    [issue_id] = state.category_issue_ids('정치')
+
+    # 멤버가 모두 빠진 실행: 반환값에는 없지만 이슈는 유지
+    assert update_category(state, '정치', ['x'], np.stack([unit(0, 1)]), eps=0.1, min_samples=2) == {}
+    assert issue_id in state.issues
+    members = update_category(state, '정치', ['c'], np.stack([unit(1, 0.05)]), eps=0.1, min_samples=2)
+    assert members == {issue_id: [0]}
+
+    # 마지막 기사 추가 후 issue_max_age_hours가 지나면 삭제
+    state.issues[issue_id]['updated_at'] = (datetime.now() - timedelta(hours=100)).isoformat()
+    update_category(state, '정치', ['y'], np.stack([unit(0, 1)]), eps=0.1, min_samples=2)
+    assert issue_id not in state.issues
+
+
+def test_far_article_is_assigned_through_cached_member_history(tmp_path):
+    history = EmbeddingCache('test-model', cache_dir=tmp_path / 'cache')
+    vectors = {'ka': unit(1), 'ko': unit(1, 1.5), 'kn': unit(1, 1.6), 'kd': unit(0, 1)}
+    for key, vector in vectors.items():
+        history.put(key, vector)
+    history.save()
+    state = ClusterState(tmp_path / 'state')
+    issue_id = state.new_issue('정치')
+    state.issues[issue_id].update(article_ids=['a'], n_members=5, member_keys=['ka', 'ko'])
+    state.centroids[issue_id] = unit(1)
+    # kn은 중심에서 멀지만 구간 밖으로 빠진 멤버 ko의 이웃이라 배정, kd는 어느 멤버와도 멀어 noise
+    members = update_category(state, '정치', ['a', 'n', 'd'], np.stack([vectors['ka'], vectors['kn'], vectors['kd']]),
+                              eps=0.1, min_samples=2, keys=['ka', 'kn', 'kd'], history=history)
+    assert members == {issue_id: [0, 1]}
+    assert state.issues[issue_id]['member_keys'] == ['ka', 'ko', 'kn']
+    assert state.issues[issue_id]['n_members'] == 6
+    assert set(state.noise['정치']) == {'d'}
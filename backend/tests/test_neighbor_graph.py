@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from neighbor_graph import knee_eps, knn_distances, radius_neighbor_graph
+
+
+def test_knee_eps_finds_the_elbow():
+    # 대부분 0.2 근처에서 천천히 오르다 끝에서 급격히 커지는 k-거리 곡선
+    distances = np.concatenate([np.linspace(0.1, 0.25, 90), np.linspace(0.5, 0.9, 10)])
+    np.random.default_rng(0).shuffle(distances)
+    assert knee_eps(distances) == pytest.approx(0.25)
+
+
+@pytest.mark.parametrize('distances,expected', [
+    ([], 0.4),                       # 점이 없으면 구간 중앙
+    ([0.3, 0.3], 0.3),               # 점이 너무 적으면 중앙값
+    ([0.05] * 10, 0.1),              # 평평한 곡선 → min_eps로 제한
+    ([0.8, 0.85, 0.9, 0.95], 0.7),  # knee가 max_eps보다 크면 max_eps
+])
+def test_knee_eps_fallbacks_and_clipping(distances, expected):
+    assert knee_eps(np.asarray(distances)) == pytest.approx(expected)
+
+
+def test_knn_distances_match_brute_force():
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(50, 8)).astype(np.float32)
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    brute = np.sort(np.maximum(1.0 - unit @ unit.T, 0.0), axis=1)[:, :4]
+    brute[:, 0] = 0.0
+    # 블록을 여러 번 나눠도 같은 결과
+    assert np.allclose(knn_distances(vectors, 4, max_block_bytes=50 * 4 * 7), brute, atol=1e-5)
+
+
+def test_radius_neighbor_graph_is_symmetric_with_explicit_diagonal():
+    vectors = np.array([[1, 0], [1, 0.1], [0, 1]], dtype=np.float32)
+    graph = radius_neighbor_graph(vectors, 0.05).toarray()
+    assert np.allclose(graph, graph.T)
+    assert radius_neighbor_graph(vectors, 0.05).nnz == 5
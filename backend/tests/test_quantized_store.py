@@ -0,0 +1,26 @@
+import numpy as np
+
+from embedding_store import normalize_rows
+from quantized_store import dequantize_rows, quantize_rows, search_quantized
+
+
+def test_quantize_round_trip_error_is_within_half_step():
+    vectors = normalize_rows(np.random.default_rng(0).normal(size=(50, 32)).astype(np.float32))
+    codes, scales = quantize_rows(vectors)
+    assert codes.dtype == np.int8 and scales.dtype == np.float32
+    error = np.abs(dequantize_rows(codes, scales) - vectors)
+    assert (error <= scales[:, None] / 2 + 1e-6).all()
+
+
+def test_search_reranks_with_full_vectors_and_respects_subset():
+    vectors = normalize_rows(np.random.default_rng(1).normal(size=(500, 32)).astype(np.float32))
+    codes, scales = quantize_rows(vectors)
+    queries = vectors[:5] + 0.01
+    rows, distances = search_quantized(codes, scales, vectors, queries, k=3)
+    exact = np.argsort(-(normalize_rows(queries) @ vectors.T), axis=1)[:, :3]
+    assert rows.tolist() == exact.tolist()
+    assert (np.diff(distances, axis=1) >= 0).all()
+
+    subset = np.arange(100, 500)
+    rows, _ = search_quantized(codes, scales, vectors, queries, k=3, subset=subset)
+    assert (rows >= 100).all()
@@ -0,0 +1,26 @@
+import pytest
+
+from storage import SQLiteStorage, Storage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SQLiteStorage(tmp_path / 'stats.db')
+    yield storage
+    storage.conn.close()
+
+
+def test_storage_interface_is_abstract():
+    with pytest.raises(TypeError):
+        Storage()
+
+
+def test_count_articles_by_media_outlet(storage):
+    outlets = storage.select_media_outlets(['id', 'name'])
+    first, second = outlets[0]['id'], outlets[1]['id']
+    rows = [{'title': f't{i}', 'url': f'https://example.com/{i}', 'media_outlet_id': first} for i in range(3)]
+    rows += [{'title': 's', 'url': 'https://example.com/s', 'media_outlet_id': second},
+             {'title': 'u', 'url': 'https://example.com/u', 'media_outlet_id': None}]
+    storage.upsert_articles(rows)
+    assert storage.count_articles_by_media_outlet() == {first: 3, second: 1, None: 1}
+    assert storage.count_articles() == 5
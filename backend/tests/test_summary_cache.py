@@ -0,0 +1,40 @@
+from summary_cache import SummaryCache, reuse_plan
+
+
+def test_closest_exact_and_overlap(tmp_path):
+    cache = SummaryCache('v1', tmp_path / 'summary.json')
+    cache.put(['a', 'b', 'c', 'd'], '제목', '요약')
+    exact = cache.closest(['d', 'c', 'b', 'a'])
+    assert (exact['match'], exact['similarity'], exact['new_ids']) == ('exact', 1.0, [])
+    overlap = cache.closest(['a', 'b', 'c', 'd', 'e'])
+    assert overlap['match'] == 'overlap'
+    assert overlap['similarity'] == 0.8
+    assert overlap['new_ids'] == ['e']
+    assert cache.closest(['x']) is None
+
+
+def test_prompt_version_and_save(tmp_path):
+    path = tmp_path / 'summary.json'
+    cache = SummaryCache('v1', path)
+    cache.put(['a', 'b'], '제목', '요약')
+    cache.save()
+    assert SummaryCache('v1', path).closest(['a', 'b'])['title'] == '제목'
+    assert SummaryCache('v2', path).closest(['a', 'b']) is None
+
+
+def test_reuse_plan_delta_requires_few_added_and_few_removed(tmp_path):
+    cache = SummaryCache('v1', tmp_path / 'summary.json')
+    cache.put([f'a{i}' for i in range(10)], '제목', '요약')
+    kept = [f'a{i}' for i in range(10)]
+    assert reuse_plan(cache.closest(kept)) == 'reuse'
+    assert reuse_plan(cache.closest(['x'])) == 'new'
+    # 10개 중 2개 추가(2/12): 유사도 0.83이라 재사용
+    assert reuse_plan(cache.closest(kept + ['n0', 'n1'])) == 'reuse'
+    # 3개 추가(3/13 ≤ 0.3), 빠진 기사 없음 → 요약 갱신
+    assert reuse_plan(cache.closest(kept + ['n0', 'n1', 'n2'])) == 'delta'
+    # 새 기사 비율은 2/7로 낮지만 기존 10개 중 5개가 빠짐 → 새로 생성
+    entry = cache.closest(kept[5:] + ['n0', 'n1'])
+    assert entry['removed_ids'] == kept[:5]
+    assert reuse_plan(entry) == 'new'
+    # 새 기사 비율이 높으면 새로 생성
+    assert reuse_plan(cache.closest(kept + [f'n{i}' for i in range(6)])) == 'new'
@@ -0,0 +1,181 @@
+import json
+import sqlite3
+import time
+
+import pytest
+
+from storage import SQLiteStorage, compress_body
+from supabase_uploader import SupabaseUploader, is_row_error
+from upload_journal import UploadJournal
+
+
+@pytest.fixture
+def uploader(tmp_path):
+    storage = SQLiteStorage(tmp_path / 'issues.db')
+    yield SupabaseUploader(storage)
+    storage.conn.close()
+
+
+def generations(storage):
+    return {row['generation_id'] for row in storage._query('SELECT generation_id FROM issues')}
+
+
+def publish(uploader, n=2):
+    return uploader.publish_clusters([{'category': '정치', 'title': f'이슈 {i}', 'article_ids': []} for i in range(n)])
+
+
+def test_publish_keeps_previous_generation_for_one_publish(uploader):
+    first = publish(uploader)
+    second = publish(uploader)
+    assert uploader.storage.get_current_generation() == second
+    assert generations(uploader.storage) == {first, second}
+    third = publish(uploader)
+    assert generations(uploader.storage) == {second, third}
+
+
+def test_publish_skips_retirement_when_current_generation_is_unknown(uploader, monkeypatch):
+    first = publish(uploader)
+    second = publish(uploader)
+
+    def fail():
+        raise RuntimeError('publish_state 조회 실패')
+
+    monkeypatch.setattr(uploader.storage, 'get_current_generation', fail)
+    third = publish(uploader)
+    assert generations(uploader.storage) == {first, second, third}
+
+
+def write_articles(path, urls):
+    articles = [{'source': 'hani', 'title': f'제목 {url}', 'url': url, 'content': f'본문 {url}',
+                 'category': '정치', 'crawled_at': '2024-01-01T00:00:00'} for url in urls]
+    path.write_text(json.dumps(articles, ensure_ascii=False), encoding='utf-8')
+
+
+@pytest.fixture
+def crawl_dir(tmp_path, uploader, monkeypatch):
+    data_dir = tmp_path / 'raw'
+    data_dir.mkdir()
+    prepared = []
+    original = uploader.prepare_article_data
+    monkeypatch.setattr(uploader, 'prepare_article_data',
+                        lambda articles: prepared.append([a['url'] for a in articles]) or original(articles))
+    monkeypatch.setattr(time, 'sleep', lambda seconds: None)
+    return data_dir, prepared
+
+
+def test_journal_uploads_only_new_articles(uploader, crawl_dir, tmp_path):
+    data_dir, prepared = crawl_dir
+    journal = UploadJournal(tmp_path / 'journal.json')
+    write_articles(data_dir / 'hani_20240101.json', ['u1', 'u2', 'u3'])
+    assert uploader.upload_from_json_files(str(data_dir), journal=journal)['uploaded_articles'] == 3
+
+    # 바뀌지 않은 파일은 읽지 않음
+    assert uploader.upload_from_json_files(str(data_dir), journal=journal)['files_unchanged'] == 1
+    # 같은 파일에 추가된 기사만 변환/업로드
+    write_articles(data_dir / 'hani_20240101.json', ['u1', 'u2', 'u3', 'u4'])
+    result = uploader.upload_from_json_files(str(data_dir), journal=UploadJournal(tmp_path / 'journal.json'))
+    assert result['uploaded_articles'] == 1
+    assert prepared == [['u1', 'u2', 'u3'], ['u4']]
+
+
+def test_journal_resumes_failed_articles_and_resync(uploader, crawl_dir, tmp_path, monkeypatch):
+    data_dir, prepared = crawl_dir
+    journal_path = tmp_path / 'journal.json'
+    write_articles(data_dir / 'hani_20240101.json', ['u1', 'u2', 'u3', 'u4'])
+    upsert = uploader.storage.upsert_articles
+
+    def flaky_upsert(rows):
+        if any(row['url'] == 'u3' for row in rows):
+            raise sqlite3.IntegrityError('CHECK constraint failed')
+        return upsert(rows)
+
+    monkeypatch.setattr(uploader.storage, 'upsert_articles', flaky_upsert)
+    result = uploader.upload_from_json_files(str(data_dir), journal=UploadJournal(journal_path))
+    assert (result['uploaded_articles'], result['failed_articles']) == (3, 1)
+
+    # 실패한 기사만 다시 업로드 (중단된 실행 재개)
+    monkeypatch.setattr(uploader.storage, 'upsert_articles', upsert)
+    result = uploader.upload_from_json_files(str(data_dir), journal=UploadJournal(journal_path))
+    assert result['uploaded_articles'] == 1
+    assert prepared[-1] == ['u3']
+
+    # --resync: 저널을 무시하고 전체 기사를 다시 변환, DB에 이미 있는 기사는 중복으로 건너뜀
+    result = uploader.upload_from_json_files(str(data_dir), force=True, journal=UploadJournal(journal_path))
+    assert (result['uploaded_articles'], result['skipped_articles']) == (0, 4)
+    assert prepared[-1] == ['u1', 'u2', 'u3', 'u4']
+    assert uploader.storage.count_articles() == 4
+
+
+def test_journal_records_hash_of_uploaded_bytes(uploader, crawl_dir, tmp_path, monkeypatch):
+    data_dir, prepared = crawl_dir
+    journal_path = tmp_path / 'journal.json'
+    path = data_dir / 'hani_20240101.json'
+    write_articles(path, ['u1', 'u2'])
+    upload = uploader.upload_articles
+
+    def upload_while_crawler_appends(articles, **kwargs):
+        # 업로드하는 동안 크롤러가 같은 파일에 기사를 덧붙임
+        write_articles(path, ['u1', 'u2', 'u3'])
+        return upload(articles, **kwargs)
+
+    monkeypatch.setattr(uploader, 'upload_articles', upload_while_crawler_appends)
+    assert uploader.upload_from_json_files(str(data_dir), journal=UploadJournal(journal_path))['uploaded_articles'] == 2
+
+    monkeypatch.setattr(uploader, 'upload_articles', upload)
+    result = uploader.upload_from_json_files(str(data_dir), journal=UploadJournal(journal_path))
+    assert (result['files_unchanged'], result['uploaded_articles']) == (0, 1)
+    assert prepared[-1] == ['u3']
+    assert UploadJournal(journal_path).is_up_to_date(path)
+
+
+class ServerError(Exception):
+    status_code = 503
+
+
+def test_is_row_error_separates_row_and_transient_errors():
+    assert is_row_error(sqlite3.IntegrityError('UNIQUE constraint failed'))
+    assert is_row_error(type('APIError', (Exception,), {'code': '23502'})())
+    assert not is_row_error(ServerError())
+    assert not is_row_error(TimeoutError())
+
+
+def test_transient_errors_retry_whole_batch_without_splitting(uploader, monkeypatch):
+    monkeypatch.setattr(time, 'sleep', lambda seconds: None)
+    uploader.load_media_outlets()
+    articles = uploader.prepare_article_data([
+        {'source': 'hani', 'title': f'제목 {i}', 'url': f'u{i}', 'content': '본문', 'category': '정치'} for i in range(4)
+    ])
+    upsert = uploader.storage.upsert_articles
+    calls = []
+
+    def unstable_upsert(rows):
+        calls.append(len(rows))
+        if len(calls) < 3:
+            raise ServerError('503 Service Unavailable')
+        return upsert(rows)
+
+    monkeypatch.setattr(uploader.storage, 'upsert_articles', unstable_upsert)
+    assert uploader.upload_articles(articles, batch_size=4)['uploaded'] == 4
+    assert calls == [4, 4, 4]
+
+    # 재시도 횟수를 넘기면 나누지 않고 배치 전체를 실패로 처리
+    calls.clear()
+    monkeypatch.setattr(uploader.storage, 'upsert_articles', lambda rows: calls.append(len(rows)) or 1 / 0)
+    result = uploader.upload_articles(articles, batch_size=4, max_retries=2)
+    assert (result['uploaded'], result['failed']) == (0, 4)
+    assert calls == [4, 4]
+
+
+def test_backfill_article_bodies_pages_through_articles_without_body(uploader):
+    storage = uploader.storage
+    inserted = storage.upsert_articles([{'title': f't{i}', 'url': f'https://example.com/{i}', 'content': f'본문 {i}'}
+                                        for i in range(7)])
+    storage.upsert_articles([{'title': 'empty', 'url': 'https://example.com/empty', 'content': None}])
+    ids = sorted(row['id'] for row in inserted)
+    storage.upsert_article_bodies([{'article_id': ids[0], 'body': compress_body('이미 이전된 본문')}])
+
+    assert uploader.backfill_article_bodies(batch_size=2, page_size=3) == 6
+    bodies = storage.select_article_bodies(ids)
+    assert bodies[ids[0]] == '이미 이전된 본문'
+    assert len(bodies) == 7
+    assert storage.select_articles_missing_body() == []
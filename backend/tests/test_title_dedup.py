@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from title_dedup import find_similar_title_pairs, greedy_dedup, jaccard, tokenize_title
+
+
+def double_loop_dedup(token_sets, media_ids, content_lengths, threshold):
+    """색인 도입 전 remove_duplicate_articles의 이중 루프"""
+    to_remove = set()
+    for i in range(len(token_sets)):
+        if i in to_remove:
+            continue
+        for j in range(i + 1, len(token_sets)):
+            if j in to_remove or media_ids[i] == media_ids[j]:
+                continue
+            if jaccard(token_sets[i], token_sets[j]) >= threshold:
+                if content_lengths[j] > content_lengths[i]:
+                    to_remove.add(i)
+                    break
+                to_remove.add(j)
+    return to_remove
+
+
+def random_titles(n, seed):
+    rng = random.Random(seed)
+    vocabulary = [f'w{i}' for i in range(40)]
+    titles = []
+    for _ in range(n):
+        base = [title for title in titles if title]
+        if base and rng.random() < 0.4:
+            # 앞선 제목을 조금 바꾼 유사 제목
+            words = rng.choice(base).split()
+            words[rng.randrange(len(words))] = rng.choice(vocabulary)
+            titles.append(' '.join(words + rng.sample(vocabulary, rng.randint(0, 1))))
+        else:
+            titles.append(' '.join(rng.sample(vocabulary, rng.randint(0, 7))))
+    return titles
+
+
+@pytest.mark.parametrize('seed', range(20))
+@pytest.mark.parametrize('threshold', [0.5, 0.8])
+def test_greedy_dedup_matches_double_loop(seed, threshold):
+    rng = random.Random(seed)
+    token_sets = [tokenize_title(title) for title in random_titles(120, seed)]
+    media_ids = [rng.choice(['a', 'b', 'c']) for _ in token_sets]
+    lengths = [rng.randint(0, 50) for _ in token_sets]
+    assert set(greedy_dedup(token_sets, media_ids, lengths, threshold)) == \
+        double_loop_dedup(token_sets, media_ids, lengths, threshold)
+
+
+def test_similar_pairs_match_brute_force():
+    token_sets = [tokenize_title(title) for title in random_titles(80, 99)]
+    expected = {(i, j) for i in range(len(token_sets)) for j in range(i + 1, len(token_sets))
+                if jaccard(token_sets[i], token_sets[j]) >= 0.6}
+    found = {(i, j) for i, js in find_similar_title_pairs(token_sets, 0.6).items() for j in js}
+    assert found == expected
+
+
+def test_tokenize_title_strips_punctuation():
+    assert tokenize_title('[속보] 정부, 예산안 발표!') == {'속보', '정부', '예산안', '발표'}
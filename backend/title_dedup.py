@@ -0,0 +1,87 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Set
+
+_NON_WORD = re.compile(r'[^\w\s]')
+
+
+def tokenize_title(text) -> Set[str]:
+    """특수문자 제거 후 소문자 단어 집합 (calculate_title_similarity와 같은 규칙)"""
+    return set(_NON_WORD.sub('', str(text).lower()).split())
+
+
+def jaccard(tokens1: Set[str], tokens2: Set[str]) -> float:
+    if len(tokens1) == 0 and len(tokens2) == 0:
+        return 1.0
+    if len(tokens1) == 0 or len(tokens2) == 0:
+        return 0.0
+    intersection = len(tokens1 & tokens2)
+    union = len(tokens1) + len(tokens2) - intersection
+    return intersection / union if union > 0 else 0.0
+
+
+def find_similar_title_pairs(token_sets: List[Set[str]], threshold: float) -> Dict[int, List[int]]:
+    """
+    Jaccard 유사도가 threshold 이상인 제목 쌍 찾기 → {i: [j, ...]} (j > i, 오름차순)
+
+    모든 쌍을 비교하지 않고 prefix filtering 역색인으로 후보만 뽑은 뒤 정확한 Jaccard로 검증한다.
+    토큰을 전체 빈도가 낮은 순으로 정렬했을 때, J(A, B) >= t이면 두 집합의 앞쪽
+    |A| - ceil(t·|A|) + 1개 토큰 안에 반드시 공통 토큰이 있으므로 놓치는 쌍이 없다.
+    """
+    n = len(token_sets)
+    neighbors: Dict[int, List[int]] = defaultdict(list)
+    if threshold <= 0:
+        # 모든 쌍이 기준을 넘으므로 색인이 의미 없음
+        for i in range(n):
+            neighbors[i] = list(range(i + 1, n))
+        return neighbors
+
+    # 토큰이 없는 제목끼리는 유사도 1.0
+    empty = [i for i, tokens in enumerate(token_sets) if not tokens]
+    for pos, i in enumerate(empty):
+        neighbors[i].extend(empty[pos + 1:])
+
+    freq = Counter(token for tokens in token_sets for token in tokens)
+    index: Dict[str, List[int]] = defaultdict(list)
+    for i, tokens in enumerate(token_sets):
+        if not tokens:
+            continue
+        ordered = sorted(tokens, key=lambda token: (freq[token], token))
+        size = len(ordered)
+        prefix_len = size - math.ceil(threshold * size - 1e-9) + 1
+        candidates: Set[int] = set()
+        for token in ordered[:prefix_len]:
+            candidates.update(index[token])
+            index[token].append(i)
+        for j in candidates:
+            if jaccard(token_sets[j], tokens) >= threshold:
+                neighbors[j].append(i)
+
+    for i in neighbors:
+        neighbors[i].sort()
+    return neighbors
+
+
+def greedy_dedup(token_sets: List[Set[str]], media_ids: List, content_lengths: List[int],
+                 threshold: float) -> Iterable[int]:
+    """
+    유사 제목 쌍 중 본문이 짧은 쪽을 제거할 인덱스 집합 반환
+    (기존 이중 루프와 같은 순서로 처리하므로 결과가 동일)
+    """
+    neighbors = find_similar_title_pairs(token_sets, threshold)
+    to_remove = set()
+    for i in range(len(token_sets)):
+        if i in to_remove:
+            continue
+        for j in neighbors.get(i, []):
+            if j in to_remove:
+                continue
+            # 같은 언론사면 스킵 (언론사 내 중복은 URL로 이미 처리됨)
+            if media_ids[i] == media_ids[j]:
+                continue
+            if content_lengths[j] > content_lengths[i]:
+                to_remove.add(i)
+                break
+            to_remove.add(j)
+    return to_remove
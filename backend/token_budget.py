@@ -0,0 +1,55 @@
+from functools import lru_cache
+from typing import List, Sequence
+
+import tiktoken
+
+# gpt-3.5-turbo / text-embedding-3-* 공통 토크나이저
+DEFAULT_ENCODING = "cl100k_base"
+
+
+@lru_cache(maxsize=None)
+def get_encoder() -> tiktoken.Encoding:
+    """cl100k_base 인코더 (프로세스당 한 번만 로드해 임베딩/요약 단계가 공유)"""
+    return tiktoken.get_encoding(DEFAULT_ENCODING)
+
+
+def count_tokens(texts: Sequence[str]) -> List[int]:
+    """텍스트별 토큰 수 (encode_batch 한 번)"""
+    if not texts:
+        return []
+    return [len(tokens) for tokens in get_encoder().encode_batch(list(texts), disallowed_special=())]
+
+
+@lru_cache(maxsize=256)
+def fixed_tokens(text: str) -> int:
+    """프롬프트 머리말/꼬리말/구분자처럼 고정된 문자열의 토큰 수 (문자열마다 한 번만 계산)"""
+    return len(get_encoder().encode(text, disallowed_special=()))
+
+
+def joined_tokens(counts: Sequence[int], separator: str = "\n\n") -> int:
+    """
+    토큰 수가 counts인 텍스트들을 separator로 이어 붙인 길이 (다시 인코딩하지 않음)
+    경계에서 합쳐지는 토큰이 있어 실제보다 약간 클 수 있으므로 예산 비교에는 안전한 쪽
+    """
+    return sum(counts) + fixed_tokens(separator) * max(len(counts) - 1, 0)
+
+
+def pack_chunks(counts: Sequence[int], budget: int, separator: str = "\n\n") -> List[List[int]]:
+    """
+    순서를 유지하며 이어 붙인 토큰 수가 budget을 넘지 않도록 텍스트 번호를 chunk로 묶음
+    혼자서 budget을 넘는 텍스트는 단독 chunk
+    """
+    separator_tokens = fixed_tokens(separator)
+    chunks: List[List[int]] = []
+    current: List[int] = []
+    used = 0
+    for i, count in enumerate(counts):
+        cost = count + (separator_tokens if current else 0)
+        if current and used + cost > budget:
+            chunks.append(current)
+            current, used, cost = [], 0, count
+        current.append(i)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
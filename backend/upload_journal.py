@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+# 기본 저널 위치 (backend/.upload_journal.json)
+DEFAULT_JOURNAL_PATH = Path(__file__).parent / '.upload_journal.json'
+
+
+class UploadJournal:
+    """
+    크롤링 JSON 파일 업로드 이력을 로컬에 기록하는 저널
+
+    파일별로 내용 해시(sha256)와 업로드가 확인된 기사 URL을 저장해서
+    - 내용이 바뀌지 않았고 전부 업로드된 파일은 읽지 않고 건너뛰고
+    - 같은 날 파일에 새로 추가된 기사만 다시 업로드하도록 한다.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path) if path else DEFAULT_JOURNAL_PATH
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.load()
+
+    def load(self):
+        """저널 파일 로드 (없거나 깨졌으면 빈 저널로 시작)"""
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get('files', {})
+        except Exception as e:
+            print(f"⚠️ 업로드 저널 로드 실패, 새로 시작합니다: {e}")
+            self.entries = {}
+
+    def save(self):
+        """임시 파일에 쓴 뒤 교체해서 저널이 중간 상태로 남지 않도록 저장"""
+        with self._lock:
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'files': self.entries}, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+
+    def reset(self):
+        """강제 재동기화: 모든 기록 삭제"""
+        with self._lock:
+            self.entries = {}
+
+    @staticmethod
+    def file_hash(file_path: Path) -> str:
+        sha = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha.update(block)
+        return sha.hexdigest()
+
+    @staticmethod
+    def snapshot(file_path: Path) -> Dict[str, Any]:
+        """
+        파일을 한 번만 읽어 업로드할 바이트와 그 해시/크기를 함께 반환 ({'data', 'sha256', 'size', 'mtime_ns'})
+        수정시각은 읽기 전에 재므로, 읽는 동안이나 그 뒤에 덧붙은 내용은 다음 실행에서 크기/해시로 감지됨
+        """
+        stat = file_path.stat()
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        return {'data': data, 'sha256': hashlib.sha256(data).hexdigest(), 'size': len(data),
+                'mtime_ns': stat.st_mtime_ns}
+
+    def is_up_to_date(self, file_path: Path) -> bool:
+        """파일이 마지막 업로드 이후 바뀌지 않았고 모든 기사가 업로드 확인됐는지 여부"""
+        entry = self.entries.get(file_path.name)
+        if not entry or not entry.get('complete'):
+            return False
+        stat = file_path.stat()
+        # 크기/수정시각이 같으면 해시 계산 생략
+        if entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns:
+            return True
+        if entry.get('sha256') == self.file_hash(file_path):
+            # 내용은 같고 메타데이터만 바뀐 경우 갱신
+            entry['size'] = stat.st_size
+            entry['mtime_ns'] = stat.st_mtime_ns
+            return True
+        return False
+
+    def confirmed_urls(self, file_path: Path) -> set:
+        entry = self.entries.get(file_path.name)
+        return set(entry.get('confirmed_urls', [])) if entry else set()
+
+    def confirm_batch(self, file_path: Path, urls: Iterable[str]):
+        """업로드가 확인된 배치의 URL 기록 (배치 스레드에서 호출)"""
+        with self._lock:
+            entry = self.entries.setdefault(file_path.name, {'confirmed_urls': []})
+            known = set(entry['confirmed_urls'])
+            entry['confirmed_urls'].extend(url for url in urls if url not in known)
+
+    def mark_file(self, file_path: Path, complete: bool, snapshot: Optional[Dict[str, Any]] = None):
+        """
+        파일 처리 결과 기록 (실패 기사가 없을 때만 complete)
+        snapshot(업로드한 내용을 읽은 snapshot 결과)을 주면 지금 파일 대신 실제로 업로드한 바이트의 해시/크기를 기록
+        """
+        if snapshot is None:
+            stat = file_path.stat()
+            snapshot = {'sha256': self.file_hash(file_path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        with self._lock:
+            entry = self.entries.setdefault(file_path.name, {'confirmed_urls': []})
+            entry['sha256'] = snapshot['sha256']
+            entry['size'] = snapshot['size']
+            entry['mtime_ns'] = snapshot['mtime_ns']
+            entry['complete'] = complete
+            entry['updated_at'] = datetime.now().isoformat()
+
+    def pending_articles(self, file_path: Path, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """아직 업로드 확인되지 않은 기사만 반환 (크롤링 원본/변환된 기사 모두 url 키로 비교)"""
+        confirmed = self.confirmed_urls(file_path)
+        return [article for article in articles if article.get('url') not in confirmed]